@@ -0,0 +1,194 @@
+"""
+WebSocket Broadcast Hub
+Author: Mattiaz
+Description: Serialize-once fan-out to WebSocket clients with a bounded, conflating queue per client
+             and topic subscriptions
+"""
+
+import asyncio
+import itertools
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set
+
+from fastapi import WebSocket
+
+from core.serialization import dumps_str
+
+logger = logging.getLogger(__name__)
+
+
+class ClientChannel:
+    """
+    Outgoing queue and sender task for one WebSocket client.
+
+    Messages published with a conflation key replace any queued message with the same
+    key (a slow client only ever gets the latest price update, not a backlog). When the
+    queue is full the oldest pending message is dropped, so a slow consumer costs the
+    hub O(1) memory and never blocks other clients.
+    """
+
+    def __init__(self, websocket: WebSocket, max_queue: int, send_timeout: float):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.sent = 0
+        self.dropped = 0
+        self.conflated = 0
+        self._pending: 'OrderedDict[Hashable, str]' = OrderedDict()
+        self._ready = asyncio.Event()
+        self._seq = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self.topics: Set[str] = set()
+
+    def offer(self, payload: str, key: Optional[Hashable] = None):
+        if key is not None and key in self._pending:
+            self._pending[key] = payload
+            self.conflated += 1
+            return
+
+        if len(self._pending) >= self.max_queue:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+
+        self._pending[key if key is not None else ('_', next(self._seq))] = payload
+        self._ready.set()
+
+    def start(self, on_error):
+        self._task = asyncio.create_task(self._send_loop(on_error))
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _send_loop(self, on_error):
+        try:
+            while True:
+                await self._ready.wait()
+                while self._pending:
+                    _, payload = self._pending.popitem(last=False)
+                    await asyncio.wait_for(self.websocket.send_text(payload), self.send_timeout)
+                    self.sent += 1
+                self._ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"WebSocket send failed, dropping client: {e}")
+            await self._close_socket()
+            on_error(self.websocket)
+
+    async def _close_socket(self):
+        """Close with 1011 so the endpoint's receive loop ends instead of holding a client that gets nothing"""
+        try:
+            await asyncio.wait_for(self.websocket.close(code=1011), self.send_timeout)
+        except Exception as e:
+            logger.debug(f"WebSocket close failed: {e}")
+
+    @property
+    def backlog(self) -> int:
+        return len(self._pending)
+
+    @property
+    def closed(self) -> bool:
+        return self._task is not None and self._task.done()
+
+
+class BroadcastHub:
+    """
+    Fan-out of JSON messages to connected WebSocket clients.
+
+    Topics are "name" or "name:filter" (e.g. "prices:SOL/USDT"); subscribing to the bare
+    name receives every filter under it.
+    """
+
+    def __init__(self, max_queue: int = 100, send_timeout: float = 5.0):
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self._clients: Dict[WebSocket, ClientChannel] = {}
+        self._topics: Dict[str, Set[ClientChannel]] = {}
+
+    async def connect(self, websocket: WebSocket) -> ClientChannel:
+        await websocket.accept()
+        channel = ClientChannel(websocket, self.max_queue, self.send_timeout)
+        self._clients[websocket] = channel
+        channel.start(self.disconnect)
+        return channel
+
+    def disconnect(self, websocket: WebSocket):
+        channel = self._clients.pop(websocket, None)
+        if channel is not None:
+            self._remove_topics(channel, list(channel.topics))
+            channel.close()
+
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        channel = self._clients.get(websocket)
+        if channel is None:
+            return []
+        for topic in topics:
+            self._topics.setdefault(topic, set()).add(channel)
+            channel.topics.add(topic)
+        return sorted(channel.topics)
+
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        channel = self._clients.get(websocket)
+        if channel is None:
+            return []
+        self._remove_topics(channel, topics)
+        return sorted(channel.topics)
+
+    def _remove_topics(self, channel: ClientChannel, topics: Iterable[str]):
+        for topic in topics:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(channel)
+                if not subscribers:
+                    del self._topics[topic]
+            channel.topics.discard(topic)
+
+    def publish(self, topic: str, message: Dict[str, Any], key: Optional[Hashable] = None) -> int:
+        """Serialize once and queue for subscribers of `topic` (and of its bare name)"""
+        recipients = self._topics.get(topic, set())
+        name = topic.split(':', 1)[0]
+        if name != topic and name in self._topics:
+            recipients = recipients | self._topics[name]
+        if not recipients:
+            return 0
+
+        payload = dumps_str(message)
+        for channel in list(recipients):
+            channel.offer(payload, key)
+        return len(recipients)
+
+    def send(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Queue a message for one client (acks, errors)"""
+        channel = self._clients.get(websocket)
+        if channel is not None:
+            channel.offer(dumps_str(message))
+
+    def broadcast(self, message: Dict[str, Any], key: Optional[Hashable] = None) -> int:
+        """
+        Serialize `message` once and queue it for every client without awaiting any send.
+
+        Pass a conflation `key` (e.g. "price_update") for messages where only the latest
+        one matters to a client that is behind.
+        """
+        payload = dumps_str(message)
+        clients = list(self._clients.values())
+        for channel in clients:
+            channel.offer(payload, key)
+        return len(clients)
+
+    @property
+    def active_connections(self) -> int:
+        return len(self._clients)
+
+    def get_stats(self) -> Dict[str, Any]:
+        channels = list(self._clients.values())
+        return {
+            'clients': len(channels),
+            'topics': {topic: len(subscribers) for topic, subscribers in self._topics.items()},
+            'backlog': sum(c.backlog for c in channels),
+            'sent': sum(c.sent for c in channels),
+            'dropped': sum(c.dropped for c in channels),
+            'conflated': sum(c.conflated for c in channels)
+        }
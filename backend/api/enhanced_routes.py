@@ -4,37 +4,125 @@ Enhanced API Routes for Advanced Trading Bot
 Includes WebSocket support, market analysis, and real-time features
 """
 
-from fastapi import FastAPI, WebSocket, HTTPException, BackgroundTasks
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
 import json
 import asyncio
 import logging
 from datetime import datetime
 import numpy as np
 
+from api.broadcast import BroadcastHub
+from api.responses import FastJSONResponse, use_fast_json
+from core.candles import Candle, candle_aggregator
+from core.engine import engine
+from core.features import feature_store
+from core.metrics import LatencyMiddleware, loop_monitor, metrics_snapshot
+from core.orders import Order
+from bot.signal_ledger import signal_ledger
+from bot.signals import AISignalGenerator
+from strategies.auto import auto_engine
+
 logger = logging.getLogger(__name__)
 
-class WebSocketManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+manager = BroadcastHub()
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT", "SOL/USDT"]
+BASE_PRICES = {"BTC/USDT": (68000, 500), "ETH/USDT": (3500, 50), "SOL/USDT": (150, 10)}
+
+# Topics a client can subscribe to; "prices" covers every "prices:<symbol>"
+TOPICS = {"prices", "trades", "signals", "notifications", "candles", "auto_mode"} | {f"prices:{symbol}" for symbol in SYMBOLS}
+DEFAULT_TOPICS = ["prices", "notifications"]
+
+PRICE_INTERVAL = 2
+SIGNAL_INTERVAL = 15
+
+# Event topics are fed by producers through emit() and drained by one publisher each
+event_queues: Dict[str, asyncio.Queue] = {"trades": asyncio.Queue(), "notifications": asyncio.Queue(),
+                                          "candles": asyncio.Queue(), "auto_mode": asyncio.Queue()}
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+def emit(topic: str, message: Dict[str, Any]):
+    """Queue an event message (trade fills, notifications) for its topic publisher; call from the event loop"""
+    event_queues[topic].put_nowait(message)
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+def emit_candle(candle: Candle):
+    """Candle aggregator listener: every finalized bar goes out on the candles topic"""
+    emit("candles", {"type": "candle", "data": candle.to_dict(), "timestamp": datetime.now().isoformat()})
+
+def emit_trade(order: Order):
+    """Order manager listener: every fill of the shared engine goes out on the trades topic"""
+    if order.state == "acked":
+        emit("trades", {"type": "trade", "data": order.to_dict(), "timestamp": datetime.now().isoformat()})
+
+def emit_auto_decision(decision: Dict[str, Any]):
+    """Auto mode listener: strategy re-selections go out on the auto_mode topic"""
+    emit("auto_mode", {"type": "auto_mode_decision",
+                       "data": {key: value for key, value in decision.items() if key != "analysis"},
+                       "timestamp": decision["timestamp"]})
+
+async def publish_prices():
+    while True:
+        await asyncio.sleep(PRICE_INTERVAL)
+        try:
+            # Mock real-time data; the shared engine turns it into features, candles and paper fills
+            quotes = {symbol: {"mock": base + np.random.normal(0, spread)} for symbol, (base, spread) in BASE_PRICES.items()}
+            engine.update_market(quotes)
+        except Exception as e:
+            logger.error(f"Price publisher error: {e}")
+            continue
+        for symbol, exchange_prices in quotes.items():
+            topic = f"prices:{symbol}"
+            manager.publish(topic, {
+                "type": "price_update",
+                "symbol": symbol,
+                "data": {symbol: exchange_prices["mock"]},
+                "timestamp": datetime.now().isoformat()
+            }, key=topic)
+
+async def publish_signals():
+    generator = AISignalGenerator()
+    while True:
+        try:
+            signals = generator.generate_signals({}, SYMBOLS)
+            manager.publish("signals", {
+                "type": "ai_signals",
+                "data": signals,
+                "timestamp": datetime.now().isoformat()
+            }, key="signals")
+        except Exception as e:
+            logger.error(f"Signal publisher error: {e}")
+        await asyncio.sleep(SIGNAL_INTERVAL)
+
+async def publish_events(topic: str):
+    queue = event_queues[topic]
+    while True:
+        message = await queue.get()
+        try:
+            manager.publish(topic, message)
+        except Exception as e:
+            logger.error(f"Event publisher error for {topic}: {e}")
 
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(json.dumps(message))
-            except:
-                self.disconnect(connection)
+def _handle_client_message(websocket: WebSocket, message: Any):
+    """Apply a {"action": "subscribe"|"unsubscribe", "topics": [...]} request"""
+    if not isinstance(message, dict) or message.get("action") not in ("subscribe", "unsubscribe"):
+        manager.send(websocket, {"type": "error", "message": "Expected {\"action\": \"subscribe\"|\"unsubscribe\", \"topics\": [...]}"})
+        return
 
-manager = WebSocketManager()
+    topics = message.get("topics") or []
+    if isinstance(topics, str):
+        topics = [topics]
+    unknown = [topic for topic in topics if topic not in TOPICS]
+    if unknown:
+        manager.send(websocket, {"type": "error", "message": f"Unknown topics: {unknown}", "topics": sorted(TOPICS)})
+        return
+
+    if message["action"] == "subscribe":
+        subscribed = manager.subscribe(websocket, topics)
+    else:
+        subscribed = manager.unsubscribe(websocket, topics)
+    manager.send(websocket, {"type": "subscriptions", "topics": subscribed})
 
 class MarketAnalysisRequest(BaseModel):
     symbol: str
@@ -47,7 +135,7 @@ class NotificationRequest(BaseModel):
     priority: str = "normal"
 
 def create_enhanced_app():
-    app = FastAPI(title="Advanced Trading Bot API")
+    app = use_fast_json(FastAPI(title="Advanced Trading Bot API", default_response_class=FastJSONResponse))
     
     app.add_middleware(
         CORSMiddleware,
@@ -56,77 +144,132 @@ def create_enhanced_app():
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(LatencyMiddleware)
+
+    publishers: List[asyncio.Task] = []
+    listeners: List[Tuple[Any, Callable]] = []  # (global source, callback), removed again on shutdown
+    analysis_generator = AISignalGenerator()
+
+    @app.on_event("startup")
+    async def start_publishers():
+        """One publisher per topic, shared by every connection; the shared engine trades on the mock prices"""
+        loop_monitor.start()
+        loop = asyncio.get_running_loop()
+
+        def on_order(order: Order):
+            # Orders are acked on worker threads; hand them to the loop that owns the queues
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(emit_trade, order)
+
+        listeners.extend([(candle_aggregator, emit_candle), (auto_engine, emit_auto_decision),
+                          (engine.order_manager, on_order)])
+        for source, callback in listeners:
+            source.add_listener(callback)
+        await engine.start(poll_market=False)
+        publishers.append(asyncio.create_task(publish_prices()))
+        publishers.append(asyncio.create_task(publish_signals()))
+        publishers.extend(asyncio.create_task(publish_events(topic)) for topic in event_queues)
+        publishers.append(asyncio.create_task(auto_engine.run(lambda: {symbol: {} for symbol in SYMBOLS})))
+
+    @app.on_event("shutdown")
+    async def stop_publishers():
+        for task in publishers:
+            task.cancel()
+        publishers.clear()
+        await engine.stop()
+        for source, callback in listeners:
+            source.remove_listener(callback)
+        listeners.clear()
 
     @app.websocket("/ws")
     async def websocket_endpoint(websocket: WebSocket):
-        await manager.connect(websocket)
+        channel = await manager.connect(websocket)
+        topics = websocket.query_params.get("topics")
+        initial = [topic for topic in topics.split(",") if topic in TOPICS] if topics else DEFAULT_TOPICS
+        subscribed = manager.subscribe(websocket, initial)
+        manager.send(websocket, {"type": "subscriptions", "topics": subscribed})
         try:
-            while True:
-                # Send real-time updates every 2 seconds
-                await asyncio.sleep(2)
-                
-                # Mock real-time data
-                update = {
-                    "type": "price_update",
-                    "data": {
-                        "BTC/USDT": 68000 + np.random.normal(0, 500),
-                        "ETH/USDT": 3500 + np.random.normal(0, 50),
-                        "SOL/USDT": 150 + np.random.normal(0, 10)
-                    },
-                    "timestamp": datetime.now().isoformat()
-                }
-                await manager.broadcast(update)
+            while not channel.closed:
+                text = await websocket.receive_text()
+                try:
+                    message = json.loads(text)
+                except ValueError:
+                    message = None
+                _handle_client_message(websocket, message)
                 
+        except WebSocketDisconnect:
+            pass
         except Exception as e:
             logger.error(f"WebSocket error: {e}")
         finally:
             manager.disconnect(websocket)
 
-    @app.get("/api/market_analysis/{symbol}")
+    @app.get("/api/market_analysis/{symbol:path}")
     async def get_market_analysis(symbol: str):
-        """Get detailed market analysis for a symbol"""
+        """Get detailed market analysis for a symbol from the shared feature store"""
+        features = feature_store.latest(symbol)
+        if features is None or not features.ready:
+            raise HTTPException(status_code=404, detail=f"No indicator data for {symbol} yet")
+        
         try:
-            # Mock technical analysis data
-            analysis = {
+            analysis = analysis_generator._calculate_technical_indicators(symbol)
+            direction, confidence = analysis_generator._determine_signal(analysis)
+            half_band = features.sma * features.bb_width / 200
+            lower, upper = features.sma - half_band, features.sma + half_band
+            # Oversold/overbought composite of RSI and the position in the bands
+            buy_strength = float(np.clip(100 - (features.rsi + features.bb_position * 100) / 2, 0, 100))
+            target = {"bullish": features.price * 1.03, "bearish": features.price * 0.97}.get(features.trend, features.sma)
+            
+            return {
                 "symbol": symbol,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.fromtimestamp(features.updated_at).isoformat(),
+                "version": features.version,
                 "indicators": {
-                    "rsi": np.random.uniform(30, 70),
+                    "rsi": features.rsi,
                     "macd": {
-                        "macd": np.random.uniform(-100, 100),
-                        "signal": np.random.uniform(-100, 100),
-                        "histogram": np.random.uniform(-50, 50)
+                        "macd": features.macd,
+                        "signal": features.macd_signal,
+                        "histogram": features.macd - features.macd_signal
                     },
                     "bollinger": {
-                        "upper": 45000,
-                        "middle": 43000,
-                        "lower": 41000,
-                        "position": np.random.uniform(0, 1)
+                        "upper": upper,
+                        "middle": features.sma,
+                        "lower": lower,
+                        "position": features.bb_position
                     },
                     "volume_profile": {
-                        "volume_spike": np.random.uniform(0.8, 2.0),
-                        "trend": np.random.choice(["bullish", "bearish", "neutral"])
+                        "volume_spike": features.volume_spike,
+                        "trend": features.trend
                     }
                 },
                 "signals": {
-                    "buy_strength": np.random.uniform(0, 100),
-                    "sell_strength": np.random.uniform(0, 100),
-                    "overall_trend": np.random.choice(["bullish", "bearish", "neutral"]),
-                    "confidence": np.random.uniform(60, 95)
+                    "buy_strength": buy_strength,
+                    "sell_strength": 100 - buy_strength,
+                    "overall_trend": features.trend,
+                    "direction": direction,
+                    "confidence": confidence
                 },
                 "price_targets": {
-                    "support": 42000,
-                    "resistance": 45000,
-                    "next_target": 47000
+                    "support": lower,
+                    "resistance": upper,
+                    "next_target": target
                 }
             }
             
-            return analysis
-            
         except Exception as e:
             logger.error(f"Market analysis error: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    @app.get("/api/signal_performance")
+    async def get_signal_performance():
+        """Outcomes of every emitted signal: hit rate, average return and calibration per confidence bucket"""
+        return signal_ledger.get_stats()
+
+    @app.get("/api/auto_mode")
+    async def get_auto_mode():
+        """Auto mode's current decision, as last made by the background evaluator"""
+        return {"decision": auto_engine.decision, "status": auto_engine.get_status()}
+
     @app.get("/api/performance_summary")
     async def get_performance_summary():
         """Get comprehensive performance metrics"""
@@ -168,9 +311,14 @@ def create_enhanced_app():
             logger.error(f"Performance summary error: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    @app.get("/api/metrics")
+    async def get_metrics():
+        """Per-route latency histograms and event-loop lag with stack samples of recent stalls"""
+        return metrics_snapshot()
+
     @app.post("/api/notifications")
     async def send_notification(request: NotificationRequest):
-        """Send real-time notification to all connected clients"""
+        """Send real-time notification to clients subscribed to notifications"""
         try:
             notification = {
                 "type": "notification",
@@ -182,8 +330,8 @@ def create_enhanced_app():
                 }
             }
             
-            await manager.broadcast(notification)
-            return {"success": True, "message": "Notification sent"}
+            recipients = manager.publish("notifications", notification)
+            return {"success": True, "message": "Notification sent", "recipients": recipients}
             
         except Exception as e:
             logger.error(f"Notification error: {e}")
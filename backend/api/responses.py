@@ -0,0 +1,64 @@
+"""
+Fast JSON Responses
+Author: Mattiaz
+Description: FastAPI response and route classes that serialize with core.serialization (orjson)
+"""
+
+import functools
+import inspect
+from typing import Any, Callable
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.responses import Response
+
+from core.serialization import dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _respond_fast(endpoint: Callable) -> Callable:
+    """Wrap an endpoint so plain return values skip jsonable_encoder"""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            return result if isinstance(result, Response) else FastJSONResponse(result)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            result = endpoint(*args, **kwargs)
+            return result if isinstance(result, Response) else FastJSONResponse(result)
+    return wrapper
+
+
+class FastJSONRoute(APIRoute):
+    """
+    APIRoute that serializes endpoint results straight to orjson.
+
+    FastAPI runs every plain return value through jsonable_encoder, which walks the whole
+    structure in Python and cannot handle numpy scalars. Endpoints without a response
+    model are wrapped to return a FastJSONResponse directly; endpoints that declare one
+    keep FastAPI's validation.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        response_model = kwargs.get('response_model')
+        if isinstance(response_model, DefaultPlaceholder):
+            response_model = response_model.value
+        annotated = inspect.signature(endpoint).return_annotation is not inspect.Signature.empty
+        if response_model is None and not annotated:
+            endpoint = _respond_fast(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def use_fast_json(app):
+    """Route all endpoints declared after this call through FastJSONRoute"""
+    app.router.route_class = FastJSONRoute
+    return app
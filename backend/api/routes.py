@@ -5,7 +5,7 @@ Author: Mattiaz
 Description: RESTful API for the comprehensive trading bot platform
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
@@ -24,6 +24,10 @@ from wallets.metamask import metamask_wallet
 from wallets.phantom import phantom_wallet
 from core.notify import notification_manager
 from core.replay import trade_replay
+from core.status import StatusPublisher, etag_matches
+from core.metrics import LatencyMiddleware, loop_monitor, metrics_snapshot
+from core.http import http_client
+from api.responses import FastJSONResponse, use_fast_json
 
 logger = logging.getLogger(__name__)
 
@@ -53,8 +57,10 @@ class WebhookRequest(BaseModel):
 app = FastAPI(
     title="OPM MoneyMaker Trading Bot API",
     description="Production-ready crypto trading bot with AI signals, arbitrage, and wallet integration",
-    version="3.0.0"
+    version="3.0.0",
+    default_response_class=FastJSONResponse
 )
+use_fast_json(app)
 
 # CORS middleware
 app.add_middleware(
@@ -64,6 +70,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(LatencyMiddleware)
 
 # Startup event
 @app.on_event("startup")
@@ -71,11 +78,22 @@ async def startup_event():
     """Initialize the trading bot on startup"""
     try:
         logger.info("🚀 Starting Enhanced Trading Bot API...")
+        loop_monitor.start()
+        await http_client.start()
         await engine.start()
+        asyncio.create_task(status_publisher.run(version_source=lambda: engine.get_status()["last_update"]))
+        auto_engine.add_listener(lambda decision: status_publisher.mark_dirty())
+        asyncio.create_task(auto_engine.run(lambda: engine.market_data))
         logger.info("✅ Enhanced Trading Bot API ready")
     except Exception as e:
         logger.error(f"Startup error: {e}")
 
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled outbound connections"""
+    await http_client.close()
+
 # Health check
 @app.get("/health")
 async def health_check():
@@ -94,74 +112,100 @@ async def health_check():
         }
     }
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Per-route latency histograms, event-loop lag with stack samples of recent stalls, and outbound HTTP counts"""
+    return {**metrics_snapshot(), "http_client": http_client.get_stats()}
+
+# Strategy instances shared by every status build
+ai_strategy = AIStrategy()
+arb_strategy = ArbitrageStrategy()
+
+# Enhanced status document - built once per market-data version
+async def build_status() -> Dict[str, Any]:
+    """Build the comprehensive bot status with all modules"""
+    # Get bot status
+    status = engine.get_status()
+    
+    # Get recent trade history
+    trade_history = engine.get_trade_history(20)
+    
+    # Get current AI signals
+    ai_signals = await ai_strategy.generate_signals(engine.market_data)
+    
+    # Get arbitrage opportunities
+    arbitrage_opportunities = await arb_strategy.find_opportunities(engine.market_data)
+    
+    # Get auto mode status
+    auto_status = auto_engine.get_status()
+    
+    # Get wallet status
+    wallet_status = {
+        'metamask': metamask_wallet.get_wallet_info(),
+        'phantom': phantom_wallet.get_wallet_info()
+    }
+    
+    return {
+        "portfolio": status["portfolio"],
+        "trading_active": status["is_running"],
+        "mode": status["mode"],
+        "ai_signals": [
+            {
+                "coin": signal.symbol.split('/')[0],
+                "symbol": signal.symbol,
+                "direction": signal.direction,
+                "confidence": signal.confidence,
+                "current_price": signal.price,
+                "target_price": signal.target_price,
+                "risk_level": signal.risk_level,
+                "timeframe": "1-3 hours"
+            }
+            for signal in ai_signals[:5]
+        ],
+        "arbitrage_opportunities": arbitrage_opportunities[:5],
+        "trade_log": [
+            {
+                "timestamp": trade["timestamp"].strftime("%H:%M:%S") if isinstance(trade["timestamp"], datetime) else trade["timestamp"],
+                "symbol": trade["symbol"],
+                "side": trade["direction"].upper(),
+                "amount": trade["amount"],
+                "price": trade["price"],
+                "profit": trade["profit"],
+                "strategy": trade["strategy"],
+                "confidence": trade.get("confidence", 50)
+            }
+            for trade in trade_history
+        ],
+        "prices": engine.market_data,
+        "auto_mode": auto_status,
+        "wallets": wallet_status,
+        "connection_status": {
+            "active_exchanges": len([k for k, v in engine.market_data.items() if not k.startswith('_')]),
+            "demo_exchanges": 3,
+            "last_update": status["last_update"]
+        }
+    }
+
+status_publisher = StatusPublisher(build_status)
+
 # Enhanced status endpoint
 @app.get("/api/enhanced_status")
-async def get_enhanced_status():
-    """Get comprehensive bot status with all modules"""
+async def get_enhanced_status(request: Request, since: Optional[int] = None):
+    """Get comprehensive bot status from the precomputed snapshot
+    
+    With `since` (the client's last seen version) only the changes are returned.
+    """
     try:
-        # Get bot status
-        status = engine.get_status()
-        
-        # Get recent trade history
-        trade_history = engine.get_trade_history(20)
+        snapshot = status_publisher.snapshot or await status_publisher.refresh()
+        headers = {"ETag": snapshot.etag, "X-Status-Version": str(snapshot.version), "Cache-Control": "no-cache"}
         
-        # Get current AI signals
-        ai_strategy = AIStrategy()
-        ai_signals = await ai_strategy.generate_signals(engine.market_data)
+        if since is not None:
+            return Response(content=status_publisher.delta(since, snapshot), media_type="application/json", headers=headers)
         
-        # Get arbitrage opportunities
-        arb_strategy = ArbitrageStrategy()
-        arbitrage_opportunities = await arb_strategy.find_opportunities(engine.market_data)
-        
-        # Get auto mode status
-        auto_status = auto_engine.get_status()
-        
-        # Get wallet status
-        wallet_status = {
-            'metamask': metamask_wallet.get_wallet_info(),
-            'phantom': phantom_wallet.get_wallet_info()
-        }
+        if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+            return Response(status_code=304, headers=headers)
         
-        return {
-            "portfolio": status["portfolio"],
-            "trading_active": status["is_running"],
-            "mode": status["mode"],
-            "ai_signals": [
-                {
-                    "coin": signal.symbol.split('/')[0],
-                    "symbol": signal.symbol,
-                    "direction": signal.direction,
-                    "confidence": signal.confidence,
-                    "current_price": signal.price,
-                    "target_price": signal.target_price,
-                    "risk_level": signal.risk_level,
-                    "timeframe": "1-3 hours"
-                }
-                for signal in ai_signals[:5]
-            ],
-            "arbitrage_opportunities": arbitrage_opportunities[:5],
-            "trade_log": [
-                {
-                    "timestamp": trade["timestamp"].strftime("%H:%M:%S") if isinstance(trade["timestamp"], datetime) else trade["timestamp"],
-                    "symbol": trade["symbol"],
-                    "side": trade["direction"].upper(),
-                    "amount": trade["amount"],
-                    "price": trade["price"],
-                    "profit": trade["profit"],
-                    "strategy": trade["strategy"],
-                    "confidence": trade.get("confidence", 50)
-                }
-                for trade in trade_history
-            ],
-            "prices": engine.market_data,
-            "auto_mode": auto_status,
-            "wallets": wallet_status,
-            "connection_status": {
-                "active_exchanges": len([k for k, v in engine.market_data.items() if not k.startswith('_')]),
-                "demo_exchanges": 3,
-                "last_update": status["last_update"]
-            }
-        }
+        return Response(content=snapshot.body, media_type="application/json", headers=headers)
     except Exception as e:
         logger.error(f"Enhanced status error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -169,18 +213,19 @@ async def get_enhanced_status():
 # Auto Mode endpoints
 @app.get("/api/auto_mode")
 async def get_auto_mode_status():
-    """Get auto mode status and recommendations"""
+    """Get auto mode status and the evaluator's current decision"""
     try:
-        analysis = await auto_engine.analyze_market_conditions(engine.market_data)
-        strategy, confidence, reason = await auto_engine.select_optimal_strategy(analysis)
+        # Decisions are made by the background evaluator; polling only reads the cached one
+        decision = auto_engine.decision or await auto_engine.evaluate(engine.market_data)
         
         return {
             "enabled": engine.mode == TradingMode.AUTO,
             "current_strategy": auto_engine.current_strategy,
-            "recommended_strategy": strategy,
-            "confidence": confidence,
-            "reason": reason,
-            "market_analysis": analysis,
+            "recommended_strategy": decision["strategy"],
+            "confidence": decision["confidence"],
+            "reason": decision["reason"],
+            "decided_at": decision["timestamp"],
+            "market_analysis": auto_engine.last_analysis,
             "auto_status": auto_engine.get_status()
         }
     except Exception as e:
@@ -206,6 +251,33 @@ async def activate_auto_mode():
         logger.error(f"Auto mode activation error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Strategy runtime endpoints
+@app.get("/api/strategies")
+async def get_strategies():
+    """Running strategies with state, CPU time and evaluation latency"""
+    status = engine.get_status()
+    return {"active_strategies": status["active_strategies"], "strategies": status["strategies"]}
+
+@app.post("/api/strategies/{name}")
+async def add_strategy(name: str):
+    """Start a strategy, or restart it with a fresh instance if it is running"""
+    try:
+        engine.add_strategy(StrategyType(name))
+    except ValueError:
+        raise HTTPException(status_code=404, detail=f"Unknown strategy {name}")
+    status_publisher.mark_dirty()
+    return {"success": True, "active_strategies": [s.value for s in engine.active_strategies]}
+
+@app.delete("/api/strategies/{name}")
+async def remove_strategy(name: str):
+    """Stop a strategy without stopping the engine"""
+    try:
+        engine.remove_strategy(StrategyType(name))
+    except ValueError:
+        raise HTTPException(status_code=404, detail=f"Unknown strategy {name}")
+    status_publisher.mark_dirty()
+    return {"success": True, "active_strategies": [s.value for s in engine.active_strategies]}
+
 # Meme Radar endpoints
 @app.get("/api/meme_radar")
 async def get_meme_radar():
@@ -309,6 +381,7 @@ async def start_enhanced_trading(config: TradingConfig):
         # Start the engine if not running
         if not engine.is_running:
             await engine.start()
+        status_publisher.mark_dirty()
         
         logger.info(f"🚀 Trading started - Budget: ${config.budget}, Strategy: {config.strategy}")
         
@@ -331,6 +404,7 @@ async def stop_enhanced_trading():
     """Stop enhanced trading"""
     try:
         await engine.stop()
+        status_publisher.mark_dirty()
         logger.info("⏹️ Trading stopped")
         return {"success": True, "message": "Trading stopped"}
     except Exception as e:
@@ -339,32 +413,39 @@ async def stop_enhanced_trading():
 
 @app.post("/api/execute_enhanced_trade")
 async def execute_enhanced_trade(request: TradeRequest):
-    """Execute enhanced trade with validation"""
+    """Execute enhanced trade with validation - sized by amount_usd and priced from the current snapshot"""
+    from core.engine import TradeSignal, StrategyType
+    
+    side = request.side.lower()
+    if side not in ("buy", "sell"):
+        raise HTTPException(status_code=400, detail=f"Invalid side: {request.side}")
+    market = engine.market_data.get(request.symbol)
+    if not isinstance(market, dict) or not market.get("price"):
+        raise HTTPException(status_code=400, detail=f"No price data for {request.symbol}")
+    
+    price = market["price"]
+    signal = TradeSignal(
+        symbol=request.symbol,
+        direction=side,
+        confidence=request.confidence,
+        price=price,
+        target_price=price * (1.03 if side == "buy" else 0.97),
+        strategy=StrategyType.AI_SIGNALS,
+        timestamp=datetime.now(),
+        risk_level="medium",
+        amount_usd=request.amount_usd
+    )
+    
     try:
-        # Create a trade signal for execution
-        from core.engine import TradeSignal, StrategyType
-        
-        signal = TradeSignal(
-            symbol=request.symbol,
-            direction=request.side,
-            confidence=request.confidence,
-            price=43000.0,  # Demo price
-            target_price=43500.0,  # Demo target
-            strategy=StrategyType.AI_SIGNALS,
-            timestamp=datetime.now(),
-            risk_level="medium"
-        )
-        
-        await engine._execute_signal(signal)
-        
-        return {
-            "success": True,
-            "message": f"✅ {request.side.upper()} ${request.amount_usd} {request.symbol} executed successfully"
-        }
-        
+        success, message = await engine._execute_signal(signal)
     except Exception as e:
         logger.error(f"Enhanced trade execution error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if not success:
+        raise HTTPException(status_code=502, detail=message)
+    status_publisher.mark_dirty()
+    return {"success": True, "message": message}
 
 if __name__ == "__main__":
     import uvicorn
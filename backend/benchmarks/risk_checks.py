@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Pre-trade risk check microbenchmark
+Times RiskEngine.check() and check() + release() per order while the aggregates grow to
+many symbols, exchanges and strategies, and compares with the 10µs order-path budget.
+Also times OrderManager.submit() with and without the risk engine.
+
+Usage (from backend/):
+    python -m benchmarks.risk_checks --orders 200000 --symbols 500
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from core.orders import OrderManager
+from core.risk import RiskEngine, RiskLimits
+
+BUDGET_US = 10.0
+EXCHANGES = ['binance', 'kucoin', 'bybit', 'okx', 'coinbase']
+STRATEGIES = ['arbitrage', 'ai_signal', 'manual']
+
+
+def build_orders(count: int, symbols: int):
+    rng = np.random.default_rng(42)
+    return [SimpleNamespace(exchange=EXCHANGES[rng.integers(len(EXCHANGES))],
+                            symbol=f"COIN{rng.integers(symbols)}/USDT",
+                            strategy=STRATEGIES[rng.integers(len(STRATEGIES))],
+                            side='buy' if rng.random() < 0.5 else 'sell',
+                            amount_usd=float(rng.uniform(10, 500)))
+            for _ in range(count)]
+
+
+def unlimited() -> RiskLimits:
+    """Limits that never reject, so every check takes the full path"""
+    return RiskLimits(max_order_usd=1e12, max_symbol_exposure=1e12, max_exchange_exposure=1e12,
+                      max_strategy_exposure=1e12, max_open_orders=10 ** 9, max_daily_loss=1e12)
+
+
+def time_calls(fn, orders) -> np.ndarray:
+    timer = time.perf_counter_ns
+    timings = np.empty(len(orders))
+    for i, order in enumerate(orders):
+        started = timer()
+        fn(order)
+        timings[i] = timer() - started
+    return timings / 1000  # µs
+
+
+def report(name: str, timings: np.ndarray, budget: bool = True):
+    p99 = np.percentile(timings, 99)
+    verdict = ('  [ok]' if p99 < BUDGET_US else '  [OVER BUDGET]') if budget else ''
+    print(f"{name:32s} mean {timings.mean():6.2f} µs  p50 {np.percentile(timings, 50):6.2f} µs  "
+          f"p99 {p99:6.2f} µs  max {timings.max():8.2f} µs{verdict}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=200000)
+    parser.add_argument('--symbols', type=int, default=500)
+    args = parser.parse_args()
+
+    orders = build_orders(args.orders, args.symbols)
+
+    engine = RiskEngine(unlimited())
+    report('check (open orders accumulate)', time_calls(engine.check, orders))
+
+    engine = RiskEngine(unlimited())
+
+    def check_and_release(order):
+        engine.check(order)
+        engine.release(order, True)
+
+    report('check + release', time_calls(check_and_release, orders))
+    keys = sum(len(book) for book in engine.get_stats()['exposure'].values())
+
+    # Rejections take an early exit; a tight order-size limit makes most orders hit it
+    report('check (rejected)', time_calls(RiskEngine(RiskLimits(max_order_usd=50.0)).check, orders))
+
+    # The order path itself: submit -> queue, with place_order never running
+    sample = orders[:min(len(orders), 50000)]
+    medians = []
+    for name, risk in [('OrderManager.submit', None), ('OrderManager.submit + risk', RiskEngine(unlimited()))]:
+        manager = OrderManager(lambda order: (True, 'ok'), workers_per_exchange=0, risk=risk)
+        timings = time_calls(lambda o: manager.submit(o.exchange, o.symbol, o.side, o.amount_usd, o.strategy), sample)
+        report(name, timings, budget=False)
+        medians.append(np.percentile(timings, 50))
+    print(f"risk engine adds {medians[1] - medians[0]:.2f} µs (p50) to OrderManager.submit - "
+          f"{keys} aggregate keys, budget {BUDGET_US:.0f} µs")
+
+
+if __name__ == '__main__':
+    main()
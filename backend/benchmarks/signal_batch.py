@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Batched signal scoring benchmark
+Times AISignalGenerator.score_batch() on a symbols x FEATURES matrix against the per-symbol
+if/elif chain it replaced, and checks that both score every symbol the same.
+
+Usage (from backend/):
+    python -m benchmarks.signal_batch --symbols 2000 --repeat 200
+"""
+
+import argparse
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+
+from bot.signals import BB_POSITION, FEATURES, MACD, MOMENTUM, RSI, RULES, TREND, VOLUME_SPIKE, AISignalGenerator
+
+BUDGET_MS = 1.0
+
+
+def random_features(n: int) -> np.ndarray:
+    """Indicator values spread over the ranges the rules look at"""
+    features = np.empty((n, len(FEATURES)))
+    features[:, RSI] = np.random.uniform(25, 75, n)
+    features[:, MACD] = np.random.uniform(-0.5, 0.5, n)
+    features[:, BB_POSITION] = np.random.uniform(0, 1, n)
+    features[:, VOLUME_SPIKE] = np.random.uniform(0.8, 2.0, n)
+    features[:, MOMENTUM] = np.random.uniform(-1, 1, n)
+    features[:, TREND] = np.random.choice([1.0, -1.0, 0.0], size=n, p=[0.4, 0.3, 0.3])
+    return features
+
+
+def scalar_signal(analysis: Dict) -> Tuple[str, float]:
+    """The original per-symbol if/elif chain, with score_batch()'s confidence formula"""
+    if analysis['rsi'] < 30 and analysis['trend'] == 'bullish':
+        rule = 0
+    elif analysis['rsi'] > 70 and analysis['trend'] == 'bearish':
+        rule = 1
+    elif analysis['momentum'] > 0.5 and analysis['volume_spike'] > 1.3:
+        rule = 2
+    elif analysis['momentum'] < -0.5 and analysis['volume_spike'] > 1.2:
+        rule = 3
+    elif analysis['macd'] > 0.2 and analysis['bb_position'] < 0.3:
+        rule = 4
+    elif analysis['macd'] < -0.2 and analysis['bb_position'] > 0.7:
+        rule = 5
+    else:
+        return 'hold', 0.0
+
+    direction, base, extra, driver, threshold, scale = RULES[rule]
+    strength = min(1.0, abs(analysis[FEATURES[driver]] - threshold) / scale)
+    return ('buy' if direction > 0 else 'sell'), base + strength * extra
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    np.random.seed(args.seed)
+    generator = AISignalGenerator()
+    features = random_features(args.symbols)
+    prices = np.random.uniform(0.1, 50000, args.symbols)
+
+    timings = np.empty(args.repeat)
+    for i in range(args.repeat):
+        started = time.perf_counter()
+        batch = generator.score_batch(features, prices)
+        timings[i] = time.perf_counter() - started
+    timings *= 1000
+
+    rows = [{name: (['neutral', 'bullish', 'bearish'][int(row[TREND])] if name == 'trend' else row[j])
+             for j, name in enumerate(FEATURES)} for row in features]
+    started = time.perf_counter()
+    looped = [scalar_signal(row) for row in rows]
+    loop_ms = (time.perf_counter() - started) * 1000
+
+    mismatches = sum(direction != {1: 'buy', -1: 'sell', 0: 'hold'}[int(batch.direction[i])]
+                     or abs(confidence - batch.confidence[i]) > 1e-9
+                     for i, (direction, confidence) in enumerate(looped))
+    p50 = np.percentile(timings, 50)
+    verdict = '[ok]' if p50 < BUDGET_MS else '[OVER BUDGET]'
+    print(f"score_batch {args.symbols} symbols: p50 {p50:.3f} ms  p99 {np.percentile(timings, 99):.3f} ms  "
+          f"({p50 * 1000 / args.symbols:.2f} µs/symbol) {verdict}")
+    print(f"per-symbol loop: {loop_ms:.1f} ms ({loop_ms / p50:.0f}x slower)")
+    print(f"signals: {int((batch.direction == 1).sum())} buy, {int((batch.direction == -1).sum())} sell, "
+          f"{int((batch.direction == 0).sum())} hold - {mismatches} mismatches vs loop")
+
+
+if __name__ == '__main__':
+    main()
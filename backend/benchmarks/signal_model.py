@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Signal model inference benchmark
+Times one batched predict() over all symbols for the rule model and the NumPy linear
+model, plus the generator's full score() path, against the 5ms budget per tick.
+
+Usage (from backend/):
+    python -m benchmarks.signal_model --symbols 1000 --repeat 500
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.signal_batch import random_features
+from bot.models import CLASSES, LinearModel
+from bot.signals import FEATURE_SCHEMA_VERSION, FEATURES, AISignalGenerator, RuleModel
+
+BUDGET_MS = 5.0
+
+
+def time_ms(fn, repeat: int) -> np.ndarray:
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings[i] = time.perf_counter() - started
+    return timings * 1000
+
+
+def report(name: str, timings: np.ndarray):
+    p99 = np.percentile(timings, 99)
+    verdict = '[ok]' if p99 < BUDGET_MS else '[OVER BUDGET]'
+    print(f"{name:28s} p50 {np.percentile(timings, 50):7.3f} ms  p99 {p99:7.3f} ms  {verdict}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    np.random.seed(args.seed)
+    features = random_features(args.symbols)
+    features[::50] = np.nan  # some symbols not warmed up yet
+    prices = np.random.uniform(0.1, 50000, args.symbols)
+
+    # A model fitted on the rules' own decisions, so the timing covers a realistic weight set
+    rules = RuleModel()
+    labels, _ = rules.predict(np.nan_to_num(features))
+    linear = LinearModel.fit(np.nan_to_num(features), labels, FEATURES, FEATURE_SCHEMA_VERSION, epochs=200)
+    print(f"linear model fit on rule labels: train accuracy {linear.metadata['train_accuracy']:.1%}, "
+          f"classes {dict(zip(CLASSES, linear.metadata['class_counts']))}")
+
+    report(f"rules.predict x{args.symbols}", time_ms(lambda: rules.predict(features), args.repeat))
+    report(f"linear.predict x{args.symbols}", time_ms(lambda: linear.predict(features), args.repeat))
+    generator = AISignalGenerator(model=linear)
+    report(f"generator.score x{args.symbols}", time_ms(lambda: generator.score(features, prices), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
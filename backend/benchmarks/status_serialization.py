@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Status serialization microbenchmark
+Serializes a dashboard status document shaped like /api/enhanced_status (numpy floats,
+datetimes, 100-point price histories) with the previous stdlib paths and with the
+orjson encoder in core.serialization.
+
+Usage (from backend/):
+    python -m benchmarks.status_serialization --markets 8 --runs 500
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from api.responses import FastJSONResponse
+from core.serialization import dumps
+
+
+def build_document(markets: int) -> dict:
+    rng = np.random.default_rng(42)
+    now = datetime.now()
+    symbols = [f"COIN{i}/USDT" for i in range(markets)]
+    exchanges = ['binance', 'kucoin', 'bybit', 'okx', 'coinbase']
+
+    return {
+        'portfolio': {'balance': 10000.0, 'profit_live': np.float64(12.5), 'profit_24h': rng.uniform(-10, 25),
+                      'total_trades': 42, 'successful_trades': 37, 'win_rate': 88.1},
+        'ai_signals': [{'symbol': symbol, 'direction': 'buy', 'confidence': rng.uniform(70, 95),
+                        'price': rng.uniform(1, 70000), 'timestamp': now.isoformat()} for symbol in symbols[:5]],
+        'trade_log': [{'time': (now - timedelta(minutes=i)).strftime('%H:%M:%S'), 'symbol': symbols[i % markets],
+                       'side': 'buy', 'amount': rng.uniform(0, 1), 'price': rng.uniform(1, 70000),
+                       'profit': rng.normal(0, 2), 'strategy': 'arbitrage'} for i in range(20)],
+        'arbitrage_opportunities': [{'symbol': symbols[i], 'buy_exchange': 'kucoin', 'sell_exchange': 'binance',
+                                     'profit_pct': rng.uniform(0.1, 1.0)} for i in range(min(5, markets))],
+        'trading_active': True,
+        'prices': {symbol: {exchange: rng.uniform(1, 70000) for exchange in exchanges} for symbol in symbols},
+        'market_data': {symbol: {'price_history': [{'timestamp': now - timedelta(seconds=5 * i),
+                                                    'price': rng.uniform(1, 70000)} for i in range(100)]}
+                        for symbol in symbols}
+    }
+
+
+def stdlib_status(document: dict) -> bytes:
+    """Previous core.status encoder"""
+    def default(value):
+        if hasattr(value, 'item'):
+            return value.item()
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return str(value)
+    return json.dumps(document, default=default, separators=(',', ':')).encode('utf-8')
+
+
+def fastapi_default(document: dict) -> bytes:
+    """Plain endpoint return value: jsonable_encoder + JSONResponse"""
+    return JSONResponse(jsonable_encoder(document)).body
+
+
+def orjson_response(document: dict) -> bytes:
+    return FastJSONResponse(document).body
+
+
+def measure(fn, document: dict, runs: int):
+    fn(document)
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        body = fn(document)
+        timings.append(time.perf_counter() - started)
+    return np.array(timings), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--markets', type=int, default=8)
+    parser.add_argument('--runs', type=int, default=500)
+    args = parser.parse_args()
+
+    document = build_document(args.markets)
+    assert json.loads(orjson_response(document)) == json.loads(stdlib_status(document))
+
+    baseline = None
+    for name, fn in [('stdlib json (status)', stdlib_status),
+                     ('jsonable_encoder + JSONResponse', fastapi_default),
+                     ('orjson (FastJSONResponse)', orjson_response)]:
+        timings, size = measure(fn, document, args.runs)
+        mean = timings.mean()
+        baseline = baseline or mean
+        print(f"{name:34s} mean {mean * 1e3:7.3f} ms  p99 {np.percentile(timings, 99) * 1e3:7.3f} ms  "
+              f"{size / 1024:6.1f} KiB  {baseline / mean:5.1f}x")
+
+    try:
+        fastapi_default({'total_trades': np.int64(45)})
+    except Exception as e:
+        print(f"jsonable_encoder on numpy ints fails: {type(e).__name__}")
+
+
+if __name__ == '__main__':
+    main()
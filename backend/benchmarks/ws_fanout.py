@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+WebSocket fan-out load test
+Connects thousands of simulated clients (a share of them slow) to the BroadcastHub and
+publishes price updates, reporting broadcast cost, delivery latency and slow-client drops.
+
+Usage (from backend/):
+    python -m benchmarks.ws_fanout --clients 5000 --slow 0.02 --rate 20 --seconds 5
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import time
+
+import numpy as np
+
+from api.broadcast import BroadcastHub
+
+
+class SimulatedWebSocket:
+    """Stands in for a Starlette WebSocket; `delay` models the client's network"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.latencies = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, payload: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        else:
+            await asyncio.sleep(0)
+        sent_at = json.loads(payload)['sent_at']
+        self.latencies.append(time.perf_counter() - sent_at)
+
+
+async def run(clients: int, slow_share: float, rate: float, seconds: float):
+    hub = BroadcastHub(max_queue=32)
+    sockets = [SimulatedWebSocket(0.5 if i < clients * slow_share else 0.0) for i in range(clients)]
+    for websocket in sockets:
+        await hub.connect(websocket)
+
+    broadcast_times = []
+    messages = int(rate * seconds)
+    for i in range(messages):
+        message = {'type': 'price_update', 'data': {'BTC/USDT': 68000 + i}, 'sent_at': time.perf_counter()}
+        started = time.perf_counter()
+        hub.broadcast(message, key='price_update' if i % 2 else None)
+        broadcast_times.append(time.perf_counter() - started)
+        await asyncio.sleep(1 / rate)
+
+    await asyncio.sleep(1.0)
+    stats = hub.get_stats()
+
+    fast = [ws for ws in sockets if not ws.delay]
+    slow = [ws for ws in sockets if ws.delay]
+    fast_latency = np.array([lat for ws in fast for lat in ws.latencies])
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"clients: {clients} ({len(slow)} slow), messages: {messages}")
+    print(f"broadcast(): mean {np.mean(broadcast_times) * 1e3:.2f} ms, max {np.max(broadcast_times) * 1e3:.2f} ms")
+    print(f"fast clients: {len(fast_latency) / max(len(fast), 1):.1f}/{messages} delivered each, "
+          f"latency p50 {np.percentile(fast_latency, 50) * 1e3:.1f} ms, p99 {np.percentile(fast_latency, 99) * 1e3:.1f} ms")
+    print(f"slow clients: {np.mean([len(ws.latencies) for ws in slow]) if slow else 0:.1f} delivered each, "
+          f"dropped {stats['dropped']}, conflated {stats['conflated']}, backlog {stats['backlog']}")
+    print(f"max RSS: {rss_mb:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=5000)
+    parser.add_argument('--slow', type=float, default=0.02, help='Share of clients with a 500ms send delay')
+    parser.add_argument('--rate', type=float, default=20, help='Broadcasts per second')
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.clients, args.slow, args.rate, args.seconds))
+
+
+if __name__ == '__main__':
+    main()
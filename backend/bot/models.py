@@ -0,0 +1,166 @@
+"""
+Signal models - pluggable batch inference for AISignalGenerator
+"""
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Class order of every model's outputs
+CLASSES = (-1, 0, 1)  # sell, hold, buy
+
+
+class SignalModel:
+    """
+    Scores a symbols x features matrix in one call.
+
+    `features` names the columns the model was built for and `schema_version` the
+    feature definitions behind them; the generator refuses a model whose schema does
+    not match what the feature store produces. `timeframe` is the feature store series
+    the model scores ('tick' or a candle timeframe such as '1m'). predict() returns per-symbol direction
+    (1 buy / -1 sell / 0 hold) and confidence (0-100); rows with NaN are holds.
+    """
+
+    name = 'model'
+    version = '0'
+    schema_version = 0
+    timeframe = 'tick'
+    features: Tuple[str, ...] = ()
+
+    def predict(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+    def describe(self) -> Dict:
+        return {
+            'name': self.name,
+            'version': self.version,
+            'schema_version': self.schema_version,
+            'timeframe': self.timeframe,
+            'features': list(self.features)
+        }
+
+
+class LinearModel(SignalModel):
+    """
+    Multinomial logistic regression evaluated with NumPy only: standardize, one matmul,
+    softmax. Confidence is the winning class probability in percent.
+    """
+
+    name = 'linear'
+
+    def __init__(self, features: Sequence[str], schema_version: int, mean: np.ndarray, scale: np.ndarray,
+                 coef: np.ndarray, intercept: np.ndarray, version: str = '1', metadata: Optional[Dict] = None,
+                 timeframe: str = '1m'):
+        self.features = tuple(features)
+        self.schema_version = schema_version
+        self.version = version
+        self.timeframe = timeframe
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        # Fold the standardization into the weights: (x - mean) / scale @ W.T + b == x @ W'.T + b'
+        coef = np.asarray(coef, dtype=np.float64)
+        self.coef = coef
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self._weights = (coef / self.scale).T.copy()
+        self._bias = self.intercept - (coef / self.scale) @ self.mean
+        self.metadata = metadata or {}
+
+    def probabilities(self, features: np.ndarray) -> np.ndarray:
+        logits = np.nan_to_num(features) @ self._weights + self._bias
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=1, keepdims=True)
+        return logits
+
+    def predict(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        features = np.asarray(features, dtype=np.float64)
+        probabilities = self.probabilities(features)
+        winner = probabilities.argmax(axis=1)
+        direction = np.asarray(CLASSES, dtype=np.int8)[winner]
+        confidence = probabilities[np.arange(len(winner)), winner] * 100
+
+        missing = np.isnan(features).any(axis=1)
+        direction[missing] = 0
+        confidence[missing] = 0.0
+        return direction, confidence
+
+    @classmethod
+    def fit(cls, features: np.ndarray, labels: np.ndarray, feature_names: Sequence[str], schema_version: int,
+            l2: float = 1e-3, learning_rate: float = 0.5, epochs: int = 500, version: str = '1',
+            timeframe: str = '1m') -> 'LinearModel':
+        """Full-batch gradient descent on the softmax cross-entropy; labels are -1/0/1, one row per `timeframe` bar"""
+        features = np.asarray(features, dtype=np.float64)
+        mean = features.mean(axis=0)
+        scale = features.std(axis=0)
+        scale[scale == 0] = 1.0
+        x = (features - mean) / scale
+        targets = np.zeros((len(labels), len(CLASSES)))
+        targets[np.arange(len(labels)), np.searchsorted(CLASSES, labels)] = 1.0
+
+        # Weight classes by inverse frequency so rare buy/sell labels are not drowned out by holds
+        counts = targets.sum(axis=0)
+        sample_weight = (targets @ (len(labels) / np.maximum(counts, 1) / len(CLASSES)))[:, None]
+
+        coef = np.zeros((len(CLASSES), x.shape[1]))
+        intercept = np.zeros(len(CLASSES))
+        for _ in range(epochs):
+            logits = x @ coef.T + intercept
+            logits -= logits.max(axis=1, keepdims=True)
+            probabilities = np.exp(logits)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            error = (probabilities - targets) * sample_weight / len(labels)
+            coef -= learning_rate * (error.T @ x + l2 * coef)
+            intercept -= learning_rate * error.sum(axis=0)
+
+        accuracy = float(((x @ coef.T + intercept).argmax(axis=1) == targets.argmax(axis=1)).mean())
+        return cls(feature_names, schema_version, mean, scale, coef, intercept, version=version, timeframe=timeframe,
+                   metadata={'samples': int(len(labels)), 'class_counts': counts.astype(int).tolist(),
+                             'train_accuracy': round(accuracy, 4)})
+
+    def to_dict(self) -> Dict:
+        return {
+            'model': self.name,
+            'version': self.version,
+            'schema_version': self.schema_version,
+            'timeframe': self.timeframe,
+            'features': list(self.features),
+            'classes': list(CLASSES),
+            'mean': self.mean.tolist(),
+            'scale': self.scale.tolist(),
+            'coef': self.coef.tolist(),
+            'intercept': self.intercept.tolist(),
+            'metadata': self.metadata
+        }
+
+    def save(self, path: str):
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LinearModel':
+        if data.get('model') != cls.name:
+            raise ValueError(f"Not a {cls.name} model: {data.get('model')}")
+        if tuple(data.get('classes', CLASSES)) != CLASSES:
+            raise ValueError(f"Unsupported classes {data.get('classes')}")
+        # Files exported before the timeframe field were all trained on the 1m backfill cache
+        return cls(data['features'], data['schema_version'], data['mean'], data['scale'], data['coef'],
+                   data['intercept'], version=str(data.get('version', '1')), metadata=data.get('metadata'),
+                   timeframe=data.get('timeframe', '1m'))
+
+    def describe(self) -> Dict:
+        return {**super().describe(), 'metadata': self.metadata}
+
+
+def load_model(path: str) -> LinearModel:
+    """Load an exported model file"""
+    with open(path) as f:
+        return LinearModel.from_dict(json.load(f))
+
+
+def compatible(model: SignalModel, features: List[str], schema_version: int) -> bool:
+    return tuple(model.features) == tuple(features) and model.schema_version == schema_version
@@ -0,0 +1,269 @@
+"""
+Signal ledger - every emitted signal, resolved against later prices
+"""
+import heapq
+import logging
+import math
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import settings
+from core.clock import clock
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = {'buy': 1, 'sell': -1}
+# Upper end of the generator's timeframe labels, used as the signal's expiry
+TIMEFRAME_HOURS = {'30min - 1h': 1.0, '1-3 hours': 3.0, '2-6 hours': 6.0}
+
+
+@dataclass
+class OpenSignal:
+    id: int
+    symbol: str
+    direction: int
+    confidence: float
+    entry_price: float
+    target_price: float
+    stop_price: float
+    created_at: float
+    expires_at: float
+    model: str = ''
+
+
+class BucketStats:
+    """Running outcome counts for one confidence bucket"""
+
+    __slots__ = ('resolved', 'target', 'stop', 'expired', 'return_sum', 'confidence_sum')
+
+    def __init__(self):
+        self.resolved = 0
+        self.target = self.stop = self.expired = 0
+        self.return_sum = 0.0
+        self.confidence_sum = 0.0
+
+    def add(self, outcome: str, return_pct: float, confidence: float):
+        self.resolved += 1
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        self.return_sum += return_pct
+        self.confidence_sum += confidence
+
+    def to_dict(self) -> Dict:
+        if not self.resolved:
+            return {'resolved': 0}
+        hit_rate = self.target / self.resolved
+        avg_confidence = self.confidence_sum / self.resolved
+        return {
+            'resolved': self.resolved,
+            'target': self.target,
+            'stop': self.stop,
+            'expired': self.expired,
+            'hit_rate': round(hit_rate * 100, 1),
+            'avg_return_pct': round(self.return_sum / self.resolved, 3),
+            'avg_confidence': round(avg_confidence, 1),
+            # Positive: the signals in this bucket are over-confident
+            'calibration_gap': round(avg_confidence - hit_rate * 100, 1)
+        }
+
+
+def _bucket(confidence: float) -> str:
+    low = min(90, max(0, int(confidence // 10) * 10))
+    return f"{low}-{low + 10}"
+
+
+class SignalLedger:
+    """
+    Stores each signal in SQLite and resolves it as prices arrive: target reached, stop
+    reached or expired (closed at the last price). One signal per symbol and direction
+    is open at a time; repeats of an open signal are not recorded again.
+
+    Open signals are indexed per symbol in two heaps of price levels - levels that
+    trigger when the price rises to them (buy targets, sell stops) and levels that
+    trigger when it falls to them - plus one heap of expiry times, so on_price() only
+    touches signals that actually resolve. Stats per confidence bucket are updated as
+    signals resolve and rebuilt from the database on startup.
+    """
+
+    def __init__(self, path: Optional[str] = None, stop_pct: Optional[float] = None,
+                 expiry_hours: Optional[float] = None):
+        self.path = settings.SIGNAL_DB_PATH if path is None else path
+        self.stop_pct = settings.SIGNAL_STOP_PCT if stop_pct is None else stop_pct
+        self.expiry_hours = settings.SIGNAL_EXPIRY_HOURS if expiry_hours is None else expiry_hours
+        self._conn: Optional[sqlite3.Connection] = None
+        self._open: Dict[int, OpenSignal] = {}
+        self._open_keys: Dict[Tuple[str, int], int] = {}
+        self._rising: Dict[str, List[Tuple[float, int, str]]] = {}   # (level, id, outcome), min-heap
+        self._falling: Dict[str, List[Tuple[float, int, str]]] = {}  # (-level, id, outcome), min-heap
+        self._expiries: List[Tuple[float, int]] = []
+        self._last_price: Dict[str, float] = {}
+        self._buckets: Dict[str, BucketStats] = {}
+        self._totals = BucketStats()
+        self._recorded = 0
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        """Open the database and load open signals and stats on first use"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS signals (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    symbol TEXT NOT NULL,
+                    direction INTEGER NOT NULL,
+                    confidence REAL NOT NULL,
+                    entry_price REAL NOT NULL,
+                    target_price REAL NOT NULL,
+                    stop_price REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    model TEXT,
+                    outcome TEXT,
+                    resolved_at REAL,
+                    exit_price REAL,
+                    return_pct REAL
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS signals_open ON signals (outcome) WHERE outcome IS NULL')
+            self._conn.commit()
+            self._load()
+        return self._conn
+
+    def _load(self):
+        for row in self._conn.execute('SELECT confidence, outcome, return_pct FROM signals WHERE outcome IS NOT NULL'):
+            self._add_stats(*row)
+        for row in self._conn.execute('''SELECT id, symbol, direction, confidence, entry_price, target_price,
+                                                stop_price, created_at, expires_at, model
+                                         FROM signals WHERE outcome IS NULL'''):
+            self._index(OpenSignal(*row))
+        self._recorded = self._conn.execute('SELECT COUNT(*) FROM signals').fetchone()[0]
+        if self._open:
+            logger.info(f"📒 Signal ledger: {len(self._open)} open signals, {self._totals.resolved} resolved")
+
+    def _add_stats(self, confidence: float, outcome: str, return_pct: float):
+        self._totals.add(outcome, return_pct, confidence)
+        bucket = self._buckets.get(_bucket(confidence))
+        if bucket is None:
+            bucket = self._buckets[_bucket(confidence)] = BucketStats()
+        bucket.add(outcome, return_pct, confidence)
+
+    def _index(self, signal: OpenSignal):
+        self._open[signal.id] = signal
+        self._open_keys[(signal.symbol, signal.direction)] = signal.id
+        rising = self._rising.setdefault(signal.symbol, [])
+        falling = self._falling.setdefault(signal.symbol, [])
+        if signal.direction > 0:
+            heapq.heappush(rising, (signal.target_price, signal.id, 'target'))
+            heapq.heappush(falling, (-signal.stop_price, signal.id, 'stop'))
+        else:
+            heapq.heappush(falling, (-signal.target_price, signal.id, 'target'))
+            heapq.heappush(rising, (signal.stop_price, signal.id, 'stop'))
+        heapq.heappush(self._expiries, (signal.expires_at, signal.id))
+
+    def record(self, signal: Dict) -> Optional[int]:
+        """Store an emitted buy/sell signal; returns its id, None for holds and repeats of an open signal"""
+        direction = DIRECTIONS.get(signal.get('direction'))
+        entry = signal.get('current_price')
+        if direction is None or not entry:
+            return None
+
+        with self._lock:
+            conn = self._db()
+            if (signal['symbol'], direction) in self._open_keys:
+                return None
+            now = clock.time()
+            hours = TIMEFRAME_HOURS.get(signal.get('timeframe'), self.expiry_hours)
+            entry = float(entry)
+            opened = OpenSignal(
+                id=0, symbol=signal['symbol'], direction=direction, confidence=float(signal['confidence']),
+                entry_price=entry, target_price=float(signal['target_price']),
+                stop_price=entry * (1 - direction * self.stop_pct / 100),
+                created_at=now, expires_at=now + hours * 3600, model=signal.get('model', '')
+            )
+            cursor = conn.execute('''
+                INSERT INTO signals (symbol, direction, confidence, entry_price, target_price, stop_price,
+                                     created_at, expires_at, model)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (opened.symbol, opened.direction, opened.confidence, opened.entry_price, opened.target_price,
+                  opened.stop_price, opened.created_at, opened.expires_at, opened.model))
+            conn.commit()
+            opened.id = cursor.lastrowid
+            self._index(opened)
+            self._recorded += 1
+            return opened.id
+
+    def on_price(self, symbol: str, price: float) -> List[Dict]:
+        """Resolve the signals this price reaches and any that expired; returns the resolutions"""
+        if not price or not math.isfinite(price):
+            return []
+        price = float(price)
+        now = clock.time()
+        resolved = []
+
+        with self._lock:
+            self._db()
+            self._last_price[symbol] = price
+            rising, falling = self._rising.get(symbol), self._falling.get(symbol)
+            while rising and rising[0][0] <= price:
+                level, signal_id, outcome = heapq.heappop(rising)
+                if signal_id in self._open:
+                    resolved.append(self._resolve(signal_id, outcome, level, now))
+            while falling and -falling[0][0] >= price:
+                level, signal_id, outcome = heapq.heappop(falling)
+                if signal_id in self._open:
+                    resolved.append(self._resolve(signal_id, outcome, -level, now))
+            while self._expiries and self._expiries[0][0] <= now:
+                _, signal_id = heapq.heappop(self._expiries)
+                signal = self._open.get(signal_id)
+                if signal is not None:
+                    exit_price = self._last_price.get(signal.symbol, signal.entry_price)
+                    resolved.append(self._resolve(signal_id, 'expired', exit_price, now))
+            if resolved:
+                self._conn.commit()
+                self._compact(symbol)
+
+        for resolution in resolved:
+            logger.info(f"📒 Signal {resolution['id']} {resolution['symbol']} {resolution['outcome']}: "
+                        f"{resolution['return_pct']:+.2f}%")
+        return resolved
+
+    def _resolve(self, signal_id: int, outcome: str, exit_price: float, now: float) -> Dict:
+        signal = self._open.pop(signal_id)
+        del self._open_keys[(signal.symbol, signal.direction)]
+        return_pct = (exit_price / signal.entry_price - 1) * 100 * signal.direction
+        self._conn.execute('UPDATE signals SET outcome = ?, resolved_at = ?, exit_price = ?, return_pct = ? WHERE id = ?',
+                           (outcome, now, exit_price, return_pct, signal_id))
+        self._add_stats(signal.confidence, outcome, return_pct)
+        return {'id': signal_id, 'symbol': signal.symbol, 'outcome': outcome, 'return_pct': return_pct}
+
+    def _compact(self, symbol: str):
+        """Drop levels of resolved signals (a target hit leaves its stop behind) once they pile up"""
+        for heaps in (self._rising, self._falling):
+            heap = heaps.get(symbol)
+            if heap and len(heap) > 2 * len(self._open) + 32:
+                heaps[symbol] = [entry for entry in heap if entry[1] in self._open]
+                heapq.heapify(heaps[symbol])
+        if len(self._expiries) > 2 * len(self._open) + 32:
+            self._expiries = [entry for entry in self._expiries if entry[1] in self._open]
+            heapq.heapify(self._expiries)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            self._db()
+            return {
+                'recorded': self._recorded,
+                'open': len(self._open),
+                'overall': self._totals.to_dict(),
+                'by_confidence': {bucket: stats.to_dict() for bucket, stats in sorted(self._buckets.items())},
+                'open_signals': [
+                    {'id': s.id, 'symbol': s.symbol, 'direction': 'buy' if s.direction > 0 else 'sell',
+                     'confidence': s.confidence, 'entry_price': s.entry_price, 'target_price': s.target_price,
+                     'stop_price': s.stop_price, 'expires_in': round(max(0.0, s.expires_at - clock.time()))}
+                    for s in sorted(self._open.values(), key=lambda s: s.created_at)
+                ]
+            }
+
+
+# Global instance
+signal_ledger = SignalLedger()
@@ -5,123 +5,225 @@ AI signal generation and technical analysis
 import numpy as np
 import pandas as pd
 import logging
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import ta
 
+from bot.models import SignalModel, compatible, load_model
+from bot.signal_ledger import SignalLedger, signal_ledger
+from config.settings import settings
+from core.features import DEFAULT_TIMEFRAME, Features, FeatureStore, feature_store
+
 logger = logging.getLogger(__name__)
 
+# Feature matrix columns for the batch API (trend: 1 bullish, -1 bearish, 0 neutral)
+FEATURES = ('rsi', 'macd', 'bb_position', 'volume_spike', 'momentum', 'trend')
+RSI, MACD, BB_POSITION, VOLUME_SPIKE, MOMENTUM, TREND = range(len(FEATURES))
+TREND_CODES = {'bullish': 1.0, 'bearish': -1.0, 'neutral': 0.0}
+# Bump when a column's definition changes (core/features.py) - trained models are tied to it
+FEATURE_SCHEMA_VERSION = 1
+
+# Signal rules in priority order: (direction, base confidence, extra at full strength,
+# driving feature, its threshold, distance past the threshold that counts as full strength)
+# RSI, then momentum, then MACD - the first rule that matches a symbol wins
+RULES = (
+    (1, 85, 10, RSI, 30, 15),          # RSI oversold in an uptrend
+    (-1, 75, 15, RSI, 70, 15),         # RSI overbought in a downtrend
+    (1, 70, 15, MOMENTUM, 0.5, 1.5),   # strong momentum on volume
+    (-1, 70, 10, MOMENTUM, -0.5, 1.5), # strong negative momentum on volume
+    (1, 75, 10, MACD, 0.2, 0.8),       # MACD up near the lower band
+    (-1, 72, 8, MACD, -0.2, 0.8),      # MACD down near the upper band
+)
+DIRECTIONS = {1: 'buy', -1: 'sell', 0: 'hold'}
+
+
+@dataclass
+class BatchSignals:
+    """Per-symbol results of score_batch(): direction 1 buy / -1 sell / 0 hold"""
+    direction: np.ndarray
+    confidence: np.ndarray
+    target: np.ndarray
+
+
+def _targets(prices: np.ndarray, direction: np.ndarray) -> np.ndarray:
+    return prices * np.where(direction > 0, 1.03, np.where(direction < 0, 0.97, 1.0))
+
+
+class RuleModel(SignalModel):
+    """The hand-written RSI/momentum/MACD rules behind the SignalModel interface"""
+
+    name = 'rules'
+    version = '1'
+    schema_version = FEATURE_SCHEMA_VERSION
+    features = FEATURES
+
+    def predict(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        batch = AISignalGenerator.score_batch(features, np.zeros(len(features)))
+        return batch.direction, batch.confidence
+
+
+def default_model() -> SignalModel:
+    """The model exported to SIGNAL_MODEL_PATH, or the rules when none is configured or it doesn't fit"""
+    if settings.SIGNAL_MODEL_PATH:
+        try:
+            model = load_model(settings.SIGNAL_MODEL_PATH)
+            if compatible(model, FEATURES, FEATURE_SCHEMA_VERSION):
+                logger.info(f"🧠 Signal model {model.name}@{model.version} loaded from {settings.SIGNAL_MODEL_PATH}")
+                return model
+            logger.error(f"Signal model {settings.SIGNAL_MODEL_PATH} was trained on features {model.features} "
+                         f"(schema v{model.schema_version}), expected {FEATURES} (v{FEATURE_SCHEMA_VERSION}) - using rules")
+        except Exception as e:
+            logger.error(f"Failed to load signal model {settings.SIGNAL_MODEL_PATH}: {e} - using rules")
+    return RuleModel()
+
+
 class AISignalGenerator:
-    def __init__(self):
+    def __init__(self, store: Optional[FeatureStore] = None, timeframe: Optional[str] = None,
+                 model: Optional[SignalModel] = None, ledger: Optional[SignalLedger] = None):
         self.signal_history = []
         self.confidence_threshold = 70
+        self.feature_store = store or feature_store
+        self.model = model or default_model()
+        # Score the series the model was trained on: a 1m model must not see tick features
+        self.timeframe = timeframe or getattr(self.model, 'timeframe', DEFAULT_TIMEFRAME)
+        self.ledger = ledger or signal_ledger
         
     def generate_signals(self, market_data: Dict, symbols: List[str]) -> List[Dict]:
         """Generate AI trading signals for given symbols"""
-        signals = []
+        if not symbols:
+            self.signal_history = []
+            return self.signal_history
         
-        for symbol in symbols:
-            try:
-                signal = self._analyze_symbol(symbol, market_data.get(symbol, {}))
-                if signal and signal['confidence'] > self.confidence_threshold:
-                    signals.append(signal)
-            except Exception as e:
-                logger.error(f"Error generating signal for {symbol}: {e}")
+        try:
+            prices = np.array([self._get_current_price(symbol) for symbol in symbols])
+            features = self._feature_matrix(symbols)
+            batch = self.score(features, prices)
+        except Exception as e:
+            logger.error(f"Error generating signals: {e}")
+            return self.signal_history
         
-        # Sort by confidence and return top 3
-        signals.sort(key=lambda x: x['confidence'], reverse=True)
-        self.signal_history = signals[:3]
+        # Only the top 3 above the threshold become signal dicts
+        candidates = np.flatnonzero((batch.direction != 0) & (batch.confidence > self.confidence_threshold))
+        top = candidates[np.argsort(-batch.confidence[candidates], kind='stable')][:3]
+        
+        self.signal_history = [
+            self._build_signal(symbols[i], int(batch.direction[i]), float(batch.confidence[i]), float(prices[i]),
+                               float(batch.target[i]), features[i])
+            for i in top
+        ]
+        for signal in self.signal_history:
+            self.ledger.record(signal)
         return self.signal_history
     
-    def _analyze_symbol(self, symbol: str, data: Dict) -> Optional[Dict]:
-        """Analyze individual symbol and generate signal"""
-        try:
-            # Get current price (simulated)
-            current_price = self._get_current_price(symbol)
-            
-            # Generate technical indicators (simulated)
+    def score(self, features: np.ndarray, prices: np.ndarray) -> BatchSignals:
+        """Run the model over a symbols x FEATURES matrix"""
+        direction, confidence = self.model.predict(features)
+        return BatchSignals(direction=direction, confidence=confidence, target=_targets(np.asarray(prices, dtype=np.float64), direction))
+    
+    @staticmethod
+    def score_batch(features: np.ndarray, prices: np.ndarray) -> BatchSignals:
+        """
+        Apply the signal rules to a symbols x FEATURES matrix in one pass.
+        
+        Every rule is a boolean mask over all symbols; np.select picks the first matching
+        rule per row, which gives the same precedence as the per-symbol if/elif chain.
+        Confidence grows with how far the rule's driving feature is past its threshold,
+        so the same features always score the same.
+        """
+        features = np.asarray(features, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        
+        rsi, macd, bb = features[:, RSI], features[:, MACD], features[:, BB_POSITION]
+        volume, momentum, trend = features[:, VOLUME_SPIKE], features[:, MOMENTUM], features[:, TREND]
+        
+        masks = [
+            (rsi < 30) & (trend > 0),
+            (rsi > 70) & (trend < 0),
+            (momentum > 0.5) & (volume > 1.3),
+            (momentum < -0.5) & (volume > 1.2),
+            (macd > 0.2) & (bb < 0.3),
+            (macd < -0.2) & (bb > 0.7),
+        ]
+        directions = np.array([rule[0] for rule in RULES], dtype=np.int8)
+        bases = np.array([rule[1] for rule in RULES], dtype=np.float64)
+        extras = np.array([rule[2] for rule in RULES], dtype=np.float64)
+        drivers = np.array([rule[3] for rule in RULES])
+        thresholds = np.array([rule[4] for rule in RULES], dtype=np.float64)
+        scales = np.array([rule[5] for rule in RULES], dtype=np.float64)
+        
+        # Index of the winning rule per symbol, len(RULES) when none matches
+        rule = np.select(masks, np.arange(len(RULES)), default=len(RULES))
+        matched = rule < len(RULES)
+        rule = np.minimum(rule, len(RULES) - 1)
+        
+        # Strength 0..1: distance of the rule's driving feature past its threshold
+        driver = features[np.arange(len(rule)), drivers[rule]] if len(rule) else np.zeros(0)
+        strength = np.clip(np.abs(driver - thresholds[rule]) / scales[rule], 0.0, 1.0)
+        
+        direction = np.where(matched, directions[rule], 0).astype(np.int8)
+        confidence = np.where(matched, bases[rule] + strength * extras[rule], 0.0)
+        return BatchSignals(direction=direction, confidence=confidence, target=_targets(prices, direction))
+    
+    def _feature_matrix(self, symbols: List[str]) -> np.ndarray:
+        """Feature store values for all symbols as a symbols x FEATURES matrix; NaN rows score as hold"""
+        features = np.full((len(symbols), len(FEATURES)), np.nan)
+        for i, symbol in enumerate(symbols):
             analysis = self._calculate_technical_indicators(symbol)
-            
-            # Determine signal direction and confidence
-            direction, confidence = self._determine_signal(analysis)
-            
-            if confidence < self.confidence_threshold:
-                return None
-            
-            # Calculate target price
-            target_multiplier = 1.03 if direction == 'buy' else 0.97
-            target_price = current_price * target_multiplier
-            
-            return {
-                'coin': symbol.split('/')[0],
-                'symbol': symbol,
-                'direction': direction,
-                'confidence': round(confidence, 1),
-                'current_price': round(current_price, 4),
-                'target_price': round(target_price, 4),
-                'risk_level': self._get_risk_level(symbol),
-                'timeframe': self._get_timeframe(confidence),
-                'analysis': analysis,
-                'timestamp': datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"Error analyzing {symbol}: {e}")
-            return None
+            if analysis:
+                features[i] = [analysis['rsi'], analysis['macd'], analysis['bb_position'], analysis['volume_spike'],
+                               analysis['momentum'], TREND_CODES[analysis['trend']]]
+        return features
     
-    def _get_current_price(self, symbol: str) -> float:
-        """Get current price for symbol (demo implementation)"""
-        base_prices = {
-            'BTC/USDT': 43000,
-            'ETH/USDT': 2600,
-            'SOL/USDT': 100,
-            'ADA/USDT': 0.5,
-            'DOT/USDT': 7.5
+    def _build_signal(self, symbol: str, direction: int, confidence: float, current_price: float,
+                      target_price: float, features: np.ndarray) -> Dict:
+        analysis = {name: float(features[i]) for i, name in enumerate(FEATURES) if name != 'trend'}
+        analysis['trend'] = {1.0: 'bullish', -1.0: 'bearish'}.get(float(features[TREND]), 'neutral')
+        return {
+            'coin': symbol.split('/')[0],
+            'symbol': symbol,
+            'direction': DIRECTIONS[direction],
+            'confidence': round(confidence, 1),
+            'current_price': round(current_price, 4),
+            'target_price': round(target_price, 4),
+            'risk_level': self._get_risk_level(symbol),
+            'timeframe': self._get_timeframe(confidence),
+            'analysis': analysis,
+            'model': f"{self.model.name}@{self.model.version}",
+            'timestamp': datetime.now().isoformat()
         }
-        base = base_prices.get(symbol, 1000)
-        return base + np.random.normal(0, base * 0.005)
     
-    def _calculate_technical_indicators(self, symbol: str) -> Dict:
-        """Calculate technical indicators (simulated)"""
+    def _get_current_price(self, symbol: str) -> float:
+        """Get current price for symbol - the feature store's last tick (or bar) price, NaN before the first one"""
+        features = self.feature_store.get(symbol) or self._features(symbol)
+        return features.price if features is not None else np.nan
+    
+    def _features(self, symbol: str) -> Optional[Features]:
+        """Features of the series the model scores; tick models read the backfilled bars until ticks warm up"""
+        if self.timeframe == DEFAULT_TIMEFRAME:
+            return self.feature_store.latest(symbol)
+        return self.feature_store.get(symbol, self.timeframe)
+    
+    def _calculate_technical_indicators(self, symbol: str) -> Optional[Dict]:
+        """Latest technical indicators from the feature store; None until the symbol has warmed up"""
+        features = self._features(symbol)
+        if features is None or not features.ready:
+            return None
         return {
-            'rsi': np.random.uniform(25, 75),
-            'macd': np.random.uniform(-0.5, 0.5),
-            'bb_position': np.random.uniform(0, 1),
-            'volume_spike': np.random.uniform(0.8, 2.0),
-            'momentum': np.random.uniform(-1, 1),
-            'trend': np.random.choice(['bullish', 'bearish', 'neutral'], p=[0.4, 0.3, 0.3])
+            'rsi': features.rsi,
+            'macd': features.macd,
+            'bb_position': features.bb_position,
+            'volume_spike': features.volume_spike,
+            'momentum': features.momentum,
+            'trend': features.trend
         }
     
-    def _determine_signal(self, analysis: Dict) -> tuple:
-        """Determine signal direction and confidence based on analysis"""
-        confidence = 0
-        direction = 'hold'
-        
-        # RSI-based signals
-        if analysis['rsi'] < 30 and analysis['trend'] == 'bullish':
-            direction = 'buy'
-            confidence = 85 + np.random.uniform(0, 10)
-        elif analysis['rsi'] > 70 and analysis['trend'] == 'bearish':
-            direction = 'sell'
-            confidence = 75 + np.random.uniform(0, 15)
-        
-        # Momentum-based signals
-        elif analysis['momentum'] > 0.5 and analysis['volume_spike'] > 1.3:
-            direction = 'buy'
-            confidence = 70 + np.random.uniform(0, 15)
-        elif analysis['momentum'] < -0.5 and analysis['volume_spike'] > 1.2:
-            direction = 'sell'
-            confidence = 70 + np.random.uniform(0, 10)
-        
-        # MACD-based signals
-        elif analysis['macd'] > 0.2 and analysis['bb_position'] < 0.3:
-            direction = 'buy'
-            confidence = 75 + np.random.uniform(0, 10)
-        elif analysis['macd'] < -0.2 and analysis['bb_position'] > 0.7:
-            direction = 'sell'
-            confidence = 72 + np.random.uniform(0, 8)
-        
-        return direction, confidence
+    def _determine_signal(self, analysis: Dict) -> Tuple[str, float]:
+        """Determine signal direction and confidence based on analysis (a one-row batch through the model)"""
+        row = [analysis['rsi'], analysis['macd'], analysis['bb_position'], analysis['volume_spike'],
+               analysis['momentum'], TREND_CODES.get(analysis['trend'], 0.0)]
+        batch = self.score(np.array([row]), np.array([0.0]))
+        return DIRECTIONS[int(batch.direction[0])], float(batch.confidence[0])
     
     def _get_risk_level(self, symbol: str) -> str:
         """Determine risk level for symbol"""
@@ -144,14 +246,16 @@ class AISignalGenerator:
             return '2-6 hours'
     
     def get_signal_performance(self) -> Dict:
-        """Get performance metrics for generated signals"""
+        """Get performance metrics for generated signals, with outcomes of every signal so far"""
         if not self.signal_history:
-            return {'total_signals': 0, 'avg_confidence': 0}
+            return {'total_signals': 0, 'avg_confidence': 0, 'outcomes': self.ledger.get_stats()}
         
         return {
             'total_signals': len(self.signal_history),
             'avg_confidence': np.mean([s['confidence'] for s in self.signal_history]),
             'buy_signals': len([s for s in self.signal_history if s['direction'] == 'buy']),
             'sell_signals': len([s for s in self.signal_history if s['direction'] == 'sell']),
+            'model': self.model.describe(),
+            'outcomes': self.ledger.get_stats(),
             'last_updated': datetime.now().isoformat()
         }
@@ -14,6 +14,7 @@ class TradingConfig:
     # API Configuration
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 5000
+    API_WORKERS: int = 1  # >1 runs one engine process plus N API worker processes
     DEBUG: bool = True
     
     # Trading Configuration
@@ -22,6 +23,14 @@ class TradingConfig:
     MAX_TRADE_AMOUNT: float = 1000.0
     DEFAULT_RISK_LEVEL: str = "medium"
     
+    # Pre-trade risk limits (USD, net exposure per symbol/exchange/strategy)
+    RISK_MAX_ORDER_USD: float = 1000.0
+    RISK_MAX_SYMBOL_EXPOSURE: float = 3000.0
+    RISK_MAX_EXCHANGE_EXPOSURE: float = 5000.0
+    RISK_MAX_STRATEGY_EXPOSURE: float = 5000.0
+    RISK_MAX_OPEN_ORDERS: int = 10  # per exchange
+    RISK_MAX_DAILY_LOSS: float = 500.0
+    
     # Exchange API Keys
     BINANCE_API_KEY: str = "Neyube4xusslnwpAqM7IaiphFvPqDL8oX0S7fOx2Q3Npiq7eKSGQKJnzvJTQ5jok"
     BINANCE_SECRET: str = "KOWSrvPvlqv8C2UyKO0pGUZjPXPSi0FPobOdlsRRnHZcm2Q0SeHSjhatPeWzlmJa"
@@ -34,13 +43,31 @@ class TradingConfig:
     
     # Strategies
     AI_MIN_CONFIDENCE: float = 60.0
+    SIGNAL_MODEL_PATH: str = ""  # exported signal model (bot/models.py); empty = rule-based signals
+    SIGNAL_DB_PATH: str = "signals.db"  # every emitted signal and its outcome
+    SIGNAL_STOP_PCT: float = 2.0  # adverse move (%) that resolves a signal as stopped
+    SIGNAL_EXPIRY_HOURS: float = 6.0  # for signals without a known timeframe
     ARBITRAGE_MIN_PROFIT: float = 0.3
+    ARBITRAGE_COOLDOWN: float = 60.0  # seconds before a traded route is traded again
+    ARBITRAGE_PERSISTENCE: int = 2  # consecutive snapshots a spread must survive
+    ARBITRAGE_INVALIDATE_MOVE_PCT: float = 0.2  # quote move (%) that makes it a different spread
     AUTO_MODE_ENABLED: bool = True
     
     # Rate Limits
     API_RATE_LIMIT: int = 100  # requests per minute
     PRICE_UPDATE_INTERVAL: int = 5  # seconds
     STRATEGY_RUN_INTERVAL: int = 15  # seconds
+    STRATEGY_CPU_BUDGET_MS: float = 50.0  # per evaluation; over-budget strategies back off
+    STRATEGY_MAX_ERRORS: int = 5  # consecutive failures before a strategy is stopped
+    STRATEGY_SIGNAL_COOLDOWN: float = 300.0  # seconds before a strategy trades the same symbol/direction again
+    
+    # Market data
+    CANDLE_HISTORY: int = 1000  # bars kept per (exchange, symbol, timeframe)
+    BACKFILL_ENABLED: bool = True
+    BACKFILL_TIMEFRAME: str = "1m"
+    BACKFILL_BARS: int = 500  # history per (exchange, symbol) fetched at startup
+    BACKFILL_TIMEOUT: float = 30.0  # seconds before the monitor starts without a slow exchange
+    OHLCV_CACHE_DIR: str = "data/ohlcv"
     
     # Meme Radar Configuration
     MEME_RADAR_ENABLED: bool = True
@@ -58,14 +85,25 @@ class TradingConfig:
     WEBHOOK_TIMEOUT: int = 10  # seconds
     MAX_NOTIFICATION_HISTORY: int = 100
     
+    # Outbound HTTP (CoinGecko, Etherscan, Solana RPC, webhooks)
+    HTTP_POOL_LIMIT: int = 100  # open connections across all hosts
+    HTTP_POOL_PER_HOST: int = 10  # keep-alive connections per host
+    HTTP_DNS_TTL: int = 300  # seconds a host lookup is cached
+    HTTP_TIMEOUT: float = 10.0  # seconds per request
+    HTTP_RETRIES: int = 2  # retries for idempotent requests
+    
     # Auto Mode Configuration
     AUTO_VOLATILITY_THRESHOLD: float = 0.6
     AUTO_SPREAD_THRESHOLD: float = 0.5
     AUTO_CONFIDENCE_MIN: float = 70.0
+    AUTO_EVAL_INTERVAL: float = 5.0  # seconds between regime checks
+    AUTO_HYSTERESIS: float = 0.1  # band around each threshold, as a fraction of it
     
     # Trade Replay Configuration
     REPLAY_MAX_TRADES: int = 100
     REPLAY_METRICS_DAYS: int = 7
+    RECORD_SESSION_PATH: str = ""  # record polled prices here for later replay
+    REPLAY_SPEED: float = 100.0  # 1x - 1000x
 
 def load_config() -> TradingConfig:
     """Load configuration from environment variables"""
@@ -74,6 +112,7 @@ def load_config() -> TradingConfig:
     # Load from environment if available
     config.API_HOST = os.getenv('API_HOST', config.API_HOST)
     config.API_PORT = int(os.getenv('API_PORT', config.API_PORT))
+    config.API_WORKERS = int(os.getenv('API_WORKERS', config.API_WORKERS))
     config.DEBUG = os.getenv('DEBUG', 'true').lower() == 'true'
     
     # Trading config
@@ -81,6 +120,14 @@ def load_config() -> TradingConfig:
     config.MIN_TRADE_AMOUNT = float(os.getenv('MIN_TRADE_AMOUNT', config.MIN_TRADE_AMOUNT))
     config.MAX_TRADE_AMOUNT = float(os.getenv('MAX_TRADE_AMOUNT', config.MAX_TRADE_AMOUNT))
     
+    # Risk limits
+    config.RISK_MAX_ORDER_USD = float(os.getenv('RISK_MAX_ORDER_USD', config.RISK_MAX_ORDER_USD))
+    config.RISK_MAX_SYMBOL_EXPOSURE = float(os.getenv('RISK_MAX_SYMBOL_EXPOSURE', config.RISK_MAX_SYMBOL_EXPOSURE))
+    config.RISK_MAX_EXCHANGE_EXPOSURE = float(os.getenv('RISK_MAX_EXCHANGE_EXPOSURE', config.RISK_MAX_EXCHANGE_EXPOSURE))
+    config.RISK_MAX_STRATEGY_EXPOSURE = float(os.getenv('RISK_MAX_STRATEGY_EXPOSURE', config.RISK_MAX_STRATEGY_EXPOSURE))
+    config.RISK_MAX_OPEN_ORDERS = int(os.getenv('RISK_MAX_OPEN_ORDERS', config.RISK_MAX_OPEN_ORDERS))
+    config.RISK_MAX_DAILY_LOSS = float(os.getenv('RISK_MAX_DAILY_LOSS', config.RISK_MAX_DAILY_LOSS))
+    
     # API Keys - use defaults from config if not in environment
     config.BINANCE_API_KEY = os.getenv('BINANCE_API_KEY', config.BINANCE_API_KEY)
     config.BINANCE_SECRET = os.getenv('BINANCE_SECRET', config.BINANCE_SECRET)
@@ -93,9 +140,31 @@ def load_config() -> TradingConfig:
     
     # Strategy settings
     config.AI_MIN_CONFIDENCE = float(os.getenv('AI_MIN_CONFIDENCE', config.AI_MIN_CONFIDENCE))
+    config.SIGNAL_MODEL_PATH = os.getenv('SIGNAL_MODEL_PATH', config.SIGNAL_MODEL_PATH)
+    config.SIGNAL_DB_PATH = os.getenv('SIGNAL_DB_PATH', config.SIGNAL_DB_PATH)
+    config.SIGNAL_STOP_PCT = float(os.getenv('SIGNAL_STOP_PCT', config.SIGNAL_STOP_PCT))
+    config.SIGNAL_EXPIRY_HOURS = float(os.getenv('SIGNAL_EXPIRY_HOURS', config.SIGNAL_EXPIRY_HOURS))
     config.ARBITRAGE_MIN_PROFIT = float(os.getenv('ARBITRAGE_MIN_PROFIT', config.ARBITRAGE_MIN_PROFIT))
+    config.ARBITRAGE_COOLDOWN = float(os.getenv('ARBITRAGE_COOLDOWN', config.ARBITRAGE_COOLDOWN))
+    config.ARBITRAGE_PERSISTENCE = int(os.getenv('ARBITRAGE_PERSISTENCE', config.ARBITRAGE_PERSISTENCE))
+    config.ARBITRAGE_INVALIDATE_MOVE_PCT = float(os.getenv('ARBITRAGE_INVALIDATE_MOVE_PCT', config.ARBITRAGE_INVALIDATE_MOVE_PCT))
     config.AUTO_MODE_ENABLED = os.getenv('AUTO_MODE_ENABLED', 'true').lower() == 'true'
     
+    # Strategy runtime
+    config.PRICE_UPDATE_INTERVAL = int(os.getenv('PRICE_UPDATE_INTERVAL', config.PRICE_UPDATE_INTERVAL))
+    config.STRATEGY_RUN_INTERVAL = int(os.getenv('STRATEGY_RUN_INTERVAL', config.STRATEGY_RUN_INTERVAL))
+    config.STRATEGY_CPU_BUDGET_MS = float(os.getenv('STRATEGY_CPU_BUDGET_MS', config.STRATEGY_CPU_BUDGET_MS))
+    config.STRATEGY_MAX_ERRORS = int(os.getenv('STRATEGY_MAX_ERRORS', config.STRATEGY_MAX_ERRORS))
+    config.STRATEGY_SIGNAL_COOLDOWN = float(os.getenv('STRATEGY_SIGNAL_COOLDOWN', config.STRATEGY_SIGNAL_COOLDOWN))
+    
+    # Market data
+    config.CANDLE_HISTORY = int(os.getenv('CANDLE_HISTORY', config.CANDLE_HISTORY))
+    config.BACKFILL_ENABLED = os.getenv('BACKFILL_ENABLED', 'true').lower() == 'true'
+    config.BACKFILL_TIMEFRAME = os.getenv('BACKFILL_TIMEFRAME', config.BACKFILL_TIMEFRAME)
+    config.BACKFILL_BARS = int(os.getenv('BACKFILL_BARS', config.BACKFILL_BARS))
+    config.BACKFILL_TIMEOUT = float(os.getenv('BACKFILL_TIMEOUT', config.BACKFILL_TIMEOUT))
+    config.OHLCV_CACHE_DIR = os.getenv('OHLCV_CACHE_DIR', config.OHLCV_CACHE_DIR)
+    
     # Meme radar settings
     config.MEME_RADAR_ENABLED = os.getenv('MEME_RADAR_ENABLED', 'true').lower() == 'true'
     config.MEME_MAX_MARKET_CAP = float(os.getenv('MEME_MAX_MARKET_CAP', config.MEME_MAX_MARKET_CAP))
@@ -110,10 +179,23 @@ def load_config() -> TradingConfig:
     config.WEBHOOK_ENABLED = os.getenv('WEBHOOK_ENABLED', 'true').lower() == 'true'
     config.WEBHOOK_TIMEOUT = int(os.getenv('WEBHOOK_TIMEOUT', config.WEBHOOK_TIMEOUT))
     
+    # Outbound HTTP settings
+    config.HTTP_POOL_LIMIT = int(os.getenv('HTTP_POOL_LIMIT', config.HTTP_POOL_LIMIT))
+    config.HTTP_POOL_PER_HOST = int(os.getenv('HTTP_POOL_PER_HOST', config.HTTP_POOL_PER_HOST))
+    config.HTTP_DNS_TTL = int(os.getenv('HTTP_DNS_TTL', config.HTTP_DNS_TTL))
+    config.HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', config.HTTP_TIMEOUT))
+    config.HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', config.HTTP_RETRIES))
+    
     # Auto mode settings
     config.AUTO_VOLATILITY_THRESHOLD = float(os.getenv('AUTO_VOLATILITY_THRESHOLD', config.AUTO_VOLATILITY_THRESHOLD))
     config.AUTO_SPREAD_THRESHOLD = float(os.getenv('AUTO_SPREAD_THRESHOLD', config.AUTO_SPREAD_THRESHOLD))
     config.AUTO_CONFIDENCE_MIN = float(os.getenv('AUTO_CONFIDENCE_MIN', config.AUTO_CONFIDENCE_MIN))
+    config.AUTO_EVAL_INTERVAL = float(os.getenv('AUTO_EVAL_INTERVAL', config.AUTO_EVAL_INTERVAL))
+    config.AUTO_HYSTERESIS = float(os.getenv('AUTO_HYSTERESIS', config.AUTO_HYSTERESIS))
+    
+    # Session recording / replay
+    config.RECORD_SESSION_PATH = os.getenv('RECORD_SESSION_PATH', config.RECORD_SESSION_PATH)
+    config.REPLAY_SPEED = float(os.getenv('REPLAY_SPEED', config.REPLAY_SPEED))
     
     return config
 
@@ -0,0 +1,189 @@
+"""
+Arbitrage Executor
+Author: Mattiaz
+Description: Sends both legs of an arbitrage concurrently against pre-fetched quotes, tracks leg
+             state and unwinds or hedges when only one leg fills
+"""
+
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.clock import clock
+from core.metrics import Histogram
+from core.tracing import Trace
+
+logger = logging.getLogger(__name__)
+
+# place_order(exchange, symbol, side, amount_usd, price, strategy, confidence, trace) -> (success, message)
+PlaceOrder = Callable[[str, str, str, float, float, str, float, Optional[Trace]], Tuple[bool, str]]
+
+OPPOSITE_SIDE = {'buy': 'sell', 'sell': 'buy'}
+
+
+@dataclass
+class Leg:
+    exchange: str
+    side: str
+    price: float
+    amount_usd: float
+    role: str = 'entry'  # entry, unwind, hedge
+    state: str = 'pending'  # pending -> submitted -> filled | failed
+    message: str = ''
+    latency_ms: float = 0.0
+
+
+@dataclass
+class ArbitrageExecution:
+    symbol: str
+    buy: Leg
+    sell: Leg
+    state: str = 'pending'  # filled, failed, unwound, hedged, exposed
+    recovery: List[Leg] = field(default_factory=list)
+    latency_ms: float = 0.0
+    timestamp: str = ''
+
+    @property
+    def success(self) -> bool:
+        return self.state == 'filled'
+
+    @property
+    def message(self) -> str:
+        if self.state == 'filled':
+            return f"✅ Arbitrage executed: {self.symbol} buy {self.buy.exchange} @ {self.buy.price:.4f}, " \
+                   f"sell {self.sell.exchange} @ {self.sell.price:.4f} in {self.latency_ms:.0f}ms"
+        failed = [leg for leg in (self.buy, self.sell) if leg.state == 'failed']
+        reasons = '; '.join(f"{leg.side} on {leg.exchange}: {leg.message}" for leg in failed)
+        return f"❌ Arbitrage {self.state}: {reasons}"
+
+    def to_dict(self) -> Dict:
+        return {**asdict(self), 'success': self.success, 'message': self.message}
+
+
+class ArbitrageExecutor:
+    """
+    Both legs are submitted at the same time against the quotes the opportunity was
+    found on, so execution takes one round-trip of the slower leg instead of
+    buy + delay + re-quote + sell.
+
+    When exactly one leg fills the position is flattened: first by reversing the filled
+    leg on its own exchange (unwind), then on the other exchanges we have quotes for
+    (hedge). If every attempt fails the execution is reported as 'exposed'.
+    """
+
+    def __init__(self, place_order: PlaceOrder, executor: Optional[ThreadPoolExecutor] = None,
+                 leg_timeout: float = 10.0, history: int = 100):
+        self.place_order = place_order
+        self.executor = executor or ThreadPoolExecutor(max_workers=4, thread_name_prefix='arbitrage')
+        self.leg_timeout = leg_timeout
+        self.history = deque(maxlen=history)
+        self.leg_latency: Dict[str, Histogram] = {}
+        self.outcomes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def execute(self, opportunity: Dict, quotes: Optional[Dict[str, float]] = None,
+                trace: Optional[Trace] = None) -> ArbitrageExecution:
+        """
+        Execute an opportunity from find_enhanced_arbitrage_opportunities().
+
+        `quotes` ({exchange: price}) are the prices the opportunity was found on; they are
+        used to price the unwind/hedge legs without another round of fetches. Each entry
+        leg continues its own fork of `trace`.
+        """
+        symbol = opportunity['symbol']
+        amount_usd = opportunity['position_size']
+        confidence = opportunity.get('confidence', 0.8)
+        execution = ArbitrageExecution(
+            symbol=symbol,
+            buy=Leg(opportunity['buy_exchange'], 'buy', opportunity['buy_price'], amount_usd),
+            sell=Leg(opportunity['sell_exchange'], 'sell', opportunity['sell_price'], amount_usd),
+            timestamp=clock.now().isoformat()
+        )
+        started = clock.monotonic()
+
+        self._run_legs(symbol, [execution.buy, execution.sell], confidence, trace)
+
+        filled = [leg for leg in (execution.buy, execution.sell) if leg.state == 'filled']
+        if len(filled) == 2:
+            execution.state = 'filled'
+        elif not filled:
+            execution.state = 'failed'
+        else:
+            execution.state = self._flatten(execution, filled[0], quotes or {}, confidence)
+
+        execution.latency_ms = round((clock.monotonic() - started) * 1000, 3)
+        self._record(execution)
+        return execution
+
+    def _run_legs(self, symbol: str, legs: List[Leg], confidence: float, trace: Optional[Trace] = None):
+        traces = [trace.fork() if trace is not None else None for _ in legs]
+
+        # Replays run the legs in order so the same session gives the same trades
+        if clock.virtual:
+            for leg, leg_trace in zip(legs, traces):
+                self._place(symbol, leg, confidence, leg_trace)
+            return
+
+        futures = [self.executor.submit(self._place, symbol, leg, confidence, leg_trace)
+                   for leg, leg_trace in zip(legs, traces)]
+        for leg, future in zip(legs, futures):
+            try:
+                future.result(timeout=self.leg_timeout)
+            except Exception as e:
+                # Timed out: the order may still fill, but we treat it as failed and flatten
+                leg.state = 'failed'
+                leg.message = f"no ack within {self.leg_timeout}s ({type(e).__name__})"
+
+    def _place(self, symbol: str, leg: Leg, confidence: float, trace: Optional[Trace] = None):
+        leg.state = 'submitted'
+        started = clock.monotonic()
+        try:
+            success, message = self.place_order(leg.exchange, symbol, leg.side, leg.amount_usd,
+                                                leg.price, 'arbitrage', confidence, trace)
+        except Exception as e:
+            success, message = False, str(e)
+        leg.latency_ms = round((clock.monotonic() - started) * 1000, 3)
+        leg.state = 'filled' if success else 'failed'
+        leg.message = message
+
+    def _flatten(self, execution: ArbitrageExecution, filled: Leg, quotes: Dict[str, float],
+                 confidence: float) -> str:
+        """Reverse the one filled leg; returns the resulting execution state"""
+        side = OPPOSITE_SIDE[filled.side]
+        logger.warning(f"⚠️ Arbitrage {execution.symbol}: only the {filled.side} leg filled - unwinding")
+
+        candidates = [(filled.exchange, 'unwind')]
+        candidates += [(exchange, 'hedge') for exchange in sorted(quotes) if exchange != filled.exchange]
+        for exchange, role in candidates:
+            leg = Leg(exchange, side, quotes.get(exchange, filled.price), filled.amount_usd, role=role)
+            execution.recovery.append(leg)
+            self._place(execution.symbol, leg, confidence)
+            if leg.state == 'filled':
+                return 'unwound' if role == 'unwind' else 'hedged'
+
+        logger.error(f"❌ Arbitrage {execution.symbol}: could not flatten {filled.side} "
+                     f"${filled.amount_usd} on {filled.exchange} - position is exposed")
+        return 'exposed'
+
+    def _record(self, execution: ArbitrageExecution):
+        with self._lock:
+            self.history.append(execution)
+            self.outcomes[execution.state] = self.outcomes.get(execution.state, 0) + 1
+            for leg in [execution.buy, execution.sell] + execution.recovery:
+                if leg.state in ('filled', 'failed'):
+                    key = f"{leg.exchange}:{leg.role}"
+                    histogram = self.leg_latency.get(key)
+                    if histogram is None:
+                        histogram = self.leg_latency[key] = Histogram()
+                    histogram.observe(leg.latency_ms / 1000)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'outcomes': dict(self.outcomes),
+                'leg_latency': {key: histogram.snapshot() for key, histogram in self.leg_latency.items()},
+                'recent': [execution.to_dict() for execution in list(self.history)[-10:]]
+            }
@@ -0,0 +1,174 @@
+"""
+OHLCV Backfill
+Author: Mattiaz
+Description: Pulls recent OHLCV history for every monitored symbol and exchange at startup - one
+             rate-limited worker per exchange, on-disk cache so later starts only fetch the missing
+             tail - and seeds the feature store and candle aggregator with it
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import settings
+from core.candles import TIMEFRAMES, CandleAggregator, candle_aggregator
+from core.features import FeatureStore, feature_store
+
+logger = logging.getLogger(__name__)
+
+EMPTY = np.empty((0, 6))  # ms timestamp, open, high, low, close, volume
+
+
+class OHLCVBackfill:
+    """
+    run() fetches the last `bars` closed candles of `timeframe` per (exchange, symbol).
+
+    Exchanges are fetched concurrently, the symbols of one exchange one after the other,
+    so each venue sees a single client paced by ccxt's rate limiter (or by its rateLimit
+    when the instance has enableRateLimit off). History is paged with `since` and kept
+    in one .npy file per series; with a cache only candles newer than the last cached
+    one are requested. The candle still forming is never cached.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, timeframe: Optional[str] = None,
+                 bars: Optional[int] = None, page_size: int = 500, timeout: Optional[float] = None):
+        self.cache_dir = settings.OHLCV_CACHE_DIR if cache_dir is None else cache_dir
+        self.timeframe = settings.BACKFILL_TIMEFRAME if timeframe is None else timeframe
+        self.bars = settings.BACKFILL_BARS if bars is None else bars
+        self.page_size = page_size
+        self.timeout = settings.BACKFILL_TIMEOUT if timeout is None else timeout
+        self.stats: Dict[str, Dict] = {}
+
+    @property
+    def timeframe_ms(self) -> int:
+        return TIMEFRAMES[self.timeframe] * 1000
+
+    def run(self, exchanges: Dict[str, Any], symbols: List[str], store: FeatureStore = feature_store,
+            candles: CandleAggregator = candle_aggregator) -> Dict[str, Dict]:
+        """Backfill, cache and seed; returns per-series stats. Demo exchanges are skipped."""
+        live = {name: exchange for name, exchange in exchanges.items() if hasattr(exchange, 'fetch_ohlcv')}
+        if not live:
+            return {}
+
+        started = time.monotonic()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        pool = ThreadPoolExecutor(max_workers=len(live), thread_name_prefix='backfill')
+        futures = {pool.submit(self._backfill_exchange, name, exchange, symbols): name for name, exchange in live.items()}
+        done, pending = wait(futures, timeout=self.timeout)
+        pool.shutdown(wait=False)  # stragglers finish in the background and still update the cache
+
+        history: Dict[Tuple[str, str], np.ndarray] = {}
+        for future in done:
+            try:
+                history.update(future.result())
+            except Exception as e:
+                logger.error(f"Backfill failed for {futures[future]}: {e}")
+        for future in pending:
+            logger.warning(f"⏱️ Backfill for {futures[future]} still running after {self.timeout:.0f}s - starting without it")
+
+        self._seed(history, symbols, store, candles)
+        logger.info(f"📚 Backfilled {len(history)} series ({sum(len(rows) for rows in history.values())} "
+                    f"{self.timeframe} candles) in {time.monotonic() - started:.1f}s")
+        return self.stats
+
+    def _backfill_exchange(self, name: str, exchange, symbols: List[str]) -> Dict[Tuple[str, str], np.ndarray]:
+        # Pace requests ourselves only if ccxt isn't doing it
+        interval = 0.0 if getattr(exchange, 'enableRateLimit', False) else getattr(exchange, 'rateLimit', 0) / 1000
+        last_call = 0.0
+        history = {}
+
+        for symbol in symbols:
+            series_started = time.monotonic()
+            cached = self._load(name, symbol)
+            now_ms = int(time.time() * 1000)
+            since = int(cached[-1, 0]) + self.timeframe_ms if len(cached) else now_ms - self.bars * self.timeframe_ms
+            pages, fetched = 0, []
+
+            try:
+                while since < now_ms - self.timeframe_ms:
+                    wait_for = last_call + interval - time.monotonic()
+                    if wait_for > 0:
+                        time.sleep(wait_for)
+                    last_call = time.monotonic()
+                    rows = exchange.fetch_ohlcv(symbol, self.timeframe, since=since, limit=self.page_size)
+                    pages += 1
+                    if not rows:
+                        break
+                    fetched.extend(rows)
+                    since = int(rows[-1][0]) + self.timeframe_ms
+                    if len(rows) < self.page_size:
+                        break
+            except Exception as e:
+                logger.warning(f"⚠️ OHLCV fetch for {symbol} on {name} stopped after {pages} pages: {e}")
+
+            rows = self._merge(cached, fetched, now_ms)
+            if len(fetched):
+                self._save(name, symbol, rows)
+            history[(name, symbol)] = rows
+            self.stats[f"{name}:{symbol}"] = {
+                'cached': len(cached),
+                'fetched': len(fetched),
+                'pages': pages,
+                'bars': len(rows),
+                'seconds': round(time.monotonic() - series_started, 2)
+            }
+
+        return history
+
+    def _merge(self, cached: np.ndarray, fetched: List, now_ms: int) -> np.ndarray:
+        """Cached + fetched rows: closed candles only, one per timestamp, newest `bars` kept"""
+        rows = np.array(fetched, dtype=np.float64).reshape(-1, 6) if fetched else EMPTY
+        rows = np.concatenate((cached, rows)) if len(cached) else rows
+        rows = rows[rows[:, 0] + self.timeframe_ms <= now_ms]
+        # np.unique keeps the first of equal timestamps; search the reversed rows so fresh data wins
+        _, index = np.unique(rows[::-1, 0], return_index=True)
+        rows = rows[::-1][index]
+        return rows[-self.bars:]
+
+    def _path(self, exchange: str, symbol: str) -> str:
+        return os.path.join(self.cache_dir, f"{exchange}_{symbol.replace('/', '-')}_{self.timeframe}.npy")
+
+    def _load(self, exchange: str, symbol: str) -> np.ndarray:
+        path = self._path(exchange, symbol)
+        try:
+            rows = np.load(path)
+            return rows if rows.ndim == 2 and rows.shape[1] == 6 else EMPTY
+        except FileNotFoundError:
+            return EMPTY
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable OHLCV cache {path}: {e}")
+            return EMPTY
+
+    def _save(self, exchange: str, symbol: str, rows: np.ndarray):
+        path = self._path(exchange, symbol)
+        try:
+            # Write and rename so a crash never leaves half a cache file behind
+            with open(path + '.tmp', 'wb') as f:
+                np.save(f, rows)
+            os.replace(path + '.tmp', path)
+        except Exception as e:
+            logger.error(f"Failed to write OHLCV cache {path}: {e}")
+
+    def _seed(self, history: Dict[Tuple[str, str], np.ndarray], symbols: List[str],
+              store: FeatureStore, candles: CandleAggregator):
+        """
+        Candles go to the aggregator per exchange; the feature store's series for this
+        timeframe (not the live 'tick' series) gets the mean close across exchanges per
+        candle, and the live bars continue it from there.
+        """
+        for (exchange, symbol), rows in history.items():
+            candles.load(exchange, symbol, self.timeframe, rows)
+
+        for symbol in symbols:
+            series = [rows for (_, sym), rows in history.items() if sym == symbol and len(rows)]
+            if not series:
+                continue
+            rows = np.concatenate(series)
+            times, inverse = np.unique(rows[:, 0], return_inverse=True)
+            closes = np.bincount(inverse, weights=rows[:, 4]) / np.bincount(inverse)
+            for timestamp, close in zip(times.tolist(), closes.tolist()):
+                store.update(symbol, close, self.timeframe, timestamp=timestamp / 1000)
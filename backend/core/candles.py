@@ -0,0 +1,253 @@
+"""
+Candle Aggregator
+Author: Mattiaz
+Description: Streaming OHLCV bars per (exchange, symbol) for 1s to 1d timeframes, built from the
+             price ticks in O(1) per tick, kept in fixed-size ring buffers and served downsampled
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import settings
+from core.clock import clock
+
+logger = logging.getLogger(__name__)
+
+TIMEFRAMES = {'1s': 1, '1m': 60, '5m': 300, '15m': 900, '1h': 3600, '1d': 86400}
+COLUMNS = ('time', 'open', 'high', 'low', 'close', 'volume', 'ticks')
+TIME, OPEN, HIGH, LOW, CLOSE, VOLUME, TICKS = range(len(COLUMNS))
+
+
+@dataclass(frozen=True)
+class Candle:
+    exchange: str
+    symbol: str
+    timeframe: str
+    time: float  # bar open, seconds since the epoch (UTC-aligned)
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    ticks: int
+
+    def to_dict(self) -> Dict:
+        return {
+            'exchange': self.exchange,
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'time': self.time,
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume,
+            'ticks': self.ticks
+        }
+
+
+class _Series:
+    """One timeframe of one (exchange, symbol): the open bar plus a ring of finalized bars"""
+
+    __slots__ = ('seconds', 'bars', 'head', 'count', 'start', 'open', 'high', 'low', 'close', 'volume', 'ticks')
+
+    def __init__(self, seconds: int, capacity: int):
+        self.seconds = seconds
+        self.bars = np.empty((capacity, len(COLUMNS)))
+        self.head = 0  # next slot to write
+        self.count = 0
+        self.start: Optional[float] = None
+        self.open = self.high = self.low = self.close = self.volume = 0.0
+        self.ticks = 0
+
+    def roll(self):
+        """Move the open bar into the ring"""
+        row = self.bars[self.head]
+        row[TIME], row[OPEN], row[HIGH], row[LOW], row[CLOSE] = self.start, self.open, self.high, self.low, self.close
+        row[VOLUME], row[TICKS] = self.volume, self.ticks
+        self.head = (self.head + 1) % len(self.bars)
+        self.count = min(self.count + 1, len(self.bars))
+
+    def history(self) -> np.ndarray:
+        """Finalized bars, oldest first"""
+        if self.count < len(self.bars):
+            return self.bars[:self.count].copy()
+        return np.concatenate((self.bars[self.head:], self.bars[:self.head]))
+
+
+def downsample(bars: np.ndarray, max_points: int) -> Tuple[np.ndarray, int]:
+    """
+    Merge runs of consecutive bars so at most `max_points` remain, keeping OHLC semantics
+    (first open, highest high, lowest low, last close, summed volume). Groups are aligned
+    to the newest bar, so only the oldest group can be partial. Returns (bars, group size).
+    """
+    n = len(bars)
+    if max_points <= 0 or n <= max_points:
+        return bars, 1
+    group = -(-n // max_points)
+    first = n % group
+    starts = np.arange(first, n, group)
+    if first:
+        starts = np.concatenate(([0], starts))
+    ends = np.append(starts[1:], n) - 1
+
+    merged = np.empty((len(starts), len(COLUMNS)))
+    merged[:, TIME] = bars[starts, TIME]
+    merged[:, OPEN] = bars[starts, OPEN]
+    merged[:, HIGH] = np.maximum.reduceat(bars[:, HIGH], starts)
+    merged[:, LOW] = np.minimum.reduceat(bars[:, LOW], starts)
+    merged[:, CLOSE] = bars[ends, CLOSE]
+    merged[:, VOLUME] = np.add.reduceat(bars[:, VOLUME], starts)
+    merged[:, TICKS] = np.add.reduceat(bars[:, TICKS], starts)
+    return merged, group
+
+
+class CandleAggregator:
+    """
+    Builds OHLCV bars for every timeframe from the tick stream.
+
+    on_tick() does a constant amount of work per timeframe: extend the open bar, or
+    roll it into the ring buffer when the tick falls into the next bucket. Buckets
+    with no ticks produce no bar. Each finalized bar is passed to the listeners,
+    outside the lock; late ticks for an already finalized bucket are dropped.
+    """
+
+    def __init__(self, timeframes: Optional[List[str]] = None, history: Optional[int] = None):
+        self.timeframes = {name: TIMEFRAMES[name] for name in (timeframes or TIMEFRAMES)}
+        self.history = settings.CANDLE_HISTORY if history is None else history
+        self._series: Dict[Tuple[str, str, str], _Series] = {}
+        self._listeners: List[Callable[[Candle], None]] = []
+        self.counts = {'ticks': 0, 'bars': 0, 'late_ticks': 0}
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[Candle], None]):
+        """Called with every finalized Candle"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Candle], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def on_quotes(self, symbol: str, exchange_prices: Dict[str, float], timestamp: Optional[float] = None):
+        timestamp = clock.time() if timestamp is None else timestamp
+        for exchange, price in exchange_prices.items():
+            self.on_tick(exchange, symbol, price, timestamp)
+
+    def on_tick(self, exchange: str, symbol: str, price: float, timestamp: Optional[float] = None, volume: float = 0.0):
+        timestamp = clock.time() if timestamp is None else timestamp
+        price = float(price)
+        finalized = []
+
+        with self._lock:
+            self.counts['ticks'] += 1
+            for timeframe, seconds in self.timeframes.items():
+                key = (exchange, symbol, timeframe)
+                series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = _Series(seconds, self.history)
+
+                bucket = timestamp - timestamp % seconds
+                if series.start is not None and bucket == series.start:
+                    if price > series.high:
+                        series.high = price
+                    elif price < series.low:
+                        series.low = price
+                    series.close = price
+                    series.volume += volume
+                    series.ticks += 1
+                    continue
+                if series.start is not None:
+                    if bucket < series.start:
+                        self.counts['late_ticks'] += 1
+                        continue
+                    series.roll()
+                    self.counts['bars'] += 1
+                    if self._listeners:
+                        finalized.append(Candle(exchange, symbol, timeframe, series.start, series.open, series.high,
+                                                series.low, series.close, series.volume, series.ticks))
+                series.start = bucket
+                series.open = series.high = series.low = series.close = price
+                series.volume = volume
+                series.ticks = 1
+
+        for candle in finalized:
+            for listener in self._listeners:
+                try:
+                    listener(candle)
+                except Exception as e:
+                    logger.error(f"Candle listener failed: {e}")
+
+    def load(self, exchange: str, symbol: str, timeframe: str, rows: np.ndarray):
+        """
+        Put historical bars (ms timestamp, open, high, low, close, volume rows, oldest first)
+        into a series ring before live ticks start - used by the OHLCV backfill
+        """
+        if timeframe not in self.timeframes or not len(rows):
+            return
+        with self._lock:
+            key = (exchange, symbol, timeframe)
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(self.timeframes[timeframe], self.history)
+            for row in rows[-self.history:]:
+                if series.start is not None and row[0] / 1000 >= series.start:
+                    break
+                slot = series.bars[series.head]
+                slot[TIME] = row[0] / 1000
+                slot[OPEN:VOLUME + 1] = row[1:6]
+                slot[TICKS] = 0
+                series.head = (series.head + 1) % len(series.bars)
+                series.count = min(series.count + 1, len(series.bars))
+
+    def exchanges(self, symbol: str) -> List[str]:
+        with self._lock:
+            return sorted({exchange for exchange, sym, _ in self._series if sym == symbol})
+
+    def get_candles(self, symbol: str, timeframe: str = '1m', exchange: Optional[str] = None,
+                    limit: Optional[int] = None, max_points: Optional[int] = None,
+                    include_open: bool = True) -> Dict:
+        """
+        Bars for one series, oldest first. Without `exchange` the first exchange with data
+        (binance when present) is used. `limit` keeps the newest bars, `max_points` then
+        downsamples what is left for charting.
+        """
+        if timeframe not in self.timeframes:
+            raise ValueError(f"Unknown timeframe {timeframe}, expected one of {', '.join(self.timeframes)}")
+        exchanges = self.exchanges(symbol)
+        if exchange is None and exchanges:
+            exchange = 'binance' if 'binance' in exchanges else exchanges[0]
+
+        with self._lock:
+            series = self._series.get((exchange, symbol, timeframe))
+            if series is None:
+                bars = np.empty((0, len(COLUMNS)))
+            else:
+                bars = series.history()
+                if include_open and series.start is not None:
+                    bars = np.vstack((bars, [[series.start, series.open, series.high, series.low, series.close,
+                                              series.volume, series.ticks]]))
+
+        if limit:
+            bars = bars[-limit:]
+        bars, group = downsample(bars, max_points or 0)
+
+        return {
+            'symbol': symbol,
+            'exchange': exchange,
+            'timeframe': timeframe,
+            'exchanges': exchanges,
+            'bars_per_point': group,
+            'candles': [
+                {'time': row[TIME], 'open': row[OPEN], 'high': row[HIGH], 'low': row[LOW], 'close': row[CLOSE],
+                 'volume': row[VOLUME], 'ticks': int(row[TICKS])}
+                for row in bars.tolist()
+            ]
+        }
+
+
+# Global instance
+candle_aggregator = CandleAggregator()
@@ -0,0 +1,228 @@
+"""
+Clock - Swappable Time Source
+Author: Mattiaz
+Description: Wall-clock and virtual time for the trading loops, so recorded sessions can be replayed
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Name of the scheduled loop running in the current thread / asyncio task
+_participant: contextvars.ContextVar = contextvars.ContextVar('clock_participant', default=None)
+
+
+class SystemClock:
+    """Real time - used for live and sandbox trading"""
+
+    # Virtual clocks run concurrent work in a fixed order so replays are reproducible
+    virtual = False
+
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+    async def asleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    def attach(self, name: str):
+        pass
+
+    async def aattach(self, name: str):
+        pass
+
+    def detach(self):
+        pass
+
+
+class ReplayClock(SystemClock):
+    """
+    Discrete-event virtual clock.
+
+    Loops that call attach() become scheduled participants: only one of them runs at a
+    time, and virtual time jumps to the next wake-up once all of them are sleeping. Ties
+    are broken by participant name, so a replay makes the same decisions on every run
+    regardless of how long the loop bodies take in real time. `speed` paces the jumps
+    against the wall clock (100 = one hour of trading in 36 seconds).
+    """
+
+    virtual = True
+
+    def __init__(self, start_time: float, speed: float = 100.0):
+        if speed <= 0:
+            raise ValueError("Replay speed must be positive")
+
+        self.speed = speed
+        self._now = start_time
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[float, str, int, bool, Callable[[], None]]] = []
+        self._seq = itertools.count()
+        self._participants = 0
+        self._running = 0
+        self._stopped = False
+
+    def time(self) -> float:
+        return self._now
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self._now)
+
+    def attach(self, name: str):
+        """Register the calling thread as a participant and wait for its first turn"""
+        _participant.set(name)
+        with self._cond:
+            self._participants += 1
+            self._running += 1
+        self.sleep(0)
+
+    async def aattach(self, name: str):
+        """Register the calling asyncio task as a participant and wait for its first turn"""
+        _participant.set(name)
+        with self._cond:
+            self._participants += 1
+            self._running += 1
+        await self.asleep(0)
+
+    def detach(self):
+        if _participant.get() is None:
+            return
+        _participant.set(None)
+        with self._cond:
+            self._participants -= 1
+            self._running -= 1
+            self._cond.notify_all()
+
+    def sleep(self, seconds: float):
+        wakeup = threading.Event()
+        self._schedule(seconds, wakeup.set)
+        wakeup.wait()
+
+    async def asleep(self, seconds: float):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resume():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        self._schedule(seconds, resume)
+        await future
+
+    def _schedule(self, seconds: float, resume: Callable[[], None]):
+        name = _participant.get()
+        with self._cond:
+            entry = (self._now + max(seconds, 0), name or '', next(self._seq), name is not None, resume)
+            heapq.heappush(self._queue, entry)
+            if name is not None:
+                self._running -= 1
+            self._cond.notify_all()
+
+    def run_until(self, end_time: Optional[float] = None, participants: int = 1):
+        """
+        Drive virtual time until `end_time` (or until nothing is left to wake).
+
+        Blocks until `participants` loops have attached, then repeatedly wakes the
+        earliest sleeper once every participant is idle.
+        """
+        real_start = time.monotonic()
+        virtual_start = self._now
+
+        with self._cond:
+            self._cond.wait_for(lambda: self._stopped or self._participants >= participants)
+
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopped or self._running <= 0)
+                if self._stopped or not self._queue:
+                    break
+                wake_at = self._queue[0][0]
+                if end_time is not None and wake_at > end_time:
+                    break
+
+            # Pace against the wall clock outside the lock; every participant is asleep
+            delay = real_start + (wake_at - virtual_start) / self.speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self._cond:
+                wake_at, _, _, is_participant, resume = heapq.heappop(self._queue)
+                self._now = max(self._now, wake_at)
+                if is_participant:
+                    self._running += 1
+            resume()
+
+        if end_time is not None:
+            self._now = max(self._now, end_time)
+        logger.info(f"Replay clock stopped at {self.now().isoformat()}")
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+
+class Clock:
+    """Process-wide clock facade; install a ReplayClock to run the engine on virtual time"""
+
+    def __init__(self):
+        self._backend: SystemClock = SystemClock()
+
+    @property
+    def backend(self) -> SystemClock:
+        return self._backend
+
+    def install(self, backend: SystemClock):
+        self._backend = backend
+        logger.info(f"Clock backend set to {type(backend).__name__}")
+
+    def reset(self):
+        self._backend = SystemClock()
+
+    @property
+    def virtual(self) -> bool:
+        return self._backend.virtual
+
+    def time(self) -> float:
+        return self._backend.time()
+
+    def monotonic(self) -> float:
+        return self._backend.monotonic()
+
+    def now(self) -> datetime:
+        return self._backend.now()
+
+    def sleep(self, seconds: float):
+        self._backend.sleep(seconds)
+
+    async def asleep(self, seconds: float):
+        await self._backend.asleep(seconds)
+
+    def attach(self, name: str):
+        self._backend.attach(name)
+
+    async def aattach(self, name: str):
+        await self._backend.aattach(name)
+
+    def detach(self):
+        self._backend.detach()
+
+# Global instance
+clock = Clock()
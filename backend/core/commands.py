@@ -0,0 +1,101 @@
+"""
+Engine Command Queue
+Author: Mattiaz
+Description: Routes state-changing requests from API worker processes to the single engine
+             process and their results back
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class CommandError(Exception):
+    """A command failed in the engine; carries the HTTP status it failed with"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class CommandServer:
+    """
+    Engine side: executes commands from all workers on the engine's event loop. Workers
+    share one command queue and each has its own reply queue.
+    """
+
+    def __init__(self, commands, replies: List):
+        self._commands = commands
+        self._replies = replies
+
+    def start(self, handler: Callable[[str, Any], Awaitable[Any]]):
+        loop = asyncio.get_running_loop()
+        threading.Thread(target=self._pump, args=(loop, handler), name='command-server', daemon=True).start()
+
+    def _pump(self, loop: asyncio.AbstractEventLoop, handler):
+        while True:
+            worker_id, request_id, name, payload = self._commands.get()
+            future = asyncio.run_coroutine_threadsafe(self._run(handler, name, payload), loop)
+            future.add_done_callback(
+                lambda done, worker_id=worker_id, request_id=request_id:
+                    self._replies[worker_id].put((request_id, done.result()))
+            )
+
+    async def _run(self, handler, name: str, payload: Any):
+        try:
+            return ('ok', await handler(name, payload))
+        except Exception as e:
+            status_code = getattr(e, 'status_code', 500)
+            detail = getattr(e, 'detail', None) or str(e)
+            if status_code >= 500:
+                logger.error(f"Command {name} failed: {detail}")
+            return ('error', status_code, detail)
+
+
+class CommandClient:
+    """Worker side: awaitable calls into the engine process"""
+
+    def __init__(self, worker_id: int, commands, replies, timeout: float = 10.0):
+        self.worker_id = worker_id
+        self.timeout = timeout
+        self._commands = commands
+        self._replies = replies
+        self._ids = itertools.count()
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._loop = None
+
+    async def call(self, name: str, payload: Any = None) -> Any:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            threading.Thread(target=self._receive, name='command-client', daemon=True).start()
+
+        request_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        self._commands.put((self.worker_id, request_id, name, payload))
+
+        try:
+            reply = await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            raise CommandError(504, f"Engine did not answer {name} within {self.timeout}s")
+        finally:
+            self._pending.pop(request_id, None)
+
+        if reply[0] == 'error':
+            raise CommandError(reply[1], reply[2])
+        return reply[1]
+
+    def _receive(self):
+        while True:
+            request_id, reply = self._replies.get()
+            self._loop.call_soon_threadsafe(self._resolve, request_id, reply)
+
+    def _resolve(self, request_id: int, reply):
+        future = self._pending.get(request_id)
+        if future is not None and not future.done():
+            future.set_result(reply)
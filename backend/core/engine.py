@@ -0,0 +1,514 @@
+"""
+Trading Engine - Strategy Runtime
+Author: Mattiaz
+Description: Runs arbitrage, AI-signal, meme and auto strategies as independent tasks over one shared
+             market snapshot, with hot add/remove/swap, a CPU budget and latency metrics per strategy
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from bot.signal_ledger import signal_ledger
+from config.settings import settings
+from core.arbitrage import ArbitrageExecutor
+from core.candles import candle_aggregator
+from core.clock import clock
+from core.features import feature_store
+from core.ledger import Ledger
+from core.metrics import Histogram
+from core.opportunities import OpportunityRegistry
+from core.orders import Order, OrderManager
+from core.paper import PaperBroker
+from core.regime import regime_tracker
+from core.risk import RiskEngine
+from core.tracing import Trace
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYMBOLS = ('BTC/USDT', 'ETH/USDT', 'SOL/USDT')
+FEED_EXCHANGES = ('binance', 'kucoin', 'kraken')
+MAX_BACKOFF = 8  # an over-budget strategy runs at most this many times less often
+
+
+class TradingMode(Enum):
+    SANDBOX = 'sandbox'
+    LIVE = 'live'
+    AUTO = 'auto'
+
+
+class StrategyType(Enum):
+    ARBITRAGE = 'arbitrage'
+    AI_SIGNALS = 'ai_signals'
+    MEME = 'meme'
+    AUTO = 'auto'
+
+
+# What each auto-mode decision runs
+AUTO_SELECTIONS = {
+    'arbitrage': [StrategyType.ARBITRAGE],
+    'ai_signal': [StrategyType.AI_SIGNALS],
+    'hybrid': [StrategyType.ARBITRAGE, StrategyType.AI_SIGNALS]
+}
+
+
+@dataclass
+class TradeSignal:
+    symbol: str
+    direction: str  # buy / sell
+    confidence: float  # 0-100
+    price: float
+    target_price: float
+    strategy: StrategyType
+    timestamp: datetime
+    risk_level: str = 'medium'
+    exchange: Optional[str] = None  # best quote for the direction when omitted
+    amount_usd: Optional[float] = None  # sized from confidence when omitted
+
+
+class Strategy:
+    """
+    One trading strategy in the runtime.
+
+    evaluate(market_data) gets the engine's current market snapshot ({symbol: {'price',
+    'exchanges'}}, never mutated) and returns signals for the engine to execute. A plain
+    method runs on the strategy's own worker thread, so CPU-heavy strategies neither
+    block the event loop nor each other; an `async def evaluate` runs on the loop and
+    should only await I/O. `engine` is set when the strategy is added.
+    """
+
+    type: StrategyType
+    interval: Optional[float] = None  # seconds between evaluations, STRATEGY_RUN_INTERVAL by default
+    cpu_budget_ms: Optional[float] = None  # per evaluation, STRATEGY_CPU_BUDGET_MS by default
+
+    engine: Optional['TradingEngine'] = None
+
+    def evaluate(self, market_data: Dict) -> List[TradeSignal]:
+        raise NotImplementedError
+
+    @property
+    def name(self) -> str:
+        return self.type.value
+
+
+class StrategyRunner:
+    """
+    Task running one strategy: waits for a new market snapshot, evaluates, executes the
+    signals, then sleeps its interval.
+
+    CPU time is measured per evaluation with the worker thread's clock. An evaluation
+    over budget stretches the next sleep by the same factor (up to MAX_BACKOFF), so a
+    strategy's share of CPU stays within budget / interval whatever it costs. Async
+    strategies report latency only - their thread CPU would include everything else the
+    loop ran meanwhile. STRATEGY_MAX_ERRORS consecutive failures stop the runner.
+    """
+
+    def __init__(self, strategy: Strategy, engine: 'TradingEngine'):
+        self.strategy = strategy
+        self.engine = engine
+        self.interval = strategy.interval or settings.STRATEGY_RUN_INTERVAL
+        self.cpu_budget_ms = strategy.cpu_budget_ms or settings.STRATEGY_CPU_BUDGET_MS
+        self.delay = self.interval
+        self.state = 'starting'  # running, throttled, failed, stopped
+        self.latency = Histogram()
+        self.cpu = Histogram()
+        self.counts = {'evaluations': 0, 'signals': 0, 'executed': 0, 'errors': 0, 'over_budget': 0}
+        self.consecutive_errors = 0
+        self.last_error = ''
+        self.started_at = clock.time()
+        self._recent: Dict[Tuple[str, str], float] = {}  # (symbol, direction) -> executed at
+        self._is_async = inspect.iscoroutinefunction(strategy.evaluate)
+        self._executor = None if self._is_async else \
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"strategy-{strategy.name}")
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run(), name=f"strategy-{self.strategy.name}")
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.state != 'failed':
+            self.state = 'stopped'
+
+    async def wait_stopped(self):
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self):
+        seen = 0
+        try:
+            while True:
+                if self.engine.market_version == seen:
+                    await self.engine.market_updated()
+                    continue
+                seen = self.engine.market_version
+
+                if not await self._evaluate(self.engine.market_data):
+                    if self.consecutive_errors >= settings.STRATEGY_MAX_ERRORS:
+                        self.state = 'failed'
+                        logger.error(f"🛑 Strategy {self.strategy.name} stopped after "
+                                     f"{self.consecutive_errors} consecutive errors: {self.last_error}")
+                        return
+                await clock.asleep(self.delay)
+        except asyncio.CancelledError:
+            pass
+
+    async def _evaluate(self, market_data: Dict) -> bool:
+        started = time.perf_counter()
+        try:
+            if self._is_async:
+                signals, cpu = await self.strategy.evaluate(market_data), None
+            else:
+                signals, cpu = await asyncio.get_running_loop().run_in_executor(self._executor, self._timed, market_data)
+        except Exception as e:
+            self.counts['errors'] += 1
+            self.consecutive_errors += 1
+            self.last_error = str(e)
+            logger.error(f"Strategy {self.strategy.name} failed: {e}")
+            return False
+
+        self.latency.observe(time.perf_counter() - started)
+        self.counts['evaluations'] += 1
+        self.consecutive_errors = 0
+        self._apply_budget(cpu)
+
+        for signal in signals or []:
+            self.counts['signals'] += 1
+            if self._should_execute(signal):
+                success, message = await self.engine._execute_signal(signal)
+                self.counts['executed'] += success
+                logger.info(message)
+        return True
+
+    def _timed(self, market_data: Dict):
+        started = time.thread_time()
+        signals = self.strategy.evaluate(market_data)
+        return signals, time.thread_time() - started
+
+    def _apply_budget(self, cpu: Optional[float]):
+        if cpu is None:
+            self.state = 'running'
+            return
+        self.cpu.observe(cpu)
+        cpu_ms = cpu * 1000
+        if cpu_ms > self.cpu_budget_ms:
+            self.counts['over_budget'] += 1
+            if self.state != 'throttled':
+                logger.warning(f"⏱️ Strategy {self.strategy.name} used {cpu_ms:.1f}ms CPU "
+                               f"(budget {self.cpu_budget_ms:g}ms) - backing off")
+            self.delay = self.interval * min(MAX_BACKOFF, cpu_ms / self.cpu_budget_ms)
+            self.state = 'throttled'
+        else:
+            self.delay = self.interval
+            self.state = 'running'
+
+    def _should_execute(self, signal: TradeSignal) -> bool:
+        """The same symbol and direction is traded at most once per STRATEGY_SIGNAL_COOLDOWN"""
+        now = clock.time()
+        key = (signal.symbol, signal.direction)
+        if now - self._recent.get(key, float('-inf')) < settings.STRATEGY_SIGNAL_COOLDOWN:
+            return False
+        self._recent[key] = now
+        return True
+
+    def get_stats(self) -> Dict:
+        return {
+            'state': self.state,
+            'interval': self.interval,
+            'current_delay': round(self.delay, 3),
+            'cpu_budget_ms': self.cpu_budget_ms,
+            'counts': dict(self.counts),
+            'latency': self.latency.snapshot(),
+            'cpu': self.cpu.snapshot() if self.cpu.count else None,
+            'last_error': self.last_error,
+            'uptime': round(clock.time() - self.started_at)
+        }
+
+
+class CcxtPriceFeed:
+    """Last prices from public ccxt tickers; exchanges that fail to connect are left out"""
+
+    def __init__(self, exchange_names: Iterable[str] = FEED_EXCHANGES):
+        self.exchange_names = list(exchange_names)
+        self.exchanges = None
+
+    def _connect(self):
+        import ccxt
+
+        self.exchanges = {}
+        for name in self.exchange_names:
+            try:
+                self.exchanges[name] = getattr(ccxt, name)({'enableRateLimit': True})
+            except Exception as e:
+                logger.warning(f"⚠️ {name} price feed unavailable: {e}")
+
+    def __call__(self, symbol: str) -> Dict[str, float]:
+        if self.exchanges is None:
+            self._connect()
+        quotes = {}
+        for name, exchange in self.exchanges.items():
+            try:
+                quotes[name] = float(exchange.fetch_ticker(symbol)['last'])
+            except Exception as e:
+                logger.debug(f"Failed to fetch {symbol} from {name}: {e}")
+        return quotes
+
+
+class TradingEngine:
+    """
+    Owns the market snapshot and the running strategies.
+
+    A market task polls the price feed every PRICE_UPDATE_INTERVAL seconds, feeds the
+    shared indicator state (features, candles, regime, signal ledger, paper books) and
+    swaps in a new `market_data` dict, waking every strategy runner. Strategies can be
+    added, removed or swapped while the engine runs; a swap starts the new runner
+    before cancelling the old one. Orders go through an OrderManager with risk checks;
+    sandbox and auto mode fill on the paper broker.
+    """
+
+    def __init__(self, symbols: Iterable[str] = DEFAULT_SYMBOLS,
+                 price_feed: Optional[Callable[[str], Dict[str, float]]] = None,
+                 starting_balance: Optional[float] = None):
+        self.symbols = list(symbols)
+        self.price_feed = price_feed or CcxtPriceFeed()
+        self.mode = TradingMode.SANDBOX
+        self.is_running = False
+        self.market_data: Dict[str, Dict] = {}
+        self.market_version = 0
+        self.last_update: Optional[str] = None
+        self.ledger = Ledger(settings.DEFAULT_BALANCE if starting_balance is None else starting_balance)
+        self.paper_broker = PaperBroker()
+        self.risk_engine = RiskEngine()
+        self.order_manager = OrderManager(self._fill_order, risk=self.risk_engine)
+        self.arbitrage_executor = ArbitrageExecutor(self.place_order)
+        self.opportunity_registry = OpportunityRegistry()
+        self.trade_history = deque(maxlen=500)
+        self.strategies: Dict[StrategyType, Strategy] = {}  # selected, whether or not the engine runs
+        self.runners: Dict[StrategyType, StrategyRunner] = {}  # while running
+        self._market_task: Optional[asyncio.Task] = None
+        self._market_event: Optional[asyncio.Event] = None
+        for strategy_type in (StrategyType.ARBITRAGE, StrategyType.AI_SIGNALS):
+            self.add_strategy(strategy_type)
+
+    # Strategies
+
+    @property
+    def active_strategies(self) -> List[StrategyType]:
+        return list(self.strategies)
+
+    @active_strategies.setter
+    def active_strategies(self, types: Iterable[StrategyType]):
+        self.set_strategies(types)
+
+    @staticmethod
+    def create_strategy(strategy_type: StrategyType) -> Strategy:
+        # Strategies import this module, so they are looked up on first use
+        if strategy_type == StrategyType.ARBITRAGE:
+            from strategies.arbitrage import ArbitrageStrategy
+            return ArbitrageStrategy()
+        if strategy_type == StrategyType.AI_SIGNALS:
+            from strategies.ai import AIStrategy
+            return AIStrategy()
+        if strategy_type == StrategyType.MEME:
+            from strategies.meme import MemeStrategy
+            return MemeStrategy()
+        from strategies.auto import AutoStrategy
+        return AutoStrategy()
+
+    def set_strategies(self, types: Iterable[StrategyType]):
+        """Run exactly `types` (auto mode keeps its own strategy); only the difference is started or stopped"""
+        wanted = list(dict.fromkeys(types))
+        if self.mode == TradingMode.AUTO and StrategyType.AUTO not in wanted:
+            wanted.append(StrategyType.AUTO)
+        for strategy_type in self.active_strategies:
+            if strategy_type not in wanted:
+                self.remove_strategy(strategy_type)
+        for strategy_type in wanted:
+            if strategy_type not in self.strategies:
+                self.add_strategy(strategy_type)
+
+    def add_strategy(self, strategy: Union[Strategy, StrategyType]):
+        """Add a strategy; one of the same type is replaced (the new one starts before the old one stops)"""
+        if isinstance(strategy, StrategyType):
+            strategy = self.create_strategy(strategy)
+        strategy.engine = self
+        replaced = strategy.type in self.strategies
+        self.strategies[strategy.type] = strategy
+        if self.is_running:
+            self._start_runner(strategy)
+            logger.info(f"🔁 Strategy {strategy.name} swapped" if replaced else f"➕ Strategy {strategy.name} started")
+
+    swap_strategy = add_strategy
+
+    def remove_strategy(self, strategy_type: StrategyType):
+        self.strategies.pop(strategy_type, None)
+        runner = self.runners.pop(strategy_type, None)
+        if runner is not None:
+            runner.stop()
+            logger.info(f"➖ Strategy {strategy_type.value} stopped")
+
+    def _start_runner(self, strategy: Strategy):
+        runner = StrategyRunner(strategy, self)
+        runner.start()
+        previous = self.runners.get(strategy.type)
+        self.runners[strategy.type] = runner
+        if previous is not None:
+            previous.stop()
+
+    def set_mode(self, mode: str):
+        self.mode = TradingMode(mode.lower())
+        if self.mode == TradingMode.AUTO:
+            if StrategyType.AUTO not in self.strategies:
+                self.add_strategy(StrategyType.AUTO)
+        else:
+            self.remove_strategy(StrategyType.AUTO)
+        logger.info(f"⚙️ Trading mode: {self.mode.value}")
+
+    # Lifecycle
+
+    async def start(self, poll_market: bool = True):
+        """Start the strategy runners; with poll_market=False the caller feeds update_market() itself"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._market_event = asyncio.Event()
+        self._market_task = asyncio.create_task(self._market_loop(), name='engine-market') if poll_market else None
+        for strategy in self.strategies.values():
+            self._start_runner(strategy)
+        logger.info(f"🚀 Trading engine started ({self.mode.value}): {', '.join(s.value for s in self.strategies)}")
+
+    async def stop(self):
+        if not self.is_running:
+            return
+        self.is_running = False
+        runners = list(self.runners.values())
+        self.runners.clear()
+        for runner in runners:
+            runner.stop()
+        if self._market_task is not None:
+            self._market_task.cancel()
+        await asyncio.gather(*(runner.wait_stopped() for runner in runners), return_exceptions=True)
+        logger.info("⏹️ Trading engine stopped")
+
+    # Market data
+
+    async def _market_loop(self):
+        while True:
+            try:
+                quotes = await asyncio.to_thread(lambda: {symbol: self.price_feed(symbol) for symbol in self.symbols})
+                self.update_market(quotes)
+            except Exception as e:
+                logger.error(f"Engine market update error: {e}")
+            await clock.asleep(settings.PRICE_UPDATE_INTERVAL)
+
+    def update_market(self, quotes: Dict[str, Dict[str, float]]):
+        """New quotes ({symbol: {exchange: price}}): publish a new snapshot and wake the strategies"""
+        market_data = {}
+        for symbol, exchange_prices in quotes.items():
+            if not exchange_prices:
+                continue
+            price = float(np.mean(list(exchange_prices.values())))
+            market_data[symbol] = {'price': price, 'exchanges': dict(exchange_prices)}
+            self.paper_broker.on_quotes(symbol, exchange_prices)
+            candle_aggregator.on_quotes(symbol, exchange_prices)
+            feature_store.update(symbol, price)
+            regime_tracker.on_prices(symbol, exchange_prices)
+            signal_ledger.on_price(symbol, price)
+
+        # Replaced, never mutated: a strategy keeps a consistent snapshot for its whole evaluation
+        self.market_data = market_data
+        self.market_version += 1
+        self.last_update = clock.now().isoformat()
+        if self._market_event is not None:
+            event, self._market_event = self._market_event, asyncio.Event()
+            event.set()
+
+    async def market_updated(self):
+        """Wait for the next market snapshot"""
+        await self._market_event.wait()
+
+    # Execution
+
+    def place_order(self, exchange: str, symbol: str, side: str, amount_usd: float, price: float,
+                    strategy: str, confidence: float, trace: Optional[Trace] = None) -> Tuple[bool, str]:
+        """Blocking order placement (the arbitrage executor's legs)"""
+        order = self.order_manager.submit(exchange, symbol, side, amount_usd, strategy=strategy,
+                                          confidence=confidence, price=price, trace=trace)
+        return order.future.result()
+
+    def _fill_order(self, order: Order) -> Tuple[bool, str]:
+        """Fill an order on the paper broker (runs on an order manager worker)"""
+        if self.mode == TradingMode.LIVE:
+            return False, "❌ Live execution is not available in the strategy runtime - use sandbox or auto mode"
+
+        fill = self.paper_broker.execute(order.exchange, order.symbol, order.side, order.amount_usd, order.price)
+        if not fill.quantity:
+            return False, f"❌ Trade failed: {fill.reason}"
+
+        profit = fill.realized_pnl
+        self.ledger.record_fill(order.exchange, order.symbol, order.side, fill.notional, fill.avg_price, profit,
+                                fee=fill.fee, closed=fill.closed_quantity > 0).result()
+        self.risk_engine.record_pnl(order.exchange, order.symbol, order.strategy, profit)
+        self.trade_history.append({
+            'id': order.client_order_id,
+            'timestamp': clock.now(),
+            'symbol': order.symbol,
+            'direction': order.side,
+            'amount': round(fill.notional, 2),
+            'price': round(fill.avg_price, 6),
+            'fee': round(fill.fee, 4),
+            'profit': round(profit, 2),
+            'strategy': order.strategy,
+            'exchange': order.exchange,
+            'confidence': order.confidence
+        })
+        return True, f"✅ {order.side.upper()} ${fill.notional:.2f} {order.symbol} at ${fill.avg_price:.4f} ({order.strategy})"
+
+    def _size(self, confidence: float) -> float:
+        """Position size from confidence: MIN_TRADE_AMOUNT at 50%, MAX_TRADE_AMOUNT at 100%"""
+        scale = min(1.0, max(0.0, (confidence - 50) / 50))
+        return settings.MIN_TRADE_AMOUNT + (settings.MAX_TRADE_AMOUNT - settings.MIN_TRADE_AMOUNT) * scale
+
+    async def _execute_signal(self, signal: TradeSignal) -> Tuple[bool, str]:
+        exchange = signal.exchange
+        if exchange is None:
+            quotes = self.market_data.get(signal.symbol, {}).get('exchanges') or {'paper': signal.price}
+            pick = min if signal.direction == 'buy' else max
+            exchange = pick(quotes, key=quotes.get)
+        order = self.order_manager.submit(exchange, signal.symbol, signal.direction,
+                                          signal.amount_usd or self._size(signal.confidence),
+                                          strategy=signal.strategy.value, confidence=signal.confidence,
+                                          price=signal.price)
+        return await asyncio.wrap_future(order.future)
+
+    # Status
+
+    def get_trade_history(self, limit: int = 50) -> List[Dict]:
+        return list(self.trade_history)[-limit:]
+
+    def get_status(self) -> Dict:
+        return {
+            'portfolio': self.ledger.portfolio,
+            'is_running': self.is_running,
+            'mode': self.mode.value,
+            'last_update': self.last_update,
+            'market_version': self.market_version,
+            'active_strategies': [s.value for s in self.strategies],
+            'strategies': {strategy_type.value: runner.get_stats() for strategy_type, runner in self.runners.items()}
+        }
+
+
+# Global instance
+engine = TradingEngine()
@@ -0,0 +1,251 @@
+"""
+Feature Store
+Author: Mattiaz
+Description: Latest technical indicator values per (symbol, timeframe), updated incrementally from
+             the price stream - computed once per tick and shared by every signal consumer
+"""
+
+import logging
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from config.settings import settings
+from core.candles import candle_aggregator
+from core.clock import clock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEFRAME = 'tick'  # one sample per monitor pass; candle timeframes ('1m', ...) get one per bar
+
+RSI_WINDOW = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BB_WINDOW, BB_STD = 20, 2.0
+MOMENTUM_WINDOW = 10
+ACTIVITY_WINDOW = 20
+WARMUP = MACD_SLOW  # samples before the slowest indicator is meaningful
+
+
+@dataclass(frozen=True)
+class Features:
+    """
+    Indicator values for one (symbol, timeframe) after `version` updates.
+
+    macd, macd_signal and momentum are in percent of price so the same thresholds work
+    for BTC and for a $0.50 coin. The price feed has no volume, so volume_spike is tick
+    activity: the latest absolute return relative to its recent average (1.0 = normal).
+    """
+    symbol: str
+    timeframe: str
+    version: int
+    updated_at: float
+    price: float
+    rsi: float
+    macd: float
+    macd_signal: float
+    bb_position: float
+    bb_width: float
+    sma: float
+    momentum: float
+    volume_spike: float
+    trend: str
+
+    @property
+    def ready(self) -> bool:
+        return self.version >= WARMUP
+
+    def to_dict(self) -> Dict:
+        return {
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'version': self.version,
+            'updated_at': self.updated_at,
+            'ready': self.ready,
+            'price': self.price,
+            'rsi': round(self.rsi, 2),
+            'macd': round(self.macd, 4),
+            'macd_signal': round(self.macd_signal, 4),
+            'bb_position': round(self.bb_position, 3),
+            'bb_width': round(self.bb_width, 4),
+            'sma': self.sma,
+            'momentum': round(self.momentum, 3),
+            'volume_spike': round(self.volume_spike, 2),
+            'trend': self.trend
+        }
+
+
+def _ema_alpha(window: int) -> float:
+    return 2.0 / (window + 1)
+
+
+@dataclass
+class _IndicatorState:
+    """Running state behind one key: O(1) work per sample"""
+    samples: int = 0
+    last_price: float = 0.0
+    avg_gain: float = 0.0
+    avg_loss: float = 0.0
+    ema_fast: float = 0.0
+    ema_slow: float = 0.0
+    macd_signal: float = 0.0
+    window: deque = field(default_factory=lambda: deque(maxlen=BB_WINDOW))
+    window_sum: float = 0.0
+    window_sumsq: float = 0.0
+    activity: float = 0.0  # EMA of absolute returns
+
+    def update(self, price: float) -> Tuple[float, ...]:
+        if self.samples == 0:
+            self.ema_fast = self.ema_slow = price
+            change = 0.0
+        else:
+            change = price - self.last_price
+        self.samples += 1
+
+        # RSI: simple average over the first window, Wilder smoothing after that
+        if self.samples > 1:
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            n = min(self.samples - 1, RSI_WINDOW)
+            self.avg_gain += (gain - self.avg_gain) / n
+            self.avg_loss += (loss - self.avg_loss) / n
+        if self.avg_loss == 0:
+            rsi = 100.0 if self.avg_gain > 0 else 50.0
+        else:
+            rsi = 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+
+        # MACD on EMAs, in percent of price
+        self.ema_fast += _ema_alpha(MACD_FAST) * (price - self.ema_fast)
+        self.ema_slow += _ema_alpha(MACD_SLOW) * (price - self.ema_slow)
+        macd = (self.ema_fast - self.ema_slow) / price * 100 if price else 0.0
+        self.macd_signal += _ema_alpha(MACD_SIGNAL) * (macd - self.macd_signal)
+
+        # Bollinger bands from running sums over the window
+        oldest = self.window[0] if len(self.window) == self.window.maxlen else None
+        if oldest is not None:
+            self.window_sum -= oldest
+            self.window_sumsq -= oldest * oldest
+        self.window.append(price)
+        self.window_sum += price
+        self.window_sumsq += price * price
+        count = len(self.window)
+        sma = self.window_sum / count
+        std = math.sqrt(max(self.window_sumsq / count - sma * sma, 0.0))
+        lower, upper = sma - BB_STD * std, sma + BB_STD * std
+        bb_position = (price - lower) / (upper - lower) if upper > lower else 0.5
+        bb_width = (upper - lower) / sma * 100 if sma else 0.0
+
+        # Rate of change over the momentum window (the deque holds BB_WINDOW >= MOMENTUM_WINDOW prices)
+        past = self.window[-1 - MOMENTUM_WINDOW] if count > MOMENTUM_WINDOW else self.window[0]
+        momentum = (price - past) / past * 100 if past else 0.0
+
+        # Tick activity stands in for volume
+        move = abs(change) / self.last_price if self.samples > 1 and self.last_price else 0.0
+        volume_spike = move / self.activity if self.activity > 0 else 1.0
+        self.activity += _ema_alpha(ACTIVITY_WINDOW) * (move - self.activity) if self.samples > 2 else move
+
+        self.last_price = price
+        return rsi, macd, self.macd_signal, bb_position, bb_width, sma, momentum, volume_spike
+
+
+def _trend(price: float, sma: float, macd: float) -> str:
+    if macd > 0 and price >= sma:
+        return 'bullish'
+    if macd < 0 and price <= sma:
+        return 'bearish'
+    return 'neutral'
+
+
+class FeatureStore:
+    """
+    Latest Features per (symbol, timeframe).
+
+    The price monitor calls update() once per new price; readers get the immutable
+    Features published by the last update, so any number of consumers share one
+    computation and never see a half-updated set of values.
+
+    Each timeframe is its own series with its own sampling rate: ticks go to 'tick',
+    and on_candle() feeds the `bar_timeframes` series one close per finalized bar (the
+    mean across exchanges, as the backfill seeds it), so indicators never mix rates.
+    """
+
+    def __init__(self, bar_timeframes: Iterable[str] = ()):
+        self.bar_timeframes = set(bar_timeframes)
+        self._state: Dict[Tuple[str, str], _IndicatorState] = {}
+        self._latest: Dict[Tuple[str, str], Features] = {}
+        self._bars: Dict[Tuple[str, str], Tuple[float, Dict[str, float]]] = {}  # bar being collected per series
+        self._bar_exchanges: Dict[Tuple[str, str], Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, symbol: str, price: float, timeframe: str = DEFAULT_TIMEFRAME,
+               timestamp: Optional[float] = None) -> Optional[Features]:
+        if not price or not math.isfinite(price):
+            return None
+        price = float(price)
+        key = (symbol, timeframe)
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                state = self._state[key] = _IndicatorState()
+            rsi, macd, macd_signal, bb_position, bb_width, sma, momentum, volume_spike = state.update(price)
+            features = Features(
+                symbol=symbol, timeframe=timeframe, version=state.samples,
+                updated_at=clock.time() if timestamp is None else timestamp, price=price,
+                rsi=rsi, macd=macd, macd_signal=macd_signal, bb_position=bb_position, bb_width=bb_width,
+                sma=sma, momentum=momentum, volume_spike=volume_spike, trend=_trend(price, sma, macd)
+            )
+            self._latest[key] = features
+        return features
+
+    def on_candle(self, candle) -> Optional[Features]:
+        """
+        Candle aggregator listener. A bar is applied once every exchange seen for the
+        symbol has closed it (or when the next bar starts); bars at or before the
+        series' last sample - already seeded from history - are skipped.
+        """
+        if candle.timeframe not in self.bar_timeframes:
+            return None
+        key = (candle.symbol, candle.timeframe)
+        ready = []
+        with self._lock:
+            exchanges = self._bar_exchanges.setdefault(key, set())
+            exchanges.add(candle.exchange)
+            latest = self._latest.get(key)
+            if latest is not None and candle.time <= latest.updated_at:
+                return None
+            start, closes = self._bars.get(key, (candle.time, {}))
+            if candle.time < start:
+                return None
+            if candle.time > start:
+                ready.append((start, closes))
+                start, closes = candle.time, {}
+            closes[candle.exchange] = candle.close
+            if len(closes) >= len(exchanges):
+                ready.append((start, closes))
+                self._bars.pop(key, None)
+            else:
+                self._bars[key] = (start, closes)
+
+        features = None
+        for start, closes in ready:
+            features = self.update(candle.symbol, sum(closes.values()) / len(closes), candle.timeframe, timestamp=start)
+        return features
+
+    def get(self, symbol: str, timeframe: str = DEFAULT_TIMEFRAME) -> Optional[Features]:
+        return self._latest.get((symbol, timeframe))
+
+    def latest(self, symbol: str) -> Optional[Features]:
+        """Tick features once that series has warmed up, the (backfilled) bar series until then"""
+        features = self.get(symbol)
+        if features is not None and features.ready:
+            return features
+        for timeframe in sorted(self.bar_timeframes):
+            bar = self.get(symbol, timeframe)
+            if bar is not None and bar.ready:
+                return bar
+        return features
+
+
+# Global instance - the backfill timeframe also follows the live candles
+feature_store = FeatureStore(bar_timeframes=[settings.BACKFILL_TIMEFRAME])
+candle_aggregator.add_listener(feature_store.on_candle)
@@ -0,0 +1,141 @@
+"""
+Shared HTTP Client
+Author: Mattiaz
+Description: One app-scoped aiohttp session for CoinGecko, Etherscan, Solana RPC and webhooks - pooled
+             keep-alive connections per host, DNS caching, timeouts and retries
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import aiohttp
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class HttpResponse:
+    status: int
+    data: Any  # parsed JSON, text for other bodies, None when empty
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
+class HttpClient:
+    """
+    Connections are reused across calls (keep-alive, at most HTTP_POOL_PER_HOST per
+    host) and host lookups are cached for HTTP_DNS_TTL seconds, so a repeat request
+    skips TCP, TLS and DNS setup.
+
+    Requests are retried with exponential backoff on connection errors, timeouts and
+    429/5xx responses, honouring Retry-After up to HTTP_TIMEOUT. Only idempotent calls retry by default;
+    pass `retries` for a POST that is safe to repeat (an RPC read), never for webhooks.
+
+    start()/close() belong to the app's startup and shutdown; a request before start()
+    opens the session on demand, so scripts can use the client directly.
+    """
+
+    def __init__(self, limit: Optional[int] = None, limit_per_host: Optional[int] = None,
+                 dns_ttl: Optional[int] = None, timeout: Optional[float] = None, retries: Optional[int] = None,
+                 backoff: float = 0.5):
+        self.limit = settings.HTTP_POOL_LIMIT if limit is None else limit
+        self.limit_per_host = settings.HTTP_POOL_PER_HOST if limit_per_host is None else limit_per_host
+        self.dns_ttl = settings.HTTP_DNS_TTL if dns_ttl is None else dns_ttl
+        self.timeout = settings.HTTP_TIMEOUT if timeout is None else timeout
+        self.retries = settings.HTTP_RETRIES if retries is None else retries
+        self.backoff = backoff
+        self.counts = {'requests': 0, 'retries': 0, 'failures': 0}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            if self._session is not None and not self._session.closed:
+                # Opened on another event loop (a script calling asyncio.run twice) - close it here
+                try:
+                    await self._session.close()
+                except Exception as e:
+                    logger.warning(f"Could not close stale HTTP session: {e}")
+            self._loop = loop
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             ttl_dns_cache=self.dns_ttl, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout, sock_connect=min(5.0, self.timeout)),
+                headers={'User-Agent': 'opm-trading-bot'}
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    async def request(self, method: str, url: str, retries: Optional[int] = None,
+                      timeout: Optional[float] = None, **kwargs) -> HttpResponse:
+        """Send a request; raises the last error once the retries are used up"""
+        session = await self.start()
+        if retries is None:
+            retries = self.retries if method.upper() in ('GET', 'HEAD') else 0
+        if timeout is not None:
+            kwargs['timeout'] = aiohttp.ClientTimeout(total=timeout)
+
+        for attempt in range(retries + 1):
+            self.counts['requests'] += 1
+            delay = self.backoff * 2 ** attempt
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    if response.status in RETRY_STATUSES and attempt < retries:
+                        retry_after = response.headers.get('Retry-After', '')
+                        # A server asking for minutes would stall the caller; wait at most one timeout
+                        delay = min(float(retry_after), self.timeout) if retry_after.isdigit() else delay
+                        logger.warning(f"{method} {url} returned {response.status}, retrying in {delay:.1f}s")
+                    else:
+                        return HttpResponse(response.status, await self._body(response))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == retries:
+                    self.counts['failures'] += 1
+                    raise
+                logger.warning(f"{method} {url} failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+            self.counts['retries'] += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _body(response: aiohttp.ClientResponse) -> Any:
+        body = await response.read()
+        if not body:
+            return None
+        if 'json' in response.content_type:
+            return json.loads(body)
+        return body.decode(response.charset or 'utf-8', errors='replace')
+
+    async def get(self, url: str, **kwargs) -> HttpResponse:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> HttpResponse:
+        return await self.request('POST', url, **kwargs)
+
+    def get_stats(self) -> dict:
+        connector = self._session.connector if self._session is not None and not self._session.closed else None
+        return {
+            **self.counts,
+            'open': connector is not None,
+            'limit': self.limit,
+            'limit_per_host': self.limit_per_host,
+            'dns_ttl': self.dns_ttl
+        }
+
+
+# Global instance
+http_client = HttpClient()
@@ -0,0 +1,218 @@
+"""
+Portfolio Ledger
+Author: Mattiaz
+Description: Single-writer portfolio state - trade events are applied in order by one writer thread
+             and published as immutable snapshots with per-exchange, per-asset balances
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.clock import clock
+
+logger = logging.getLogger(__name__)
+
+# Account holding cash that has not been allocated to an exchange yet
+UNALLOCATED = 'unallocated'
+
+
+@dataclass(frozen=True)
+class LedgerSnapshot:
+    """
+    One published ledger version. The dicts are never mutated after publication -
+    the writer copies what it changes - so readers can use them without locks.
+    """
+    version: int
+    portfolio: Dict[str, Any]
+    balances: Dict[str, Dict[str, float]] = field(default_factory=dict)  # account -> asset -> amount
+
+    @property
+    def assets(self) -> Dict[str, float]:
+        """Totals per asset across all accounts"""
+        totals: Dict[str, float] = {}
+        for holdings in self.balances.values():
+            for asset, amount in holdings.items():
+                totals[asset] = totals.get(asset, 0.0) + amount
+        return totals
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': self.version,
+            'portfolio': dict(self.portfolio),
+            'balances': {account: dict(holdings) for account, holdings in self.balances.items()},
+            'assets': self.assets
+        }
+
+
+class Ledger:
+    """
+    Owns all portfolio state.
+
+    Producers (trading thread, monitor thread, request handlers, order workers) enqueue
+    events; a single writer thread applies them in arrival order and swaps in a new
+    LedgerSnapshot. Reading `ledger.snapshot` is a plain attribute read, so readers
+    never wait for the writer and never see a half-applied trade.
+
+    Every event returns a Future that resolves to the snapshot that includes it, for
+    callers that need to read their own write.
+    """
+
+    def __init__(self, starting_balance: float, quote: str = 'USDT', fields: Optional[Dict[str, Any]] = None):
+        self.quote = quote
+        portfolio = {
+            'balance': starting_balance,
+            'profit_live': 0,
+            'profit_24h': 0,
+            'fees_paid': 0,
+            'total_trades': 0,
+            'closed_trades': 0,  # fills that closed (part of) a position
+            'successful_trades': 0,
+            'win_rate': 0
+        }
+        portfolio.update(fields or {})
+        self._snapshot = LedgerSnapshot(version=0, portfolio=portfolio,
+                                        balances={UNALLOCATED: {quote: float(starting_balance)}})
+        self._events: 'queue.SimpleQueue[Tuple[Callable, tuple, Future]]' = queue.SimpleQueue()
+        self._listeners: List[Callable[[LedgerSnapshot], None]] = []
+        self._inline_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> LedgerSnapshot:
+        return self._snapshot
+
+    @property
+    def portfolio(self) -> Dict[str, Any]:
+        """Current portfolio summary (read-only)"""
+        return self._snapshot.portfolio
+
+    def add_listener(self, callback: Callable[[LedgerSnapshot], None]):
+        """Call `callback` from the writer with every new snapshot"""
+        self._listeners.append(callback)
+
+    # Events
+
+    def record_fill(self, exchange: str, symbol: str, side: str, amount_usd: float, price: float,
+                    profit: float = 0.0, fee: float = 0.0, closed: bool = False) -> Future:
+        """
+        A filled order: moves quote and base asset on `exchange` and pays `fee` in the quote
+        asset. `closed` marks a fill that closed (part of) a position - it counts towards
+        closed trades and win rate even at zero PnL - and `profit` is the PnL it realized.
+        """
+        return self._submit(self._apply_fill, (exchange, symbol, side.lower(), amount_usd, price, profit, fee, closed))
+
+    def allocate(self, exchanges: Iterable[str]) -> Future:
+        """Split unallocated cash evenly across `exchanges`"""
+        return self._submit(self._apply_allocate, (list(exchanges),))
+
+    def set_fields(self, **values) -> Future:
+        """Overwrite portfolio summary fields (marks such as profit_24h)"""
+        return self._submit(self._apply_fields, (values,))
+
+    def flush(self, timeout: Optional[float] = None) -> LedgerSnapshot:
+        """Wait until every event enqueued so far is applied"""
+        return self._submit(lambda state: None, ()).result(timeout)
+
+    # Writer
+
+    def _submit(self, apply: Callable, args: tuple) -> Future:
+        future: Future = Future()
+
+        # Replays apply events inline so decisions see the same balances on every run
+        if clock.virtual:
+            with self._inline_lock:
+                self._apply(apply, args, future)
+            return future
+
+        self._ensure_writer()
+        self._events.put((apply, args, future))
+        return future
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._run, name='ledger-writer', daemon=True)
+                    self._writer.start()
+
+    def _run(self):
+        while True:
+            apply, args, future = self._events.get()
+            self._apply(apply, args, future)
+
+    def _apply(self, apply: Callable, args: tuple, future: Future):
+        current = self._snapshot
+        state = {'portfolio': current.portfolio, 'balances': current.balances}
+        try:
+            apply(state, *args)
+        except Exception as e:
+            logger.error(f"Ledger event failed: {e}")
+            future.set_exception(e)
+            return
+
+        if state['portfolio'] is current.portfolio and state['balances'] is current.balances:
+            future.set_result(current)
+            return
+
+        snapshot = LedgerSnapshot(version=current.version + 1, portfolio=state['portfolio'],
+                                  balances=state['balances'])
+        self._snapshot = snapshot
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"Ledger listener error: {e}")
+        future.set_result(snapshot)
+
+    @staticmethod
+    def _move(balances: Dict[str, Dict[str, float]], account: str, asset: str, amount: float) -> Dict:
+        """Copy-on-write update of one balance"""
+        holdings = dict(balances.get(account, {}))
+        holdings[asset] = holdings.get(asset, 0.0) + amount
+        balances = dict(balances)
+        balances[account] = holdings
+        return balances
+
+    def _apply_fill(self, state: Dict, exchange: str, symbol: str, side: str, amount_usd: float,
+                    price: float, profit: float, fee: float, closed: bool):
+        base = symbol.split('/')[0]
+        quantity = amount_usd / price if price else 0.0
+        portfolio = dict(state['portfolio'])
+        balances = state['balances']
+
+        # Realized PnL is already in the cash flows; profit_live reports it separately
+        cash = -amount_usd - fee if side == 'buy' else amount_usd - fee
+        balances = self._move(balances, exchange, self.quote, cash)
+        balances = self._move(balances, exchange, base, quantity if side == 'buy' else -quantity)
+        portfolio['balance'] += cash
+        portfolio['profit_live'] += profit
+        portfolio['fees_paid'] += fee
+
+        portfolio['total_trades'] += 1
+        if closed:
+            portfolio['closed_trades'] += 1
+            if profit > 0:
+                portfolio['successful_trades'] += 1
+            portfolio['win_rate'] = (portfolio['successful_trades'] / portfolio['closed_trades']) * 100
+
+        state['portfolio'] = portfolio
+        state['balances'] = balances
+
+    def _apply_allocate(self, state: Dict, exchanges: List[str]):
+        cash = state['balances'].get(UNALLOCATED, {}).get(self.quote, 0.0)
+        if not exchanges or cash <= 0:
+            return
+        balances = self._move(state['balances'], UNALLOCATED, self.quote, -cash)
+        for exchange in exchanges:
+            balances = self._move(balances, exchange, self.quote, cash / len(exchanges))
+        state['balances'] = balances
+
+    def _apply_fields(self, state: Dict, values: Dict[str, Any]):
+        portfolio = dict(state['portfolio'])
+        portfolio.update(values)
+        state['portfolio'] = portfolio
@@ -0,0 +1,215 @@
+"""
+Runtime Metrics
+Author: Mattiaz
+Description: Per-route latency histograms (ASGI middleware) and an event-loop lag monitor that
+             captures the stack of whatever is blocking the loop
+"""
+
+import asyncio
+import bisect
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 0.1ms .. ~100s in sqrt(2) steps
+BUCKETS = [0.0001 * 2 ** (i / 2) for i in range(41)]
+
+
+class Histogram:
+    """Fixed log-bucket histogram: O(log buckets) observe, no per-sample storage"""
+
+    def __init__(self, bounds: List[float] = BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (capped at the max seen)"""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        """Summary in milliseconds"""
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p90_ms': round(self.percentile(90) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3)
+        }
+
+
+class RouteMetrics:
+    """Latency histogram and status counts per (method, route template)"""
+
+    def __init__(self):
+        self.routes: Dict[tuple, Histogram] = {}
+        self.statuses: Dict[tuple, Dict[int, int]] = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float):
+        key = (method, route)
+        histogram = self.routes.get(key)
+        if histogram is None:
+            histogram = self.routes[key] = Histogram()
+            self.statuses[key] = {}
+        histogram.observe(seconds)
+        statuses = self.statuses[key]
+        statuses[status] = statuses.get(status, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            f"{method} {route}": {**histogram.snapshot(), 'status': dict(self.statuses[(method, route)])}
+            for (method, route), histogram in sorted(self.routes.items(), key=lambda item: item[0][1])
+        }
+
+
+class LatencyMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request until its response completes.
+
+    Requests are grouped by route template (/api/market_analysis/{symbol}) so path
+    parameters do not explode the number of series; unmatched paths share one series.
+    """
+
+    def __init__(self, app, metrics: Optional[RouteMetrics] = None):
+        self.app = app
+        self.metrics = metrics or route_metrics
+        self._templates: Dict[Any, str] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.record(scope['method'], self._route_of(scope), status, time.perf_counter() - started)
+
+    def _route_of(self, scope) -> str:
+        route = scope.get('route')
+        if route is not None and hasattr(route, 'path'):
+            return route.path
+
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return '<unmatched>'
+        if not self._templates and 'app' in scope:
+            self._templates = {getattr(r, 'endpoint', None): r.path for r in scope['app'].router.routes}
+        return self._templates.get(endpoint, '<unmatched>')
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes up a heartbeat coroutine.
+
+    A watchdog thread notices when the heartbeat is overdue by more than `threshold`
+    and takes a stack sample of the loop thread at that moment - the stack of the
+    callback that is blocking the loop (e.g. a synchronous ccxt call).
+    """
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, max_stalls: int = 20):
+        self.interval = interval
+        self.threshold = threshold
+        self.lag = Histogram()
+        self.stalls = deque(maxlen=max_stalls)
+        self._beat = time.monotonic()
+        self._thread_id: Optional[int] = None
+        self._sampled_beat: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat())
+        threading.Thread(target=self._watchdog, name='loop-lag-watchdog', daemon=True).start()
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self.lag.observe(lag)
+            previous, self._beat = self._beat, now
+
+            # Replace the watchdog's estimate with the full stall duration
+            if self.stalls and self.stalls[-1]['beat'] == previous:
+                self.stalls[-1]['lag_ms'] = round(lag * 1000, 1)
+
+    def _watchdog(self):
+        while True:
+            time.sleep(self.interval / 2)
+            beat = self._beat
+            overdue = time.monotonic() - beat - self.interval
+            if overdue <= self.threshold or beat == self._sampled_beat:
+                continue
+
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            stack = traceback.format_stack(frame)
+            self._sampled_beat = beat
+            self.stalls.append({
+                'beat': beat,
+                'timestamp': time.time(),
+                'lag_ms': round(overdue * 1000, 1),
+                'stack': [line.rstrip() for line in stack[-12:]]
+            })
+            logger.warning(f"Event loop blocked for {overdue * 1000:.0f}ms, stack sample:\n{''.join(stack[-12:])}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'lag': self.lag.snapshot(),
+            'threshold_ms': self.threshold * 1000,
+            'stalls': [{k: v for k, v in stall.items() if k != 'beat'} for stall in list(self.stalls)]
+        }
+
+
+def metrics_snapshot() -> Dict[str, Any]:
+    """Everything the /api/metrics endpoints expose"""
+    return {
+        'pid': os.getpid(),
+        'routes': route_metrics.snapshot(),
+        'event_loop': loop_monitor.snapshot()
+    }
+
+
+# Global instances
+route_metrics = RouteMetrics()
+loop_monitor = LoopLagMonitor()
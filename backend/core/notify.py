@@ -6,12 +6,14 @@ Description: Send notifications on trades and strategy changes
 """
 
 import logging
-import aiohttp
 import asyncio
 from typing import Dict, List, Optional
 from datetime import datetime
 import json
 
+from config.settings import settings
+from core.http import http_client
+
 logger = logging.getLogger(__name__)
 
 class NotificationManager:
@@ -184,20 +186,15 @@ class NotificationManager:
                     }]
                 }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    webhook_url,
-                    json=payload,
-                    timeout=10,
-                    headers={'Content-Type': 'application/json'}
-                ) as response:
-                    if response.status in [200, 204]:
-                        logger.debug(f"Webhook notification sent successfully to {webhook_url}")
-                        return True
-                    else:
-                        logger.warning(f"Webhook returned {response.status}: {webhook_url}")
-                        return False
-                        
+            # Not retried: a webhook that timed out may still have been delivered
+            response = await http_client.post(webhook_url, json=payload, timeout=settings.WEBHOOK_TIMEOUT)
+            if response.status in [200, 204]:
+                logger.debug(f"Webhook notification sent successfully to {webhook_url}")
+                return True
+            else:
+                logger.warning(f"Webhook returned {response.status}: {webhook_url}")
+                return False
+                
         except Exception as e:
             logger.error(f"Failed to send to webhook {webhook_url}: {e}")
             return False
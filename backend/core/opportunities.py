@@ -0,0 +1,148 @@
+"""
+Opportunity Registry
+Author: Mattiaz
+Description: Tracks arbitrage opportunities per route (symbol, buy exchange, sell exchange) across
+             snapshots - persistence requirement, cooldown after a trade and price-move invalidation
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import settings
+from core.clock import clock
+
+logger = logging.getLogger(__name__)
+
+Route = Tuple[str, str, str]
+
+
+@dataclass
+class RouteState:
+    streak: int = 0  # consecutive snapshots the spread was present
+    buy_price: float = 0.0
+    sell_price: float = 0.0
+    traded_at: Optional[float] = None
+    traded_buy_price: float = 0.0
+    traded_sell_price: float = 0.0
+    last_outcome: str = ''
+
+
+def _moved_pct(old: float, new: float) -> float:
+    return abs(new - old) / old * 100 if old else 0.0
+
+
+class OpportunityRegistry:
+    """
+    Filters each snapshot's opportunities down to the ones worth an order round-trip.
+
+    - persistence: a route must show a spread in `persistence` consecutive snapshots;
+      a spread that is there once is usually a stale quote on one exchange.
+    - price-move invalidation: if either quote jumps more than `move_pct` between two
+      snapshots, the streak starts over - the spread is not the same one any more.
+    - cooldown: after a route was traded it is skipped for `cooldown` seconds, unless
+      both quotes moved more than `move_pct` since the trade (a fresh spread).
+
+    observe() is called once per snapshot with every opportunity found in it.
+    """
+
+    def __init__(self, cooldown: Optional[float] = None, persistence: Optional[int] = None,
+                 move_pct: Optional[float] = None):
+        self.cooldown = settings.ARBITRAGE_COOLDOWN if cooldown is None else cooldown
+        self.persistence = settings.ARBITRAGE_PERSISTENCE if persistence is None else persistence
+        self.move_pct = settings.ARBITRAGE_INVALIDATE_MOVE_PCT if move_pct is None else move_pct
+        self.routes: Dict[Route, RouteState] = {}
+        self.counts = {'snapshots': 0, 'observed': 0, 'eligible': 0, 'not_persistent': 0,
+                       'invalidated': 0, 'cooling_down': 0, 'traded': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def route_of(opportunity: Dict) -> Route:
+        return (opportunity['symbol'], opportunity['buy_exchange'], opportunity['sell_exchange'])
+
+    def observe(self, opportunities: List[Dict]) -> List[Dict]:
+        """Update route state from one snapshot; returns the eligible opportunities in their original order"""
+        now = clock.monotonic()
+        eligible = []
+
+        with self._lock:
+            self.counts['snapshots'] += 1
+            present = set()
+
+            for opportunity in opportunities:
+                route = self.route_of(opportunity)
+                if route in present:
+                    continue
+                present.add(route)
+                self.counts['observed'] += 1
+
+                state = self.routes.get(route)
+                if state is None:
+                    state = self.routes[route] = RouteState()
+
+                buy_price, sell_price = opportunity['buy_price'], opportunity['sell_price']
+                if state.streak and (_moved_pct(state.buy_price, buy_price) > self.move_pct or
+                                     _moved_pct(state.sell_price, sell_price) > self.move_pct):
+                    self.counts['invalidated'] += 1
+                    state.streak = 0
+                state.streak += 1
+                state.buy_price, state.sell_price = buy_price, sell_price
+
+                if state.streak < self.persistence:
+                    self.counts['not_persistent'] += 1
+                    continue
+
+                if self._cooling_down(state, now):
+                    self.counts['cooling_down'] += 1
+                    continue
+
+                self.counts['eligible'] += 1
+                eligible.append(opportunity)
+
+            # A route missing from this snapshot loses its streak; forget it once its cooldown is over
+            for route in list(self.routes):
+                if route not in present:
+                    state = self.routes[route]
+                    state.streak = 0
+                    if not self._cooling_down(state, now):
+                        del self.routes[route]
+
+        return eligible
+
+    def _cooling_down(self, state: RouteState, now: float) -> bool:
+        if state.traded_at is None or now - state.traded_at >= self.cooldown:
+            return False
+        # Both legs repriced since the trade: a new spread, not the one we already took
+        return not (_moved_pct(state.traded_buy_price, state.buy_price) > self.move_pct and
+                    _moved_pct(state.traded_sell_price, state.sell_price) > self.move_pct)
+
+    def record_trade(self, opportunity: Dict, outcome: str = ''):
+        """Start the route's cooldown - called for every execution attempt, filled or not"""
+        with self._lock:
+            state = self.routes.setdefault(self.route_of(opportunity), RouteState())
+            state.traded_at = clock.monotonic()
+            state.traded_buy_price = opportunity['buy_price']
+            state.traded_sell_price = opportunity['sell_price']
+            state.last_outcome = outcome
+            self.counts['traded'] += 1
+
+    def get_stats(self) -> Dict:
+        now = clock.monotonic()
+        with self._lock:
+            return {
+                'settings': {'cooldown': self.cooldown, 'persistence': self.persistence, 'move_pct': self.move_pct},
+                'counts': dict(self.counts),
+                'routes': [
+                    {
+                        'symbol': symbol,
+                        'buy_exchange': buy_exchange,
+                        'sell_exchange': sell_exchange,
+                        'streak': state.streak,
+                        'cooldown_remaining': round(max(0.0, self.cooldown - (now - state.traded_at)), 1)
+                        if state.traded_at is not None else 0.0,
+                        'last_outcome': state.last_outcome
+                    }
+                    for (symbol, buy_exchange, sell_exchange), state in self.routes.items()
+                ]
+            }
@@ -0,0 +1,258 @@
+"""
+Order Manager
+Author: Mattiaz
+Description: Priority order queue with client order IDs, in-flight deduplication, a worker pool per
+             exchange and submit-to-ack latency metrics
+"""
+
+import itertools
+import logging
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.clock import clock
+from core.metrics import Histogram
+from core.risk import RiskEngine
+from core.tracing import Trace, tracer
+
+logger = logging.getLogger(__name__)
+
+
+class OrderPriority(IntEnum):
+    ARBITRAGE = 0
+    SIGNAL = 1
+    MANUAL = 2
+
+
+# Default priority per strategy name used by the trading paths
+STRATEGY_PRIORITY = {
+    'arbitrage': OrderPriority.ARBITRAGE,
+    'ai_signal': OrderPriority.SIGNAL,
+    'ai_signals': OrderPriority.SIGNAL,
+    'meme': OrderPriority.SIGNAL,
+    'signal': OrderPriority.SIGNAL,
+}
+
+
+@dataclass(eq=False)
+class Order:
+    client_order_id: str
+    exchange: str
+    symbol: str
+    side: str
+    amount_usd: float
+    strategy: str = 'manual'
+    confidence: float = 0.5
+    price: Optional[float] = None
+    priority: OrderPriority = OrderPriority.MANUAL
+    state: str = 'queued'  # queued -> submitted -> acked | rejected
+    message: str = ''
+    submitted_at: float = 0.0
+    acked_at: float = 0.0
+    future: Future = field(default_factory=Future, repr=False)
+    trace: Optional[Trace] = field(default=None, repr=False)
+
+    @property
+    def dedup_key(self) -> Tuple:
+        return (self.exchange, self.symbol, self.side, self.strategy, round(self.amount_usd, 8))
+
+    def result(self, timeout: Optional[float] = None) -> Tuple[bool, str]:
+        """Block until the exchange acked or rejected the order: (success, message)"""
+        return self.future.result(timeout)
+
+    def to_dict(self) -> Dict:
+        return {
+            'client_order_id': self.client_order_id,
+            'exchange': self.exchange,
+            'symbol': self.symbol,
+            'side': self.side,
+            'amount_usd': self.amount_usd,
+            'strategy': self.strategy,
+            'priority': self.priority.name.lower(),
+            'state': self.state,
+            'message': self.message,
+            'latency_ms': round((self.acked_at - self.submitted_at) * 1000, 3) if self.acked_at else None
+        }
+
+
+class OrderManager:
+    """
+    Single entry point for every order, whatever path it comes from.
+
+    - Each exchange has its own priority queue and worker threads, so a slow exchange
+      does not hold up others and arbitrage legs jump ahead of signal and manual orders.
+    - A client order ID makes submission idempotent: resubmitting a known ID returns the
+      original order instead of placing a new one.
+    - While an order for (exchange, symbol, side, strategy, amount) is in flight, identical
+      submissions without their own client order ID join it rather than trading the same
+      thing twice. An order with its own ID is always placed (or found by that ID).
+
+    - With a risk engine every new order is checked against its limits before it is
+      queued; a rejected order resolves immediately and never reaches the exchange.
+
+    `place_order(order) -> (success, message)` does the actual exchange call; listeners
+    added with add_listener() see every order once the exchange acked or rejected it.
+    """
+
+    def __init__(self, place_order: Callable[[Order], Tuple[bool, str]], workers_per_exchange: int = 2,
+                 remembered_ids: int = 1000, risk: Optional[RiskEngine] = None):
+        self.place_order = place_order
+        self.risk = risk
+        self.workers_per_exchange = workers_per_exchange
+        self.remembered_ids = remembered_ids
+        self._queues: Dict[str, queue.PriorityQueue] = {}
+        self._orders: 'OrderedDict[str, Order]' = OrderedDict()
+        self._in_flight: Dict[Tuple, Order] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Order], None]] = []
+        self.ack_latency: Dict[str, Histogram] = {}
+        self.counts = {'submitted': 0, 'acked': 0, 'rejected': 0, 'duplicates': 0, 'joined_in_flight': 0,
+                       'risk_rejected': 0}
+
+    def add_listener(self, callback: Callable[[Order], None]):
+        """Call `callback(order)` from the worker thread with every acked or rejected order"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Order], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    @staticmethod
+    def new_client_order_id(strategy: str = 'manual') -> str:
+        return f"{strategy[:3]}-{uuid.uuid4().hex[:20]}"
+
+    def submit(self, exchange: str, symbol: str, side: str, amount_usd: float, strategy: str = 'manual',
+               confidence: float = 0.5, price: Optional[float] = None, priority: Optional[OrderPriority] = None,
+               client_order_id: Optional[str] = None, trace: Optional[Trace] = None) -> Order:
+        """Queue an order; returns the existing order for a known ID or an identical in-flight order
+
+        A `trace` is marked at the risk check, at submission to the exchange and at the ack.
+        """
+        order = Order(
+            client_order_id=client_order_id or self.new_client_order_id(strategy),
+            exchange=exchange,
+            symbol=symbol,
+            side=side.lower(),
+            amount_usd=amount_usd,
+            strategy=strategy,
+            confidence=confidence,
+            price=price,
+            priority=priority if priority is not None else STRATEGY_PRIORITY.get(strategy, OrderPriority.MANUAL),
+            trace=trace
+        )
+
+        with self._lock:
+            existing = self._orders.get(order.client_order_id)
+            if existing is not None:
+                self.counts['duplicates'] += 1
+                if trace is not None:
+                    tracer.finish(trace, 'duplicate')
+                return existing
+
+            in_flight = self._in_flight.get(order.dedup_key) if client_order_id is None else None
+            if in_flight is not None:
+                self.counts['joined_in_flight'] += 1
+                logger.info(f"Order {order.client_order_id} joins in-flight {in_flight.client_order_id}")
+                self._remember(order.client_order_id, in_flight)
+                if trace is not None:
+                    tracer.finish(trace, 'joined')
+                return in_flight
+
+            reason = self.risk.check(order) if self.risk is not None else None
+            if trace is not None:
+                trace.mark('risk')
+            if reason is not None:
+                self._remember(order.client_order_id, order)
+                self.counts['risk_rejected'] += 1
+                order.state = 'rejected'
+                order.message = reason
+                order.future.set_result((False, reason))
+                logger.warning(f"🛑 Order {order.client_order_id} rejected - {reason}")
+                if trace is not None:
+                    tracer.finish(trace, 'risk_rejected')
+                return order
+
+            self._in_flight.setdefault(order.dedup_key, order)
+            self._remember(order.client_order_id, order)
+            self.counts['submitted'] += 1
+            order.submitted_at = clock.monotonic()
+
+        # Replays place orders inline so the same session gives the same trades
+        if clock.virtual:
+            self._execute(order)
+        else:
+            self._queue_for(exchange).put((order.priority, next(self._seq), order))
+        return order
+
+    def _remember(self, client_order_id: str, order: Order):
+        self._orders[client_order_id] = order
+        while len(self._orders) > self.remembered_ids:
+            self._orders.popitem(last=False)
+
+    def _queue_for(self, exchange: str) -> queue.PriorityQueue:
+        with self._lock:
+            order_queue = self._queues.get(exchange)
+            if order_queue is None:
+                order_queue = self._queues[exchange] = queue.PriorityQueue()
+                for i in range(self.workers_per_exchange):
+                    threading.Thread(target=self._worker, args=(order_queue,), name=f'orders-{exchange}-{i}',
+                                     daemon=True).start()
+            return order_queue
+
+    def _worker(self, order_queue: queue.PriorityQueue):
+        while True:
+            _, _, order = order_queue.get()
+            self._execute(order)
+
+    def _execute(self, order: Order):
+        order.state = 'submitted'
+        if order.trace is not None:
+            order.trace.mark('submit')
+        try:
+            success, message = self.place_order(order)
+        except Exception as e:
+            logger.error(f"Order {order.client_order_id} failed: {e}")
+            success, message = False, str(e)
+
+        order.acked_at = clock.monotonic()
+        order.state = 'acked' if success else 'rejected'
+        order.message = message
+        if self.risk is not None:
+            self.risk.release(order, success)
+        if order.trace is not None:
+            order.trace.mark('ack')
+            tracer.finish(order.trace, order.state)
+
+        with self._lock:
+            if self._in_flight.get(order.dedup_key) is order:
+                del self._in_flight[order.dedup_key]
+            self.counts['acked' if success else 'rejected'] += 1
+            histogram = self.ack_latency.get(order.exchange)
+            if histogram is None:
+                histogram = self.ack_latency[order.exchange] = Histogram()
+            histogram.observe(order.acked_at - order.submitted_at)
+
+        order.future.set_result((success, message))
+        for callback in self._listeners:
+            try:
+                callback(order)
+            except Exception as e:
+                logger.error(f"Order listener error: {e}")
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            recent: List[Order] = list(self._orders.values())[-20:]
+            return {
+                'counts': dict(self.counts),
+                'queued': {exchange: q.qsize() for exchange, q in self._queues.items()},
+                'in_flight': len(self._in_flight),
+                'submit_to_ack': {exchange: h.snapshot() for exchange, h in self.ack_latency.items()},
+                'recent': [order.to_dict() for order in dict.fromkeys(recent)]
+            }
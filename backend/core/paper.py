@@ -0,0 +1,418 @@
+"""
+Paper Trading Broker
+Author: Mattiaz
+Description: Fills paper orders against an order-book snapshot per exchange - book walking with
+             slippage protection, partial fills, resting limit orders with queue position, maker/taker
+             fees, simulated ack latency and PnL from actual entry and exit prices
+"""
+
+import itertools
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.clock import clock
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Fill:
+    order_id: int
+    exchange: str
+    symbol: str
+    side: str
+    requested_usd: float
+    quantity: float = 0.0
+    notional: float = 0.0
+    fee: float = 0.0
+    realized_pnl: float = 0.0
+    closed_quantity: float = 0.0  # part of the fill that reduced an open position
+    latency: float = 0.0
+    status: str = 'rejected'  # filled, partial, resting, rejected
+    reason: str = ''
+
+    @property
+    def avg_price(self) -> float:
+        return self.notional / self.quantity if self.quantity else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'order_id': self.order_id,
+            'exchange': self.exchange,
+            'symbol': self.symbol,
+            'side': self.side,
+            'status': self.status,
+            'quantity': self.quantity,
+            'avg_price': self.avg_price,
+            'notional': round(self.notional, 4),
+            'fee': round(self.fee, 4),
+            'realized_pnl': round(self.realized_pnl, 4),
+            'closed_quantity': self.closed_quantity,
+            'latency_ms': round(self.latency * 1000, 3),
+            'reason': self.reason
+        }
+
+
+class OrderBook:
+    """
+    Price levels on both sides as parallel lists, best first. Sizes are in base asset
+    and are consumed by our fills until the next quote rebuilds the book.
+    """
+
+    __slots__ = ('mid', 'bid_prices', 'bid_sizes', 'ask_prices', 'ask_sizes')
+
+    def __init__(self, mid: float, bid_prices: List[float], bid_sizes: List[float],
+                 ask_prices: List[float], ask_sizes: List[float]):
+        self.mid = mid
+        self.bid_prices = bid_prices
+        self.bid_sizes = bid_sizes
+        self.ask_prices = ask_prices
+        self.ask_sizes = ask_sizes
+
+    def side_for(self, taker_side: str) -> Tuple[List[float], List[float]]:
+        """Levels a taker order of `taker_side` trades against"""
+        return (self.ask_prices, self.ask_sizes) if taker_side == 'buy' else (self.bid_prices, self.bid_sizes)
+
+
+@dataclass
+class BookModel:
+    """Synthetic depth around the last traded price - we only poll tickers, not books"""
+    spread_bps: float = 2.0
+    tick_bps: float = 1.0  # distance between levels
+    levels: int = 10
+    level_usd: float = 5000.0  # size of the best level
+    depth_growth: float = 1.4  # each level deeper holds this much more
+
+    def build(self, price: float) -> OrderBook:
+        half_spread = self.spread_bps / 2 / 10000
+        tick = self.tick_bps / 10000
+        offsets = [half_spread + i * tick for i in range(self.levels)]
+        sizes = [self.level_usd * self.depth_growth ** i / price for i in range(self.levels)]
+        return OrderBook(price,
+                         [price * (1 - offset) for offset in offsets], list(sizes),
+                         [price * (1 + offset) for offset in offsets], list(sizes))
+
+
+@dataclass(eq=False)
+class RestingOrder:
+    order_id: int
+    exchange: str
+    symbol: str
+    side: str
+    price: float
+    quantity: float
+    queue_ahead: float  # base size in front of us at our price
+    filled: float = 0.0
+    created_at: float = 0.0
+    fills: List[Fill] = field(default_factory=list)
+
+    @property
+    def remaining(self) -> float:
+        return self.quantity - self.filled
+
+
+class Position:
+    """Signed quantity with average entry price; entry fees are part of the cost basis"""
+
+    __slots__ = ('quantity', 'avg_price')
+
+    def __init__(self):
+        self.quantity = 0.0
+        self.avg_price = 0.0
+
+    def apply(self, side: str, quantity: float, price: float, fee: float) -> Tuple[float, float]:
+        """Apply a fill; returns the realized PnL and the quantity of the part that closed the position"""
+        signed = quantity if side == 'buy' else -quantity
+        realized = closing = 0.0
+        fee_per_unit = fee / quantity if quantity else 0.0
+
+        if self.quantity and (self.quantity > 0) != (signed > 0):
+            closing = min(quantity, abs(self.quantity))
+            if self.quantity > 0:
+                realized = closing * (price - fee_per_unit - self.avg_price)
+            else:
+                realized = closing * (self.avg_price - price - fee_per_unit)
+            self.quantity += closing if signed > 0 else -closing
+            quantity -= closing
+            if not self.quantity:
+                self.avg_price = 0.0
+
+        if quantity > 1e-12:
+            # Long cost includes the fee, short entry is net of it
+            entry = price + fee_per_unit if signed > 0 else price - fee_per_unit
+            held = abs(self.quantity)
+            self.avg_price = (held * self.avg_price + quantity * entry) / (held + quantity)
+            self.quantity += quantity if signed > 0 else -quantity
+        return realized, closing
+
+
+class PaperBroker:
+    """
+    Paper exchange for every trading path.
+
+    Each (exchange, symbol) has a book built from the latest quote (`on_quote`). Market
+    orders walk the book until filled, out of depth or past `max_slippage_bps` from the
+    reference price - anything left is a partial fill. Limit orders that do not cross
+    rest at their price behind the size displayed there; later quotes trade through the
+    queue (`turnover` of the level per quote at the touch, everything when the price
+    moves through) and fill them, reported via `on_fill`.
+
+    Positions are netted per symbol across exchanges, so an arbitrage round trip (buy on
+    one exchange, sell on another) realizes the spread minus fees.
+
+    Ack latency is drawn from a lognormal around `latency_ms`; with `simulate_latency`
+    the caller's thread sleeps it (on the engine clock) before the book is hit, so
+    quotes that arrive in the meantime move the fill price.
+    """
+
+    def __init__(self, taker_fee: float = 0.001, maker_fee: float = 0.0008, latency_ms: float = 50.0,
+                 latency_sigma: float = 0.5, max_slippage_bps: float = 50.0, turnover: float = 0.3,
+                 book_model: Optional[BookModel] = None, fees: Optional[Dict[str, Tuple[float, float]]] = None,
+                 simulate_latency: bool = True, rng=None, on_fill: Optional[Callable[[Fill], None]] = None):
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.fees = fees or {}  # exchange -> (maker, taker)
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.max_slippage_bps = max_slippage_bps
+        self.turnover = turnover
+        self.book_model = book_model or BookModel()
+        self.simulate_latency = simulate_latency
+        self.rng = rng if rng is not None else np.random
+        self.on_fill = on_fill
+        self.quotes: Dict[Tuple[str, str], float] = {}
+        self._books: Dict[Tuple[str, str], OrderBook] = {}
+        self._resting: Dict[Tuple[str, str], List[RestingOrder]] = {}
+        self.positions: Dict[str, Position] = {}
+        self.counts = {'orders': 0, 'filled': 0, 'partial': 0, 'resting': 0, 'rejected': 0}
+        self.volume_usd = 0.0
+        self.fees_paid = 0.0
+        self.realized_pnl = 0.0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # Market data
+
+    def on_quote(self, exchange: str, symbol: str, price: float):
+        """New last price: the book is rebuilt on next use and resting orders may trade"""
+        if not price or price <= 0:
+            return
+        key = (exchange, symbol)
+        fills = []
+        with self._lock:
+            previous = self.quotes.get(key)
+            self.quotes[key] = price
+            if previous != price:
+                self._books.pop(key, None)
+            resting = self._resting.get(key)
+            if resting:
+                fills = self._trade_resting(key, resting, price)
+        for fill in fills:
+            self._notify(fill)
+
+    def on_quotes(self, symbol: str, exchange_prices: Dict[str, float]):
+        for exchange, price in exchange_prices.items():
+            self.on_quote(exchange, symbol, price)
+
+    def _book(self, key: Tuple[str, str]) -> Optional[OrderBook]:
+        book = self._books.get(key)
+        if book is None:
+            price = self.quotes.get(key)
+            if price is None:
+                return None
+            book = self._books[key] = self.book_model.build(price)
+        return book
+
+    # Orders
+
+    def sample_latency(self) -> float:
+        return self.latency_ms / 1000 * float(self.rng.lognormal(0.0, self.latency_sigma))
+
+    def execute(self, exchange: str, symbol: str, side: str, amount_usd: float,
+                price: Optional[float] = None) -> Fill:
+        """
+        Market order for `amount_usd`, protected at `max_slippage_bps` from `price` (the quote
+        the decision was made on; the current quote when omitted).
+        """
+        side = side.lower()
+        fill = Fill(next(self._ids), exchange, symbol, side, amount_usd)
+        fill.latency = self.sample_latency()
+        if self.simulate_latency:
+            clock.sleep(fill.latency)
+
+        key = (exchange, symbol)
+        with self._lock:
+            self.counts['orders'] += 1
+            if price:
+                self.quotes.setdefault(key, price)
+            book = self._book(key)
+            if book is None:
+                return self._reject(fill, f"no quote for {symbol} on {exchange}")
+
+            reference = price or book.mid
+            slippage = self.max_slippage_bps / 10000
+            limit = reference * (1 + slippage) if side == 'buy' else reference * (1 - slippage)
+            self._take(fill, book, limit, amount_usd)
+            if not fill.quantity:
+                return self._reject(fill, f"no liquidity within {self.max_slippage_bps:g}bps of {reference:.4f}")
+
+            fill.fee = fill.notional * self.fees.get(exchange, (self.maker_fee, self.taker_fee))[1]
+            fill.status = 'filled' if fill.notional >= amount_usd * 0.999 else 'partial'
+            if fill.status == 'partial':
+                fill.reason = f"filled ${fill.notional:.2f} of ${amount_usd:.2f} within slippage limit"
+            self._book_fill(fill)
+        return fill
+
+    def place_limit(self, exchange: str, symbol: str, side: str, amount_usd: float, price: float) -> Fill:
+        """
+        Limit order: the marketable part fills now (taker), the rest rests at `price` behind the
+        size already displayed there. Returns the immediate fill; later fills go to `on_fill`.
+        """
+        side = side.lower()
+        fill = Fill(next(self._ids), exchange, symbol, side, amount_usd)
+        key = (exchange, symbol)
+        with self._lock:
+            self.counts['orders'] += 1
+            book = self._book(key)
+            if book is None:
+                return self._reject(fill, f"no quote for {symbol} on {exchange}")
+
+            self._take(fill, book, price, amount_usd)
+            remaining = (amount_usd - fill.notional) / price
+            if remaining > 1e-12:
+                self._resting.setdefault(key, []).append(RestingOrder(
+                    order_id=fill.order_id, exchange=exchange, symbol=symbol, side=side, price=price,
+                    quantity=remaining, queue_ahead=self._displayed_at(book, side, price),
+                    created_at=clock.monotonic()
+                ))
+                fill.status = 'partial' if fill.quantity else 'resting'
+            else:
+                fill.status = 'filled'
+
+            if fill.quantity:
+                fill.fee = fill.notional * self.fees.get(exchange, (self.maker_fee, self.taker_fee))[1]
+                self._book_fill(fill)
+            else:
+                self.counts['resting'] += 1
+        return fill
+
+    def cancel(self, order_id: int) -> bool:
+        with self._lock:
+            for orders in self._resting.values():
+                for order in orders:
+                    if order.order_id == order_id:
+                        orders.remove(order)
+                        return True
+        return False
+
+    def _take(self, fill: Fill, book: OrderBook, limit: float, amount_usd: float):
+        """Walk the opposite side up to `limit`, consuming displayed size"""
+        prices, sizes = book.side_for(fill.side)
+        buying = fill.side == 'buy'
+        remaining_usd = amount_usd
+        for i, level_price in enumerate(prices):
+            if remaining_usd <= 1e-9 or (level_price > limit if buying else level_price < limit):
+                break
+            available = sizes[i]
+            if available <= 0:
+                continue
+            quantity = min(available, remaining_usd / level_price)
+            sizes[i] = available - quantity
+            fill.quantity += quantity
+            fill.notional += quantity * level_price
+            remaining_usd -= quantity * level_price
+
+    @staticmethod
+    def _displayed_at(book: OrderBook, side: str, price: float) -> float:
+        """Size resting at exactly our price on our side of the book"""
+        prices, sizes = (book.bid_prices, book.bid_sizes) if side == 'buy' else (book.ask_prices, book.ask_sizes)
+        for level_price, size in zip(prices, sizes):
+            if abs(level_price - price) <= price * 1e-9:
+                return size
+        return 0.0
+
+    def _trade_resting(self, key: Tuple[str, str], orders: List[RestingOrder], price: float) -> List[Fill]:
+        """Advance resting orders against a new last price"""
+        fills = []
+        level_size = self.book_model.level_usd / price
+        for order in list(orders):
+            buying = order.side == 'buy'
+            through = price < order.price if buying else price > order.price
+            at_touch = abs(price - order.price) <= order.price * self.book_model.tick_bps / 10000
+
+            if through:
+                quantity = order.remaining
+            elif at_touch:
+                traded = level_size * self.turnover
+                consumed = min(order.queue_ahead, traded)
+                order.queue_ahead -= consumed
+                quantity = min(order.remaining, traded - consumed)
+            else:
+                continue
+            if quantity <= 1e-12:
+                continue
+
+            fill = Fill(order.order_id, order.exchange, order.symbol, order.side, quantity * order.price,
+                        quantity=quantity, notional=quantity * order.price)
+            fill.fee = fill.notional * self.fees.get(order.exchange, (self.maker_fee, self.taker_fee))[0]
+            fill.latency = clock.monotonic() - order.created_at
+            order.filled += quantity
+            if order.remaining <= 1e-12:
+                orders.remove(order)
+                fill.status = 'filled'
+            else:
+                fill.status = 'partial'
+            self._book_fill(fill)
+            order.fills.append(fill)
+            fills.append(fill)
+        if not orders:
+            self._resting.pop(key, None)
+        return fills
+
+    def _book_fill(self, fill: Fill):
+        position = self.positions.get(fill.symbol)
+        if position is None:
+            position = self.positions[fill.symbol] = Position()
+        fill.realized_pnl, fill.closed_quantity = position.apply(fill.side, fill.quantity, fill.avg_price, fill.fee)
+        if fill.status in self.counts:
+            self.counts[fill.status] += 1
+        self.volume_usd += fill.notional
+        self.fees_paid += fill.fee
+        self.realized_pnl += fill.realized_pnl
+
+    def _reject(self, fill: Fill, reason: str) -> Fill:
+        fill.status = 'rejected'
+        fill.reason = reason
+        self.counts['rejected'] += 1
+        return fill
+
+    def _notify(self, fill: Fill):
+        if self.on_fill is None:
+            return
+        try:
+            self.on_fill(fill)
+        except Exception as e:
+            logger.error(f"Paper fill callback error: {e}")
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'counts': dict(self.counts),
+                'volume_usd': round(self.volume_usd, 2),
+                'fees_paid': round(self.fees_paid, 4),
+                'realized_pnl': round(self.realized_pnl, 4),
+                'positions': {
+                    symbol: {'quantity': position.quantity, 'avg_price': position.avg_price,
+                             'mark': self._mark(symbol)}
+                    for symbol, position in self.positions.items() if abs(position.quantity) > 1e-12
+                },
+                'resting_orders': sum(len(orders) for orders in self._resting.values())
+            }
+
+    def _mark(self, symbol: str) -> Optional[float]:
+        marks = [price for (exchange, quoted), price in self.quotes.items() if quoted == symbol]
+        return sum(marks) / len(marks) if marks else None
@@ -0,0 +1,107 @@
+"""
+Session Recording - Tick Capture and Replay Feed
+Author: Mattiaz
+Description: Records per-exchange price ticks to JSON lines and serves them back on virtual time
+"""
+
+import json
+import logging
+import threading
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+from core.clock import clock
+
+logger = logging.getLogger(__name__)
+
+
+class TickRecorder:
+    """Appends every polled price snapshot to a session file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+        logger.info(f"Recording market session to {path}")
+
+    def record(self, symbol: str, exchange_prices: Dict[str, float], timestamp: Optional[float] = None):
+        """Write one tick: the prices seen for `symbol` on each exchange"""
+        try:
+            line = json.dumps({
+                'ts': timestamp if timestamp is not None else clock.time(),
+                'symbol': symbol,
+                'prices': {name: float(price) for name, price in exchange_prices.items()}
+            })
+            with self._lock:
+                self._file.write(line + '\n')
+                self._file.flush()
+        except Exception as e:
+            logger.error(f"Failed to record tick for {symbol}: {e}")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class RecordedSession:
+    """A recorded session loaded into per-symbol, time-ordered tick arrays"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._times: Dict[str, List[float]] = {}
+        self._prices: Dict[str, List[Dict[str, float]]] = {}
+        self.exchanges: List[str] = []
+        self.start_time = 0.0
+        self.end_time = 0.0
+        self._load()
+
+    def _load(self):
+        ticks = []
+        with open(self.path, encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    ticks.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Skipping malformed tick on line {line_no} of {self.path}")
+
+        if not ticks:
+            raise ValueError(f"No ticks recorded in {self.path}")
+
+        ticks.sort(key=lambda t: t['ts'])
+        exchanges = set()
+        for tick in ticks:
+            self._times.setdefault(tick['symbol'], []).append(tick['ts'])
+            self._prices.setdefault(tick['symbol'], []).append(tick['prices'])
+            exchanges.update(tick['prices'])
+
+        self.exchanges = sorted(exchanges)
+        self.start_time = ticks[0]['ts']
+        self.end_time = ticks[-1]['ts']
+        logger.info(f"Loaded {len(ticks)} ticks for {len(self._times)} symbols from {self.path}")
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._times)
+
+    def prices_at(self, symbol: str, timestamp: float) -> Dict[str, float]:
+        """Latest recorded exchange prices for `symbol` at or before `timestamp`"""
+        times = self._times.get(symbol)
+        if not times:
+            return {}
+        index = bisect_right(times, timestamp) - 1
+        if index < 0:
+            return {}
+        return dict(self._prices[symbol][index])
+
+
+class ReplayFeed:
+    """Price source that answers from a recorded session at the clock's current time"""
+
+    def __init__(self, session: RecordedSession):
+        self.session = session
+
+    def get_prices(self, symbol: str) -> Dict[str, float]:
+        return self.session.prices_at(symbol, clock.time())
@@ -0,0 +1,173 @@
+"""
+Market Regime Statistics
+Author: Mattiaz
+Description: Streaming per-symbol regime inputs for strategy selection - EWMA realized volatility of
+             log returns, volume z-scores, cross-venue spread percentiles and indicator counts
+"""
+
+import logging
+import math
+import threading
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from core.clock import clock
+from core.features import FeatureStore, feature_store
+
+logger = logging.getLogger(__name__)
+
+VOL_HALF_LIFE = 60.0  # seconds of price history behind the volatility estimate
+HIGH_VOL_PCT_PER_HOUR = 2.0  # realized volatility that scores 1.0
+VOLUME_ALPHA = 0.05
+SPREAD_WINDOW = 240  # spread samples kept per symbol for percentiles
+
+
+class SymbolRegime:
+    """O(1) running state of one symbol"""
+
+    __slots__ = ('last_price', 'last_time', 'variance_per_second', 'samples', 'volume_mean', 'volume_var',
+                 'volume', 'spread', 'spreads')
+
+    def __init__(self):
+        self.last_price = 0.0
+        self.last_time = 0.0
+        self.variance_per_second = 0.0
+        self.samples = 0
+        self.volume_mean = 0.0
+        self.volume_var = 0.0
+        self.volume: Optional[float] = None
+        self.spread = 0.0
+        self.spreads = deque(maxlen=SPREAD_WINDOW)
+
+    def update(self, price: float, now: float, spread: Optional[float], volume: Optional[float]):
+        if self.samples and price > 0 and self.last_price > 0 and now > self.last_time:
+            # EWMA of squared log returns per second; the weight follows elapsed time so
+            # irregular polling (2s here, 15s there) measures the same volatility
+            dt = now - self.last_time
+            log_return = math.log(price / self.last_price)
+            weight = 1 - 0.5 ** (dt / VOL_HALF_LIFE)
+            self.variance_per_second += weight * (log_return * log_return / dt - self.variance_per_second)
+        if price > 0:
+            self.last_price, self.last_time = price, now
+            self.samples += 1
+
+        if spread is not None:
+            self.spread = spread
+            self.spreads.append(spread)
+
+        if volume is not None:
+            if self.volume is None:
+                self.volume_mean = volume
+            else:
+                delta = volume - self.volume_mean
+                self.volume_mean += VOLUME_ALPHA * delta
+                self.volume_var = (1 - VOLUME_ALPHA) * (self.volume_var + VOLUME_ALPHA * delta * delta)
+            self.volume = volume
+
+    @property
+    def volatility_pct_per_hour(self) -> float:
+        return math.sqrt(self.variance_per_second * 3600) * 100
+
+    @property
+    def volume_z(self) -> float:
+        if self.volume is None or self.volume_var <= 0:
+            return 0.0
+        return (self.volume - self.volume_mean) / math.sqrt(self.volume_var)
+
+    @property
+    def volume_ratio(self) -> Optional[float]:
+        if self.volume is None or self.volume_mean <= 0:
+            return None
+        return self.volume / self.volume_mean
+
+
+class RegimeTracker:
+    """
+    Per-symbol regime statistics fed by the price monitors through on_prices().
+
+    Volatility is estimated per symbol from its own log returns, so BTC and SOL price
+    levels never mix. Indicator counts come from the shared feature store, and
+    analyze() reads everything in O(symbols) with no extra computation per call.
+    """
+
+    def __init__(self, store: FeatureStore = feature_store):
+        self.store = store
+        self._symbols: Dict[str, SymbolRegime] = {}
+        self._lock = threading.Lock()
+        self.version = 0  # bumped on every update so consumers can skip unchanged state
+
+    def on_prices(self, symbol: str, exchange_prices: Dict[str, float], volume: Optional[float] = None,
+                  timestamp: Optional[float] = None):
+        quotes = [float(price) for price in exchange_prices.values() if price and math.isfinite(price)]
+        if not quotes:
+            return
+        now = clock.time() if timestamp is None else timestamp
+        low, high = min(quotes), max(quotes)
+        spread = (high - low) / low * 100 if len(quotes) >= 2 else None
+
+        with self._lock:
+            state = self._symbols.get(symbol)
+            if state is None:
+                state = self._symbols[symbol] = SymbolRegime()
+            state.update(sum(quotes) / len(quotes), now, spread, volume)
+            self.version += 1
+
+    def symbol_stats(self, symbol: str) -> Optional[Dict]:
+        with self._lock:
+            state = self._symbols.get(symbol)
+            if state is None:
+                return None
+            spreads = np.fromiter(state.spreads, dtype=np.float64, count=len(state.spreads))
+            volume_ratio = state.volume_ratio
+            stats = {
+                'volatility_pct_per_hour': state.volatility_pct_per_hour,
+                'volume_z': state.volume_z,
+                'volume_ratio': volume_ratio,
+                'spread': state.spread,
+                'spread_p50': float(np.percentile(spreads, 50)) if len(spreads) else 0.0,
+                'spread_p90': float(np.percentile(spreads, 90)) if len(spreads) else 0.0,
+                'spread_p99': float(np.percentile(spreads, 99)) if len(spreads) else 0.0,
+                'samples': state.samples
+            }
+
+        # Until the tick series warms up, the backfilled bar series has the indicators
+        features = self.store.latest(symbol)
+        ready = features is not None and features.ready
+        stats['rsi'] = features.rsi if ready else None
+        stats['macd'] = features.macd if ready else None
+        # Without a volume feed the feature store's tick activity is the volume proxy
+        stats['volume_spike'] = volume_ratio if volume_ratio is not None else (features.volume_spike if ready else 1.0)
+        return stats
+
+    def analyze(self, symbols: Optional[Iterable[str]] = None) -> Dict:
+        """Aggregate regime over `symbols` (all tracked symbols by default)"""
+        with self._lock:
+            names = list(self._symbols) if symbols is None else [s for s in symbols if s in self._symbols]
+        per_symbol = {symbol: self.symbol_stats(symbol) for symbol in names}
+
+        scores = [min(1.0, stats['volatility_pct_per_hour'] / HIGH_VOL_PCT_PER_HOUR)
+                  for stats in per_symbol.values() if stats['samples'] > 1]
+        rsi = [stats['rsi'] for stats in per_symbol.values() if stats['rsi'] is not None]
+        macd = [stats['macd'] for stats in per_symbol.values() if stats['macd'] is not None]
+
+        return {
+            'volatility': sum(scores) / len(scores) if scores else 0.5,
+            'volume_spike': max((stats['volume_spike'] for stats in per_symbol.values()), default=1.0),
+            'max_volume_z': max((stats['volume_z'] for stats in per_symbol.values()), default=0.0),
+            'max_price_spread': max((stats['spread'] for stats in per_symbol.values()), default=0.0),
+            'max_spread_p90': max((stats['spread_p90'] for stats in per_symbol.values()), default=0.0),
+            'rsi_oversold': sum(1 for value in rsi if value < 30),
+            'rsi_overbought': sum(1 for value in rsi if value > 70),
+            'macd_bullish': sum(1 for value in macd if value > 0.2),
+            'macd_bearish': sum(1 for value in macd if value < -0.2),
+            'symbols': {
+                symbol: {key: round(value, 4) if isinstance(value, float) else value for key, value in stats.items()}
+                for symbol, stats in per_symbol.items()
+            }
+        }
+
+
+# Global instance
+regime_tracker = RegimeTracker()
@@ -0,0 +1,78 @@
+"""
+Trade Replay
+Author: Mattiaz
+Description: Timeline and performance metrics over the engine's filled trades for the dashboard's
+             trade replay view
+"""
+
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from config.settings import settings
+from core.clock import clock
+from core.engine import TradingEngine, engine
+
+logger = logging.getLogger(__name__)
+
+
+class TradeReplay:
+    """Reads the engine's trade history; fills are recorded by the engine, nothing is stored here"""
+
+    def __init__(self, trading_engine: TradingEngine):
+        self.engine = trading_engine
+
+    def _trades(self, limit: Optional[int] = None) -> List[Dict]:
+        limit = settings.REPLAY_MAX_TRADES if limit is None else min(limit, settings.REPLAY_MAX_TRADES)
+        return self.engine.get_trade_history(limit)
+
+    async def get_trade_timeline(self, limit: Optional[int] = None) -> List[Dict]:
+        """Trades oldest first, shaped for the replay player"""
+        return [
+            {
+                'id': trade.get('id') or f"trade_{i}",
+                'timestamp': trade['timestamp'].isoformat(),
+                'symbol': trade['symbol'],
+                'side': trade['direction'],
+                'amount': trade['amount'],
+                'price': trade['price'],
+                'profit': trade['profit'],
+                'strategy': trade['strategy'],
+                'confidence': trade['confidence'],
+                'exchange': trade['exchange']
+            }
+            for i, trade in enumerate(self._trades(limit))
+        ]
+
+    async def get_performance_metrics(self, days: Optional[int] = None) -> Dict:
+        """Totals and per-strategy breakdown for the trades of the last `days` days"""
+        days = settings.REPLAY_METRICS_DAYS if days is None else days
+        since = clock.now() - timedelta(days=days)
+        trades = [trade for trade in self.engine.get_trade_history(len(self.engine.trade_history))
+                  if trade['timestamp'] >= since]
+        profits = [trade['profit'] for trade in trades]
+
+        by_strategy: Dict[str, Dict] = {}
+        for trade in trades:
+            stats = by_strategy.setdefault(trade['strategy'], {'trades': 0, 'profit': 0.0, 'volume': 0.0})
+            stats['trades'] += 1
+            stats['profit'] = round(stats['profit'] + trade['profit'], 2)
+            stats['volume'] = round(stats['volume'] + trade['amount'], 2)
+
+        return {
+            'days': days,
+            'total_trades': len(trades),
+            'total_profit': round(sum(profits), 2),
+            'total_volume': round(sum(trade['amount'] for trade in trades), 2),
+            'fees_paid': round(sum(trade['fee'] for trade in trades), 4),
+            'winning_trades': sum(1 for profit in profits if profit > 0),
+            'losing_trades': sum(1 for profit in profits if profit < 0),
+            'avg_profit': round(sum(profits) / len(profits), 2) if profits else 0.0,
+            'best_trade': max(profits, default=0.0),
+            'worst_trade': min(profits, default=0.0),
+            'by_strategy': by_strategy
+        }
+
+
+# Global instance
+trade_replay = TradeReplay(engine)
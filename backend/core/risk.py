@@ -0,0 +1,178 @@
+"""
+Risk Engine
+Author: Mattiaz
+Description: Pre-trade risk checks against running exposure, open-order and daily-loss aggregates
+             indexed by symbol, exchange and strategy - every check is a handful of dict lookups
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from config.settings import settings
+from core.clock import clock
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ('symbol', 'exchange', 'strategy')
+SIGN = {'buy': 1.0, 'sell': -1.0}
+
+
+@dataclass
+class RiskLimits:
+    max_order_usd: float = 1000.0
+    max_symbol_exposure: float = 3000.0
+    max_exchange_exposure: float = 5000.0
+    max_strategy_exposure: float = 5000.0
+    max_open_orders: int = 10  # per exchange
+    max_daily_loss: float = 500.0  # realized, all strategies
+    # Per-key exposure limits, e.g. {('symbol', 'SOL/USDT'): 1000.0}
+    overrides: Dict[Tuple[str, str], float] = field(default_factory=dict)
+
+    @classmethod
+    def from_settings(cls) -> 'RiskLimits':
+        return cls(
+            max_order_usd=settings.RISK_MAX_ORDER_USD,
+            max_symbol_exposure=settings.RISK_MAX_SYMBOL_EXPOSURE,
+            max_exchange_exposure=settings.RISK_MAX_EXCHANGE_EXPOSURE,
+            max_strategy_exposure=settings.RISK_MAX_STRATEGY_EXPOSURE,
+            max_open_orders=settings.RISK_MAX_OPEN_ORDERS,
+            max_daily_loss=settings.RISK_MAX_DAILY_LOSS
+        )
+
+
+class RiskEngine:
+    """
+    Keeps the aggregates up to date as orders move through their lifecycle instead of
+    recomputing them from the trade log, so a pre-trade check costs the same no matter
+    how many orders or trades there are.
+
+    - check(order): validate and reserve (open orders, committed exposure)
+    - release(order, filled): the order was acked or rejected; an unfilled order gives
+      its reserved exposure back
+    - record_pnl(...): realized profit/loss of a fill, for the daily-loss limit
+
+    Exposure is the signed net notional (buy +, sell -); checks use the committed
+    exposure (filled + open orders). An order that brings an aggregate closer to zero is
+    never rejected on exposure, so positions can always be reduced - also after the
+    daily-loss limit is hit.
+
+    `order` is anything with exchange, symbol, strategy, side and amount_usd attributes.
+    """
+
+    def __init__(self, limits: Optional[RiskLimits] = None):
+        # One dict per dimension, keyed by the plain symbol/exchange/strategy name
+        self._committed: Tuple[Dict[str, float], ...] = ({}, {}, {})  # filled + open orders
+        self._filled: Tuple[Dict[str, float], ...] = ({}, {}, {})
+        self._daily_pnl: Tuple[Dict[str, float], ...] = ({}, {}, {})
+        self._open_orders: Dict[str, int] = {}
+        self._daily_total = 0.0
+        self._day = self._today()
+        self.rejections: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.set_limits(limits or RiskLimits.from_settings())
+
+    def set_limits(self, limits: RiskLimits):
+        with self._lock:
+            self.limits = limits
+            self._exposure_limits = tuple(
+                (default, {key: limit for (dim, key), limit in limits.overrides.items() if dim == dimension})
+                for dimension, default in zip(DIMENSIONS, (limits.max_symbol_exposure, limits.max_exchange_exposure,
+                                                          limits.max_strategy_exposure))
+            )
+
+    @staticmethod
+    def _today() -> int:
+        return int(clock.time() // 86400)
+
+    def _roll_day(self):
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._daily_pnl = ({}, {}, {})
+            self._daily_total = 0.0
+
+    def check(self, order) -> Optional[str]:
+        """Validate and reserve an order; returns the rejection reason or None"""
+        signed = SIGN.get(order.side, 0.0) * order.amount_usd
+        keys = (order.symbol, order.exchange, order.strategy)
+        limits = self.limits
+
+        with self._lock:
+            if order.amount_usd > limits.max_order_usd:
+                return self._reject('order_size', f"order ${order.amount_usd:.2f} exceeds max ${limits.max_order_usd:.2f}")
+
+            open_orders = self._open_orders.get(order.exchange, 0)
+            if open_orders >= limits.max_open_orders:
+                return self._reject('open_orders', f"{limits.max_open_orders} orders already open on {order.exchange}")
+
+            committed = self._committed
+            current = (committed[0].get(keys[0], 0.0), committed[1].get(keys[1], 0.0), committed[2].get(keys[2], 0.0))
+            reduces_symbol = abs(current[0] + signed) <= abs(current[0])
+            for i in range(3):
+                projected = abs(current[i] + signed)
+                if projected <= abs(current[i]):
+                    continue
+                default, overrides = self._exposure_limits[i]
+                limit = overrides.get(keys[i], default) if overrides else default
+                if projected > limit:
+                    return self._reject(f"{DIMENSIONS[i]}_exposure", f"{DIMENSIONS[i]} {keys[i]} exposure "
+                                                                     f"${projected:.2f} would exceed ${limit:.2f}")
+
+            if not reduces_symbol and -self._daily_total >= limits.max_daily_loss:
+                self._roll_day()
+                if -self._daily_total >= limits.max_daily_loss:
+                    return self._reject('daily_loss', f"daily loss ${-self._daily_total:.2f} reached limit "
+                                                      f"${limits.max_daily_loss:.2f} - only reducing orders allowed")
+
+            committed[0][keys[0]] = current[0] + signed
+            committed[1][keys[1]] = current[1] + signed
+            committed[2][keys[2]] = current[2] + signed
+            self._open_orders[order.exchange] = open_orders + 1
+        return None
+
+    def _reject(self, rule: str, reason: str) -> str:
+        self.rejections[rule] = self.rejections.get(rule, 0) + 1
+        return f"risk: {reason}"
+
+    def release(self, order, filled: bool):
+        """Order left the open state; a fill keeps its exposure, anything else gives it back"""
+        signed = SIGN.get(order.side, 0.0) * order.amount_usd
+        with self._lock:
+            target = self._filled if filled else self._committed
+            if not filled:
+                signed = -signed
+            for book, key in zip(target, (order.symbol, order.exchange, order.strategy)):
+                book[key] = book.get(key, 0.0) + signed
+            self._open_orders[order.exchange] -= 1
+
+    def record_pnl(self, exchange: str, symbol: str, strategy: str, profit: float):
+        """Realized profit (negative for a loss) of a fill"""
+        if not profit:
+            return
+        with self._lock:
+            self._roll_day()
+            for book, key in zip(self._daily_pnl, (symbol, exchange, strategy)):
+                book[key] = book.get(key, 0.0) + profit
+            self._daily_total += profit
+        if -self._daily_total >= self.limits.max_daily_loss:
+            logger.warning(f"⚠️ Daily loss limit reached: ${-self._daily_total:.2f}")
+
+    def get_stats(self) -> Dict:
+        def by_dimension(books) -> Dict[str, Dict[str, float]]:
+            return {dimension: {key: round(value, 2) for key, value in book.items()}
+                    for dimension, book in zip(DIMENSIONS, books)}
+
+        with self._lock:
+            self._roll_day()
+            pending = tuple({key: value - filled.get(key, 0.0) for key, value in committed.items()}
+                            for committed, filled in zip(self._committed, self._filled))
+            return {
+                'limits': {k: v for k, v in vars(self.limits).items() if k != 'overrides'},
+                'exposure': by_dimension(self._filled),
+                'pending': by_dimension(pending),
+                'open_orders': dict(self._open_orders),
+                'daily_pnl': {'total': round(self._daily_total, 2), **by_dimension(self._daily_pnl)},
+                'rejections': dict(self.rejections)
+            }
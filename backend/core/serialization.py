@@ -0,0 +1,40 @@
+"""
+Fast JSON Serialization
+Author: Mattiaz
+Description: orjson-based JSON encoder with native numpy, datetime and dataclass support
+"""
+
+from typing import Any
+
+import orjson
+
+# numpy arrays and scalars, datetimes and dataclasses are handled natively by orjson
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any):
+    """Fallback for what orjson does not know: numpy views/object arrays, sets, Decimals, enums"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if hasattr(value, 'item'):
+        return value.item()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if hasattr(value, 'model_dump'):
+        return value.model_dump()
+    if hasattr(value, 'value'):
+        return value.value
+    return str(value)
+
+
+def dumps(value: Any) -> bytes:
+    """Compact JSON bytes"""
+    return orjson.dumps(value, default=_default, option=OPTIONS)
+
+
+def dumps_str(value: Any) -> str:
+    """Compact JSON text, for WebSocket text frames"""
+    return orjson.dumps(value, default=_default, option=OPTIONS).decode('utf-8')
+
+
+loads = orjson.loads
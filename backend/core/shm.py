@@ -0,0 +1,85 @@
+"""
+Shared-Memory State
+Author: Mattiaz
+Description: Single-writer, many-reader state segment guarded by a seqlock, used to share the
+             engine's market state with stateless API worker processes
+"""
+
+import logging
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Layout: sequence (u64) | version (i64) | payload length (u64) | payload bytes
+HEADER = struct.Struct('<QqQ')
+DEFAULT_SIZE = 4 * 1024 * 1024
+
+
+class SharedState:
+    """
+    Versioned byte payload in a shared-memory segment.
+
+    The writer bumps the sequence to an odd number, writes the payload and bumps it back
+    to even. Readers copy the payload and retry if the sequence was odd or changed while
+    they were copying, so they never block the writer and never see a torn document.
+    There must be exactly one writer process.
+    """
+
+    def __init__(self, segment: shared_memory.SharedMemory, owner: bool):
+        self._segment = segment
+        self._buf = segment.buf
+        self._owner = owner
+        self.name = segment.name
+        self.capacity = segment.size - HEADER.size
+
+    @classmethod
+    def create(cls, size: int = DEFAULT_SIZE, name: Optional[str] = None) -> 'SharedState':
+        segment = shared_memory.SharedMemory(name=name, create=True, size=HEADER.size + size)
+        HEADER.pack_into(segment.buf, 0, 0, 0, 0)
+        return cls(segment, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedState':
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    def write(self, version: int, payload: bytes) -> bool:
+        """Publish a new payload; only the single writer process may call this"""
+        if len(payload) > self.capacity:
+            logger.error(f"Shared state payload of {len(payload)} bytes exceeds capacity {self.capacity}")
+            return False
+
+        sequence = HEADER.unpack_from(self._buf, 0)[0]
+        struct.pack_into('<Q', self._buf, 0, sequence + 1)
+        self._buf[HEADER.size:HEADER.size + len(payload)] = payload
+        HEADER.pack_into(self._buf, 0, sequence + 1, version, len(payload))
+        struct.pack_into('<Q', self._buf, 0, sequence + 2)
+        return True
+
+    @property
+    def version(self) -> int:
+        """Latest published version, without copying the payload"""
+        while True:
+            sequence, version, _ = HEADER.unpack_from(self._buf, 0)
+            if not sequence & 1 and struct.unpack_from('<Q', self._buf, 0)[0] == sequence:
+                return version
+            time.sleep(0)
+
+    def read(self) -> Tuple[int, bytes]:
+        """Consistent (version, payload) copy"""
+        while True:
+            sequence, version, length = HEADER.unpack_from(self._buf, 0)
+            if sequence & 1:
+                time.sleep(0)
+                continue
+            payload = bytes(self._buf[HEADER.size:HEADER.size + length])
+            if struct.unpack_from('<Q', self._buf, 0)[0] == sequence:
+                return version, payload
+
+    def close(self):
+        self._buf = None
+        self._segment.close()
+        if self._owner:
+            self._segment.unlink()
@@ -0,0 +1,260 @@
+"""
+Status Snapshot Publisher
+Author: Mattiaz
+Description: Builds and serializes the dashboard status document once per data version, served with
+             ETags or as versioned deltas against a client's last seen version
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+
+# How list fields are diffed; everything else is diffed as nested dicts or replaced.
+# Paths are dotted keys, '*' matches any dict key at that level.
+DELTA_RULES = {
+    'trade_log': ('append', None),
+    'ai_signals': ('keyed', ('symbol',)),
+    'arbitrage_opportunities': ('keyed', ('symbol', 'buy_exchange', 'sell_exchange')),
+    'market_data.*.price_history': ('append', None),
+}
+
+# Snapshots kept as delta bases; older client versions get a full snapshot
+DELTA_HISTORY = 64
+
+
+@dataclass(frozen=True)
+class StatusSnapshot:
+    version: int
+    document: Dict
+    body: bytes
+    etag: str
+    deltas: Dict[int, bytes] = field(default_factory=dict, compare=False)
+
+    @property
+    def full_envelope(self) -> bytes:
+        """The snapshot wrapped for delta clients: {"version", "full": true, "status"}"""
+        return b'{"version":%d,"full":true,"status":%s}' % (self.version, self.body)
+
+
+def _rule_for(path: Tuple[str, ...]) -> Optional[Tuple[str, Any]]:
+    for pattern, rule in DELTA_RULES.items():
+        parts = pattern.split('.')
+        if len(parts) == len(path) and all(p == '*' or p == k for p, k in zip(parts, path)):
+            return rule
+    return None
+
+
+def _diff_append(old: List, new: List) -> Optional[Dict]:
+    """Sliding-window lists (trade log, price history): send only the new tail"""
+    if old == new:
+        return None
+    if not old:
+        return {'append': new, 'length': len(new)}
+    for index in range(len(new) - 1, -1, -1):
+        if new[index] == old[-1]:
+            return {'append': new[index + 1:], 'length': len(new)}
+    return {'replace': new}
+
+
+def _diff_keyed(old: List[Dict], new: List[Dict], key_fields: Tuple[str, ...]) -> Optional[Dict]:
+    """Lists of records identified by key fields (signals, opportunities)"""
+    def key_of(item):
+        return [item.get(f) for f in key_fields]
+
+    old_items = {tuple(key_of(item)): item for item in old}
+    new_keys = [key_of(item) for item in new]
+    if len({tuple(key) for key in new_keys}) != len(new_keys):
+        return {'replace': new}
+    upsert = [item for item, key in zip(new, new_keys) if old_items.get(tuple(key)) != item]
+    remaining = {tuple(key) for key in new_keys}
+    remove = [list(key) for key in old_items if key not in remaining]
+
+    if not upsert and not remove and [key_of(item) for item in old] == new_keys:
+        return None
+    return {'key': list(key_fields), 'upsert': upsert, 'remove': remove, 'order': new_keys}
+
+
+def diff_documents(old: Any, new: Any, path: Tuple[str, ...] = ()) -> Optional[Dict]:
+    """
+    Patch turning `old` into `new`, or None when nothing changed.
+
+    Dicts produce {"set": {...}, "unset": [...], "nested": {key: patch}}; list fields
+    follow DELTA_RULES; any other change is a {"replace": value}.
+    """
+    rule = _rule_for(path)
+    if rule and isinstance(old, list) and isinstance(new, list):
+        kind, key_fields = rule
+        if kind == 'append':
+            return _diff_append(old, new)
+        return _diff_keyed(old, new, key_fields)
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        changed, nested = {}, {}
+        for key, value in new.items():
+            if key not in old:
+                changed[key] = value
+            elif old[key] is not value and old[key] != value:
+                sub = diff_documents(old[key], value, path + (str(key),))
+                if sub is not None and 'replace' in sub and len(sub) == 1:
+                    changed[key] = sub['replace']
+                elif sub is not None:
+                    nested[key] = sub
+        unset = [key for key in old if key not in new]
+
+        if not changed and not nested and not unset:
+            return None
+        patch = {}
+        if changed:
+            patch['set'] = changed
+        if unset:
+            patch['unset'] = unset
+        if nested:
+            patch['nested'] = nested
+        return patch
+
+    return None if old == new else {'replace': new}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header against the current ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+class StatusPublisher:
+    """
+    Caches the status document per data version.
+
+    Producers call mark_dirty() whenever prices, trades or trading state change. The
+    document is rebuilt and serialized once for the new version - by the background
+    run() loop in async apps, or lazily by get() in threaded apps - and every request
+    in between is served the same bytes and ETag.
+    """
+
+    def __init__(self, build: Callable[[], Any]):
+        self._build = build
+        # Start from the wall clock so versions keep increasing across restarts
+        self._version = int(time.time() * 1000)
+        self._snapshot: Optional[StatusSnapshot] = None
+        self._history: 'OrderedDict[int, StatusSnapshot]' = OrderedDict()
+        self._version_lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._delta_lock = threading.Lock()
+        self._listeners: List[Callable[[StatusSnapshot], None]] = []
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def snapshot(self) -> Optional[StatusSnapshot]:
+        return self._snapshot
+
+    def mark_dirty(self):
+        with self._version_lock:
+            self._version += 1
+
+    def add_listener(self, callback: Callable[[StatusSnapshot], None]):
+        """Call `callback` with every newly published snapshot"""
+        self._listeners.append(callback)
+
+    def publish(self, document: Dict, version: int, body: Optional[bytes] = None) -> StatusSnapshot:
+        """Serialize a freshly built document once and make it the current snapshot"""
+        if body is None:
+            body = dumps(document)
+        etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+        snapshot = StatusSnapshot(version=version, document=document, body=body, etag=etag)
+
+        with self._delta_lock:
+            self._history[version] = snapshot
+            while len(self._history) > DELTA_HISTORY:
+                self._history.popitem(last=False)
+            self._snapshot = snapshot
+        for callback in self._listeners:
+            callback(snapshot)
+        return snapshot
+
+    def delta(self, since: int, snapshot: Optional[StatusSnapshot] = None) -> bytes:
+        """
+        Serialized changes between the client's version `since` and the current snapshot.
+
+        Each (since, current) delta is computed once and shared by every client at that
+        version. Falls back to the full envelope when `since` is no longer in history or
+        the delta would not be smaller than the snapshot itself.
+        """
+        snapshot = snapshot or self._snapshot
+        cached = snapshot.deltas.get(since)
+        if cached is not None:
+            return cached
+
+        with self._delta_lock:
+            base = self._history.get(since)
+            if base is None:
+                return snapshot.full_envelope
+
+            cached = snapshot.deltas.get(since)
+            if cached is None:
+                patch = diff_documents(base.document, snapshot.document) or {}
+                cached = dumps({'version': snapshot.version, 'base': since, 'full': False, 'patch': patch})
+                if len(cached) >= len(snapshot.body):
+                    cached = snapshot.full_envelope
+                snapshot.deltas[since] = cached
+            return cached
+
+    def _is_stale(self) -> bool:
+        return self._snapshot is None or self._snapshot.version != self._version
+
+    def get(self) -> StatusSnapshot:
+        """Current snapshot, rebuilding synchronously if the data moved on (threaded apps)"""
+        if self._is_stale():
+            with self._build_lock:
+                if self._is_stale():
+                    version = self._version
+                    self.publish(self._build(), version)
+        return self._snapshot
+
+    async def refresh(self) -> StatusSnapshot:
+        """Rebuild the snapshot for the current version (async apps)"""
+        version = self._version
+        document = self._build()
+        if asyncio.iscoroutine(document):
+            document = await document
+        return self.publish(document, version)
+
+    async def run(self, interval: float = 0.25, version_source: Optional[Callable[[], Any]] = None):
+        """
+        Background publisher loop.
+
+        `version_source` lets apps without explicit mark_dirty() hooks derive the data
+        version from something they already expose (e.g. a last-update timestamp).
+        """
+        last_source_version = None
+        while True:
+            try:
+                if version_source is not None:
+                    source_version = version_source()
+                    if source_version != last_source_version:
+                        last_source_version = source_version
+                        self.mark_dirty()
+
+                if self._is_stale():
+                    await self.refresh()
+
+            except Exception as e:
+                logger.error(f"Status publisher error: {e}")
+
+            await asyncio.sleep(interval)
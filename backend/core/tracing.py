@@ -0,0 +1,132 @@
+"""
+Tick-to-Trade Tracing
+Author: Mattiaz
+Description: Monotonic timestamps carried from the price tick through snapshot, opportunity, risk
+             check, order submission and ack - per-stage latency histograms and slow-path exemplars
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from core.clock import clock
+from core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+class Trace:
+    """
+    Timestamps of one tick on its way to an order:
+    tick -> snapshot -> opportunity -> risk -> submit -> ack
+
+    The trace starts when the price fetch starts; `mark(stage)` records the moment a
+    stage completed, so a stage's latency is the time since the previous mark. Where
+    one tick leads to several orders (two arbitrage legs, several opportunities) the
+    trace is forked and each branch finishes on its own.
+    """
+
+    __slots__ = ('path', 'symbol', 'marks', 'outcome')
+
+    def __init__(self, path: str, symbol: str, started: Optional[float] = None):
+        self.path = path
+        self.symbol = symbol
+        self.marks: List[Tuple[str, float]] = [('start', clock.monotonic() if started is None else started)]
+        self.outcome = ''
+
+    def mark(self, stage: str):
+        self.marks.append((stage, clock.monotonic()))
+
+    def fork(self) -> 'Trace':
+        trace = Trace(self.path, self.symbol, self.marks[0][1])
+        trace.marks = list(self.marks)
+        return trace
+
+    @property
+    def total(self) -> float:
+        return self.marks[-1][1] - self.marks[0][1]
+
+    def stages(self) -> List[Tuple[str, float]]:
+        return [(stage, at - self.marks[i][1]) for i, (stage, at) in enumerate(self.marks[1:])]
+
+    def to_dict(self) -> Dict:
+        return {
+            'path': self.path,
+            'symbol': self.symbol,
+            'outcome': self.outcome,
+            'total_ms': round(self.total * 1000, 3),
+            'stages_ms': {stage: round(seconds * 1000, 3) for stage, seconds in self.stages()}
+        }
+
+
+class Tracer:
+    """
+    Collects finished traces into per-path, per-stage histograms and keeps exemplars:
+    the slowest traces seen and the most recent ones over `slow_threshold` seconds.
+    """
+
+    def __init__(self, exemplars: int = 10, slow_threshold: float = 1.0):
+        self.exemplars = exemplars
+        self.slow_threshold = slow_threshold
+        self.stage_latency: Dict[str, Dict[str, Histogram]] = {}
+        self.total_latency: Dict[str, Histogram] = {}
+        self.outcomes: Dict[str, int] = {}
+        self._slowest: List[Tuple[float, int, Trace]] = []  # min-heap on total
+        self._recent_slow = deque(maxlen=exemplars)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def start(self, path: str, symbol: str, started: Optional[float] = None) -> Trace:
+        return Trace(path, symbol, started)
+
+    def finish(self, trace: Trace, outcome: str = 'acked'):
+        trace.outcome = outcome
+        total = trace.total
+        with self._lock:
+            stages = self.stage_latency.setdefault(trace.path, {})
+            for stage, seconds in trace.stages():
+                histogram = stages.get(stage)
+                if histogram is None:
+                    histogram = stages[stage] = Histogram()
+                histogram.observe(seconds)
+
+            histogram = self.total_latency.get(trace.path)
+            if histogram is None:
+                histogram = self.total_latency[trace.path] = Histogram()
+            histogram.observe(total)
+            key = f"{trace.path}:{outcome}"
+            self.outcomes[key] = self.outcomes.get(key, 0) + 1
+
+            entry = (total, next(self._seq), trace)
+            if len(self._slowest) < self.exemplars:
+                heapq.heappush(self._slowest, entry)
+            elif total > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+            if total > self.slow_threshold:
+                self._recent_slow.append(trace)
+
+        if total > self.slow_threshold:
+            breakdown = ', '.join(f"{stage} {seconds * 1000:.0f}ms" for stage, seconds in trace.stages())
+            logger.info(f"🐢 Slow {trace.path} {trace.symbol}: {total * 1000:.0f}ms ({breakdown})")
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'paths': {
+                    path: {
+                        'total': self.total_latency[path].snapshot(),
+                        'stages': {stage: histogram.snapshot() for stage, histogram in stages.items()}
+                    }
+                    for path, stages in self.stage_latency.items()
+                },
+                'outcomes': dict(self.outcomes),
+                'slow_threshold_ms': self.slow_threshold * 1000,
+                'slowest': [trace.to_dict() for _, _, trace in sorted(self._slowest, reverse=True)],
+                'recent_slow': [trace.to_dict() for trace in reversed(self._recent_slow)]
+            }
+
+
+# Global instance
+tracer = Tracer()
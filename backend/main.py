@@ -1,5 +1,5 @@
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import ccxt
@@ -10,11 +10,29 @@ from datetime import datetime
 import json
 from typing import Dict, List, Optional
 
+from config.settings import settings
+from core.clock import clock
+from core.ledger import Ledger
+from core.recording import TickRecorder
+from core.status import StatusPublisher, etag_matches
+from core.backfill import OHLCVBackfill
+from core.candles import candle_aggregator
+from core.commands import CommandError
+from core.features import feature_store
+from core.metrics import LatencyMiddleware, loop_monitor, metrics_snapshot
+from core.orders import Order, OrderManager
+from core.paper import PaperBroker
+from core.regime import regime_tracker
+from core.risk import RiskEngine
+from core.tracing import tracer
+from core.serialization import loads
+from api.responses import FastJSONResponse, use_fast_json
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Live Trading Bot API", version="1.0.0")
+app = use_fast_json(FastAPI(title="Live Trading Bot API", version="1.0.0", default_response_class=FastJSONResponse))
 
 # CORS middleware
 app.add_middleware(
@@ -24,6 +42,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(LatencyMiddleware)
 
 # Hardcoded API configurations
 BINANCE_CONFIG = {
@@ -35,18 +54,21 @@ BINANCE_CONFIG = {
 
 # Global state
 exchanges = {}
-portfolio = {
-    'balance': 10000.0,
-    'profit_live': 0,
-    'profit_24h': 0,
-    'total_trades': 0,
-    'successful_trades': 0,
-    'win_rate': 0
-}
+# Portfolio state is owned by the ledger writer; read ledger.portfolio / ledger.snapshot
+ledger = Ledger(10000.0)
 trading_active = False
 trade_log = []
 prices = {}
 
+# Replay hook: when set, prices come from this source instead of the exchanges
+price_source = None
+tick_recorder = TickRecorder(settings.RECORD_SESSION_PATH) if settings.RECORD_SESSION_PATH else None
+
+# Multi-worker deployment (start.py with API_WORKERS > 1): set in API worker processes,
+# which mirror state from the engine's shared-memory segment and send writes to it
+shared_state = None
+engine_client = None
+
 # Pydantic models
 class TradingConfig(BaseModel):
     budget: float
@@ -59,6 +81,14 @@ class TradeRequest(BaseModel):
     amount_usd: float
     strategy: Optional[str] = "manual"
     confidence: Optional[float] = 0.5
+    client_order_id: Optional[str] = None
+
+class CandleQuery(BaseModel):
+    symbol: str
+    timeframe: str = "1m"
+    exchange: Optional[str] = None
+    limit: Optional[int] = None
+    max_points: Optional[int] = 500
 
 def setup_exchanges():
     """Initialize exchange connections"""
@@ -91,6 +121,9 @@ def setup_exchanges():
 
 def get_live_prices(symbol: str) -> Dict[str, float]:
     """Get live prices from all connected exchanges"""
+    if price_source is not None:
+        return price_source.get_prices(symbol)
+    
     prices_data = {}
     
     for name, exchange in exchanges.items():
@@ -118,114 +151,301 @@ def get_live_prices(symbol: str) -> Dict[str, float]:
 @app.on_event("startup")
 async def startup_event():
     """Initialize on startup"""
+    loop_monitor.start()
+    
+    if engine_client is not None:
+        logger.info("🔗 API worker following engine state")
+        sync_shared_state()
+        asyncio.create_task(follow_shared_state())
+        return
+    
     logger.info("🚀 Starting Live Trading Bot...")
     setup_exchanges()
+    ledger.allocate(exchanges)
     
-    # Start background price monitoring
+    # Start background price monitoring and status publishing
     asyncio.create_task(price_monitor())
+    asyncio.create_task(status_publisher.run())
 
 async def price_monitor():
     """Background task to monitor prices"""
-    while True:
-        try:
-            symbols = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT']
-            for symbol in symbols:
-                prices[symbol] = get_live_prices(symbol)
-            
-            await asyncio.sleep(10)  # Update every 10 seconds
-            
-        except Exception as e:
-            logger.error(f"Price monitoring error: {e}")
-            await asyncio.sleep(30)
+    await clock.aattach('price_monitor')
+    try:
+        symbols = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT']
+        if settings.BACKFILL_ENABLED and price_source is None:
+            # Seed indicators and candles from exchange history so they are warm from the first tick
+            try:
+                await asyncio.to_thread(OHLCVBackfill().run, exchanges, symbols)
+            except Exception as e:
+                logger.error(f"OHLCV backfill failed: {e}")
+        
+        while True:
+            try:
+                for symbol in symbols:
+                    prices[symbol] = get_live_prices(symbol)
+                    paper_broker.on_quotes(symbol, prices[symbol])
+                    candle_aggregator.on_quotes(symbol, prices[symbol])
+                    if prices[symbol]:
+                        feature_store.update(symbol, float(np.mean(list(prices[symbol].values()))))
+                        regime_tracker.on_prices(symbol, prices[symbol])
+                    if tick_recorder:
+                        tick_recorder.record(symbol, prices[symbol])
+                status_publisher.mark_dirty()
+                
+                await clock.asleep(10)  # Update every 10 seconds
+                
+            except Exception as e:
+                logger.error(f"Price monitoring error: {e}")
+                await clock.asleep(30)
+    finally:
+        clock.detach()
 
 @app.get("/")
 async def root():
     return {"message": "Live Trading Bot API", "status": "running", "exchanges": list(exchanges.keys())}
 
+def build_status() -> Dict:
+    """Build the dashboard status document from current state"""
+    # Generate AI signals (simplified for demo)
+    ai_signals = [
+        {
+            'coin': 'Bitcoin',
+            'symbol': 'BTC/USDT',
+            'direction': 'buy',
+            'confidence': 85.5,
+            'current_price': prices.get('BTC/USDT', {}).get('binance', 68000),
+            'target_price': 70000,
+            'risk_level': 'Medium risk'
+        },
+        {
+            'coin': 'Ethereum',
+            'symbol': 'ETH/USDT',
+            'direction': 'buy',
+            'confidence': 78.2,
+            'current_price': prices.get('ETH/USDT', {}).get('binance', 3500),
+            'target_price': 3650,
+            'risk_level': 'Low risk'
+        }
+    ]
+    
+    # Generate arbitrage opportunities
+    arbitrage_opportunities = []
+    for symbol in ['BTC/USDT', 'ETH/USDT', 'SOL/USDT']:
+        symbol_prices = prices.get(symbol, {})
+        if len(symbol_prices) >= 2:
+            price_list = list(symbol_prices.items())
+            for i in range(len(price_list)):
+                for j in range(i+1, len(price_list)):
+                    buy_exchange, buy_price = price_list[i]
+                    sell_exchange, sell_price = price_list[j]
+                    
+                    if sell_price > buy_price:
+                        profit_pct = ((sell_price - buy_price) / buy_price) * 100
+                        if profit_pct > 0.3:  # Minimum 0.3% profit
+                            arbitrage_opportunities.append({
+                                'symbol': symbol,
+                                'buy_exchange': buy_exchange,
+                                'sell_exchange': sell_exchange,
+                                'buy_price': buy_price,
+                                'sell_price': sell_price,
+                                'profit_pct': round(profit_pct, 3),
+                                'profit_usd': round(100 * profit_pct / 100, 2),
+                                'position_size': 100
+                            })
+    
+    snapshot = ledger.snapshot
+    return {
+        'portfolio': snapshot.portfolio,
+        'balances': snapshot.balances,
+        'ai_signals': ai_signals,
+        'trade_log': trade_log[-20:],
+        'arbitrage_opportunities': arbitrage_opportunities[:5],
+        'trading_active': trading_active,
+        'prices': {symbol: dict(exchange_prices) for symbol, exchange_prices in prices.items()},
+        'exchanges': list(exchanges.keys())
+    }
+
+status_publisher = StatusPublisher(build_status)
+ledger.add_listener(lambda snapshot: status_publisher.mark_dirty())
+
 @app.get("/api/enhanced_status")
-async def get_enhanced_status():
-    """Get current bot status with live data"""
+async def get_enhanced_status(request: Request, since: Optional[int] = None):
+    """Get current bot status from the precomputed snapshot
+    
+    With `since` (the client's last seen version) only the changes are returned.
+    """
     try:
-        # Generate AI signals (simplified for demo)
-        ai_signals = [
-            {
-                'coin': 'Bitcoin',
-                'symbol': 'BTC/USDT',
-                'direction': 'buy',
-                'confidence': 85.5,
-                'current_price': prices.get('BTC/USDT', {}).get('binance', 68000),
-                'target_price': 70000,
-                'risk_level': 'Medium risk'
-            },
-            {
-                'coin': 'Ethereum',
-                'symbol': 'ETH/USDT',
-                'direction': 'buy',
-                'confidence': 78.2,
-                'current_price': prices.get('ETH/USDT', {}).get('binance', 3500),
-                'target_price': 3650,
-                'risk_level': 'Low risk'
-            }
-        ]
+        snapshot = status_publisher.snapshot or await status_publisher.refresh()
+        headers = {'ETag': snapshot.etag, 'X-Status-Version': str(snapshot.version), 'Cache-Control': 'no-cache'}
         
-        # Generate arbitrage opportunities
-        arbitrage_opportunities = []
-        for symbol in ['BTC/USDT', 'ETH/USDT', 'SOL/USDT']:
-            symbol_prices = prices.get(symbol, {})
-            if len(symbol_prices) >= 2:
-                price_list = list(symbol_prices.items())
-                for i in range(len(price_list)):
-                    for j in range(i+1, len(price_list)):
-                        buy_exchange, buy_price = price_list[i]
-                        sell_exchange, sell_price = price_list[j]
-                        
-                        if sell_price > buy_price:
-                            profit_pct = ((sell_price - buy_price) / buy_price) * 100
-                            if profit_pct > 0.3:  # Minimum 0.3% profit
-                                arbitrage_opportunities.append({
-                                    'symbol': symbol,
-                                    'buy_exchange': buy_exchange,
-                                    'sell_exchange': sell_exchange,
-                                    'buy_price': buy_price,
-                                    'sell_price': sell_price,
-                                    'profit_pct': round(profit_pct, 3),
-                                    'profit_usd': round(100 * profit_pct / 100, 2),
-                                    'position_size': 100
-                                })
+        if since is not None:
+            return Response(content=status_publisher.delta(since, snapshot), media_type='application/json', headers=headers)
         
-        return {
-            'portfolio': portfolio,
-            'ai_signals': ai_signals,
-            'trade_log': trade_log[-20:],
-            'arbitrage_opportunities': arbitrage_opportunities[:5],
-            'trading_active': trading_active,
-            'prices': prices,
-            'exchanges': list(exchanges.keys())
-        }
+        if etag_matches(request.headers.get('if-none-match'), snapshot.etag):
+            return Response(status_code=304, headers=headers)
+        
+        return Response(content=snapshot.body, media_type='application/json', headers=headers)
         
     except Exception as e:
         logger.error(f"Status endpoint error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/start_enhanced_trading")
-async def start_enhanced_trading(config: TradingConfig):
+def start_trading(config: TradingConfig) -> Dict:
     """Start trading with configuration"""
     global trading_active
     
+    if config.budget < 10:
+        raise HTTPException(status_code=400, detail="Minimum budget is $10")
+    
+    if ledger.portfolio['balance'] < config.budget:
+        raise HTTPException(status_code=400, detail="Insufficient balance")
+    
+    trading_active = True
+    status_publisher.mark_dirty()
+    logger.info(f"🚀 Trading started - Budget: ${config.budget}, Strategy: {config.strategy}")
+    
+    return {
+        'success': True,
+        'message': f'Trading started with ${config.budget} budget using {config.strategy} strategy'
+    }
+
+def stop_trading() -> Dict:
+    """Stop trading"""
+    global trading_active
+    trading_active = False
+    status_publisher.mark_dirty()
+    logger.info("⏹️ Trading stopped")
+    return {'success': True, 'message': 'Trading stopped'}
+
+async def execute_trade(trade: TradeRequest) -> Dict:
+    """Validate a trade and place it through the order manager"""
+    trace = tracer.start('manual', trade.symbol)
+    
+    # Validate minimum trade amount
+    if trade.amount_usd < 10:
+        raise HTTPException(status_code=400, detail="Minimum trade amount is $10")
+    
+    # Get current price
+    symbol_prices = prices.get(trade.symbol, {})
+    if not symbol_prices:
+        raise HTTPException(status_code=400, detail=f"No price data for {trade.symbol}")
+    
+    # Use Binance price if available, otherwise first available
+    price = symbol_prices.get('binance', list(symbol_prices.values())[0])
+    trace.mark('snapshot')
+    
+    order = order_manager.submit(
+        'binance', trade.symbol, trade.side, trade.amount_usd,
+        strategy=trade.strategy or 'manual',
+        confidence=trade.confidence,
+        price=price,
+        client_order_id=trade.client_order_id,
+        trace=trace
+    )
+    success, message = await asyncio.wrap_future(order.future)
+    if not success:
+        raise HTTPException(status_code=502, detail=message)
+    
+    return {'success': True, 'message': message, 'client_order_id': order.client_order_id}
+
+def fill_order(order: Order):
+    """Fill an order against the paper broker's book (runs on an order manager worker)"""
+    fill = paper_broker.execute(order.exchange, order.symbol, order.side, order.amount_usd, order.price)
+    if not fill.quantity:
+        return False, f"❌ Trade failed: {fill.reason}"
+    
+    # Update portfolio - wait for the ledger so the ack is visible in the next snapshot
+    profit = fill.realized_pnl
+    ledger.record_fill(order.exchange, order.symbol, order.side, fill.notional, fill.avg_price, profit, fee=fill.fee,
+                       closed=fill.closed_quantity > 0).result()
+    risk_engine.record_pnl(order.exchange, order.symbol, order.strategy, profit)
+    
+    # Log trade
+    trade_entry = {
+        'timestamp': clock.now().strftime('%H:%M:%S'),
+        'symbol': order.symbol,
+        'side': order.side.upper(),
+        'amount_usd': round(fill.notional, 2),
+        'price': round(fill.avg_price, 4),
+        'fee': round(fill.fee, 4),
+        'fill': fill.status,
+        'profit': round(profit, 2),
+        'strategy': order.strategy,
+        'exchange': order.exchange,
+        'client_order_id': order.client_order_id
+    }
+    
+    trade_log.append(trade_entry)
+    if len(trade_log) > 50:
+        trade_log.pop(0)
+    status_publisher.mark_dirty()
+    
+    logger.info(f"✅ Trade executed: {order.side} ${fill.notional:.2f} {order.symbol} at ${fill.avg_price:.4f} ({fill.status})")
+    
+    partial = f" ({fill.reason})" if fill.status == 'partial' else ''
+    return True, f"✅ {order.side.upper()} ${fill.notional:.2f} {order.symbol} at ${fill.avg_price:.4f} executed successfully{partial}"
+
+paper_broker = PaperBroker()
+risk_engine = RiskEngine()
+order_manager = OrderManager(fill_order, risk=risk_engine)
+
+def order_stats() -> Dict:
+    """Order queue depth, submit-to-ack latency and recent orders"""
+    return order_manager.get_stats()
+
+def paper_stats() -> Dict:
+    """Paper broker fills, fees, realized PnL and open positions"""
+    return paper_broker.get_stats()
+
+def trace_stats() -> Dict:
+    """Order-path latency per stage and the slowest traces"""
+    return tracer.snapshot()
+
+def candle_history(query: CandleQuery) -> Dict:
+    """OHLCV bars for a symbol, downsampled to at most max_points for charts"""
     try:
-        if config.budget < 10:
-            raise HTTPException(status_code=400, detail="Minimum budget is $10")
-        
-        if portfolio['balance'] < config.budget:
-            raise HTTPException(status_code=400, detail="Insufficient balance")
-        
-        trading_active = True
-        logger.info(f"🚀 Trading started - Budget: ${config.budget}, Strategy: {config.strategy}")
-        
-        return {
-            'success': True,
-            'message': f'Trading started with ${config.budget} budget using {config.strategy} strategy'
-        }
+        return candle_aggregator.get_candles(query.symbol, query.timeframe, query.exchange,
+                                             limit=query.limit, max_points=query.max_points)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def risk_stats() -> Dict:
+    """Exposure, open orders and daily P&L per symbol/exchange/strategy against the limits"""
+    return risk_engine.get_stats()
+
+# State-changing commands: run in-process, or by the engine process for API workers
+COMMANDS = {
+    'start_trading': (start_trading, TradingConfig),
+    'stop_trading': (stop_trading, None),
+    'execute_trade': (execute_trade, TradeRequest),
+    'order_stats': (order_stats, None),
+    'risk_stats': (risk_stats, None),
+    'trace_stats': (trace_stats, None),
+    'paper_stats': (paper_stats, None),
+    'candles': (candle_history, CandleQuery),
+}
+
+async def run_command(name: str, request: Optional[BaseModel] = None) -> Dict:
+    """Run a command locally, or through the engine's command queue in an API worker"""
+    if engine_client is None:
+        command, _ = COMMANDS[name]
+        result = command(request) if request is not None else command()
+        return await result if asyncio.iscoroutine(result) else result
+    
+    try:
+        result = await engine_client.call(name, request.model_dump() if request is not None else None)
+    except CommandError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    
+    # The engine published the new state before replying; read our own write
+    sync_shared_state()
+    return result
+
+@app.post("/api/start_enhanced_trading")
+async def start_enhanced_trading(config: TradingConfig):
+    """Start trading with configuration"""
+    try:
+        return await run_command('start_trading', config)
         
     except Exception as e:
         logger.error(f"Start trading error: {e}")
@@ -234,72 +454,45 @@ async def start_enhanced_trading(config: TradingConfig):
 @app.post("/api/stop_enhanced_trading")
 async def stop_enhanced_trading():
     """Stop trading"""
-    global trading_active
-    trading_active = False
-    logger.info("⏹️ Trading stopped")
-    return {'success': True, 'message': 'Trading stopped'}
+    return await run_command('stop_trading')
 
 @app.post("/api/execute_enhanced_trade")
 async def execute_enhanced_trade(trade: TradeRequest):
     """Execute a trade"""
-    global portfolio, trade_log
-    
     try:
-        # Validate minimum trade amount
-        if trade.amount_usd < 10:
-            raise HTTPException(status_code=400, detail="Minimum trade amount is $10")
-        
-        # Get current price
-        symbol_prices = prices.get(trade.symbol, {})
-        if not symbol_prices:
-            raise HTTPException(status_code=400, detail=f"No price data for {trade.symbol}")
-        
-        # Use Binance price if available, otherwise first available
-        price = symbol_prices.get('binance', list(symbol_prices.values())[0])
-        
-        # Calculate trade profit (simplified)
-        profit_pct = np.random.uniform(-0.5, 2.0)  # Random profit for demo
-        profit = trade.amount_usd * (profit_pct / 100)
-        
-        # Update portfolio
-        if trade.side.lower() == 'buy':
-            portfolio['balance'] -= trade.amount_usd
-        else:
-            portfolio['balance'] += trade.amount_usd + profit
-            portfolio['profit_live'] += profit
-        
-        portfolio['total_trades'] += 1
-        if profit > 0:
-            portfolio['successful_trades'] += 1
-        portfolio['win_rate'] = (portfolio['successful_trades'] / portfolio['total_trades']) * 100
-        
-        # Log trade
-        trade_entry = {
-            'timestamp': datetime.now().strftime('%H:%M:%S'),
-            'symbol': trade.symbol,
-            'side': trade.side.upper(),
-            'amount_usd': trade.amount_usd,
-            'price': round(price, 4),
-            'profit': round(profit, 2),
-            'strategy': trade.strategy,
-            'exchange': 'binance'
-        }
-        
-        trade_log.append(trade_entry)
-        if len(trade_log) > 50:
-            trade_log.pop(0)
-        
-        logger.info(f"✅ Trade executed: {trade.side} ${trade.amount_usd} {trade.symbol}")
-        
-        return {
-            'success': True,
-            'message': f"✅ {trade.side.upper()} ${trade.amount_usd} {trade.symbol} executed successfully"
-        }
+        return await run_command('execute_trade', trade)
         
     except Exception as e:
         logger.error(f"Trade execution error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/orders")
+async def get_orders():
+    """Order manager statistics"""
+    return await run_command('order_stats')
+
+@app.get("/api/risk")
+async def get_risk():
+    """Risk engine aggregates and limits"""
+    return await run_command('risk_stats')
+
+@app.get("/api/paper")
+async def get_paper():
+    """Paper broker fills, fees, realized PnL and open positions"""
+    return await run_command('paper_stats')
+
+@app.get("/api/traces")
+async def get_traces():
+    """Order-path latency per stage and the slowest traces"""
+    return await run_command('trace_stats')
+
+@app.get("/api/candles/{symbol:path}")
+async def get_candles(symbol: str, timeframe: str = "1m", exchange: Optional[str] = None,
+                      limit: Optional[int] = None, max_points: Optional[int] = 500):
+    """OHLCV candles (1s, 1m, 5m, 15m, 1h, 1d) built from the price ticks"""
+    query = CandleQuery(symbol=symbol, timeframe=timeframe, exchange=exchange, limit=limit, max_points=max_points)
+    return await run_command('candles', query)
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
@@ -310,6 +503,66 @@ async def health_check():
         'timestamp': datetime.now().isoformat()
     }
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Per-route latency histograms and event-loop lag with stack samples of recent stalls"""
+    return metrics_snapshot()
+
+async def handle_command(name: str, payload: Optional[Dict]) -> Dict:
+    """Engine side of run_command()"""
+    command, model = COMMANDS[name]
+    result = command(model(**payload)) if model is not None else command()
+    if asyncio.iscoroutine(result):
+        result = await result
+    
+    # Publish before replying so the calling worker sees the change immediately
+    await status_publisher.refresh()
+    return result
+
+async def run_engine(state, server):
+    """Engine process: owns exchanges and all mutable state, publishes it to shared memory"""
+    status_publisher.add_listener(lambda snapshot: state.write(snapshot.version, snapshot.body))
+    await startup_event()
+    await status_publisher.refresh()
+    server.start(handle_command)
+    await asyncio.Event().wait()
+
+def attach_worker(state, client):
+    """Turn this process into a stateless API worker of a running engine"""
+    global shared_state, engine_client
+    shared_state = state
+    engine_client = client
+
+def sync_shared_state():
+    """Mirror the engine's latest published state into this worker"""
+    global trading_active, exchanges
+    
+    snapshot = status_publisher.snapshot
+    if snapshot is not None and snapshot.version == shared_state.version:
+        return
+    
+    version, body = shared_state.read()
+    if not body:
+        return
+    
+    document = loads(body)
+    status_publisher.publish(document, version, body=body)
+    prices.clear()
+    prices.update(document['prices'])
+    trade_log[:] = document['trade_log']
+    trading_active = document['trading_active']
+    # Exchange connections live in the engine; workers only know their names
+    exchanges = dict.fromkeys(document['exchanges'])
+
+async def follow_shared_state(interval: float = 0.05):
+    """Poll the shared-memory version and mirror every new state"""
+    while True:
+        try:
+            sync_shared_state()
+        except Exception as e:
+            logger.error(f"Shared state sync error: {e}")
+        await asyncio.sleep(interval)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=5000)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Session Replay Runner
+Drives the production trading loops from a recorded session on virtual time
+
+Usage:
+    python replay.py session.jsonl --target main --speed 100
+    python replay.py session.jsonl --target monolith --speed 1000 --output decisions.json
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import sys
+
+import numpy as np
+
+from bot.signal_ledger import signal_ledger
+from config.settings import settings
+from core.clock import clock, ReplayClock
+from core.recording import RecordedSession, ReplayFeed
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+
+logger = logging.getLogger(__name__)
+
+MONOLITH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'optimized_trading_bot2_binance_injected.py')
+
+
+async def replay_main(session: RecordedSession, replay_clock: ReplayClock) -> dict:
+    """Run the FastAPI price_monitor against the recording"""
+    import main
+
+    main.exchanges = {name: 'replay' for name in session.exchanges}
+    main.price_source = ReplayFeed(session)
+    main.ledger.allocate(main.exchanges)
+
+    loop = asyncio.get_running_loop()
+    monitor = asyncio.create_task(main.price_monitor())
+    await loop.run_in_executor(None, replay_clock.run_until, session.end_time, 1)
+
+    monitor.cancel()
+    try:
+        await monitor
+    except asyncio.CancelledError:
+        pass
+
+    return {
+        'prices': main.prices,
+        'portfolio': main.ledger.portfolio,
+        'balances': main.ledger.snapshot.balances,
+        'trade_log': main.trade_log
+    }
+
+
+def replay_monolith(session: RecordedSession, replay_clock: ReplayClock) -> dict:
+    """Run EnhancedTradingBot's monitor_markets and trading_engine threads against the recording"""
+    spec = importlib.util.spec_from_file_location('monolith', MONOLITH_PATH)
+    monolith = importlib.util.module_from_spec(spec)
+
+    # Importing starts the bot threads; they block in clock.attach() until the
+    # driver runs, so the feed can be wired in before their first iteration.
+    spec.loader.exec_module(monolith)
+    monolith.price_source = ReplayFeed(session)
+    monolith.trading_active = True
+
+    replay_clock.run_until(session.end_time, participants=2)
+
+    return {
+        'prices': monolith.prices,
+        'portfolio': monolith.ledger.portfolio,
+        'balances': monolith.ledger.snapshot.balances,
+        'ai_signals': monolith.ai_signals,
+        'trade_log': monolith.trade_log
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a recorded market session through the trading loops')
+    parser.add_argument('session', help='JSON-lines file written via RECORD_SESSION_PATH')
+    parser.add_argument('--target', choices=['main', 'monolith'], default='main')
+    parser.add_argument('--speed', type=float, default=settings.REPLAY_SPEED, help='Virtual seconds per real second (1-1000)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the simulated parts of the engine')
+    parser.add_argument('--output', help='Write the final state here for diffing between runs')
+    args = parser.parse_args()
+
+    if not 1 <= args.speed <= 1000:
+        parser.error('--speed must be between 1 and 1000')
+
+    session = RecordedSession(args.session)
+    replay_clock = ReplayClock(session.start_time, args.speed)
+    clock.install(replay_clock)
+    np.random.seed(args.seed)
+    signal_ledger.path = ':memory:'  # replays must not read or extend the live signal history
+
+    duration = session.end_time - session.start_time
+    logger.info(f"▶️ Replaying {duration:.0f}s of trading at {args.speed:g}x ({duration / args.speed:.1f}s real time)")
+
+    if args.target == 'main':
+        result = asyncio.run(replay_main(session, replay_clock))
+    else:
+        result = replay_monolith(session, replay_clock)
+
+    logger.info(f"✅ Replay finished - {len(result['trade_log'])} trades, balance ${result['portfolio']['balance']:.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, default=str)
+        logger.info(f"State written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,17 @@ Ensures proper initialization and connection to exchanges
 """
 
 import uvicorn
+import asyncio
 import logging
+import multiprocessing
+import multiprocessing.connection
+import signal
+import socket
 import sys
 import os
 
+from config.settings import settings
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,6 +29,62 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+def run_engine(state_name, commands, replies):
+    """Engine process: exchanges, price monitor, trading state"""
+    import main
+    from core.commands import CommandServer
+    from core.shm import SharedState
+    
+    asyncio.run(main.run_engine(SharedState.attach(state_name), CommandServer(commands, replies)))
+
+def run_worker(worker_id, sock, state_name, commands, replies):
+    """Stateless API worker serving from the shared listening socket"""
+    import main
+    from core.commands import CommandClient
+    from core.shm import SharedState
+    
+    main.attach_worker(SharedState.attach(state_name), CommandClient(worker_id, commands, replies))
+    config = uvicorn.Config(main.app, log_level="info", access_log=True)
+    uvicorn.Server(config).run(sockets=[sock])
+
+def run_cluster(workers: int, host: str, port: int):
+    """One engine process plus `workers` API processes sharing state through shared memory"""
+    from core.shm import SharedState
+    
+    ctx = multiprocessing.get_context('spawn')
+    state = SharedState.create()
+    commands = ctx.Queue()
+    replies = [ctx.Queue() for _ in range(workers)]
+    
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    
+    processes = [ctx.Process(target=run_engine, args=(state.name, commands, replies), name='engine')]
+    processes += [
+        ctx.Process(target=run_worker, args=(i, sock, state.name, commands, replies[i]), name=f'api-worker-{i}')
+        for i in range(workers)
+    ]
+    
+    # Stop the children on `docker stop` / supervisor SIGTERM too
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    try:
+        for process in processes:
+            process.start()
+        logger.info(f"✅ Engine and {workers} API workers started")
+        
+        # Any process exiting takes the deployment down so the supervisor can restart it
+        multiprocessing.connection.wait([process.sentinel for process in processes])
+        logger.error("❌ A trading bot process exited - shutting down")
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(5)
+        sock.close()
+        state.close()
+
 def main():
     """Start the live trading bot server"""
     logger.info("🚀 Initializing Live Trading Bot...")
@@ -37,6 +100,10 @@ def main():
     logger.info("🔄 Starting FastAPI server on http://localhost:5000")
     
     try:
+        if settings.API_WORKERS > 1:
+            run_cluster(settings.API_WORKERS, "0.0.0.0", 5000)
+            return
+        
         # Import main app here to avoid circular imports
         from main import app
         
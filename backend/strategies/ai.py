@@ -0,0 +1,49 @@
+"""
+AI Signal Strategy
+Author: Mattiaz
+Description: Turns the signal model's batch output over the engine's symbols into trade signals
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from bot.signals import AISignalGenerator
+from config.settings import settings
+from core.engine import Strategy, StrategyType, TradeSignal
+
+logger = logging.getLogger(__name__)
+
+RISK_LEVELS = {'Low risk': 'low', 'Medium risk': 'medium', 'High risk': 'high'}
+
+class AIStrategy(Strategy):
+    """Features come from the shared feature store the engine feeds, so evaluation is one model call"""
+
+    type = StrategyType.AI_SIGNALS
+
+    def __init__(self, generator: Optional[AISignalGenerator] = None, min_confidence: Optional[float] = None):
+        self.generator = generator or AISignalGenerator()
+        self.min_confidence = settings.AI_MIN_CONFIDENCE if min_confidence is None else min_confidence
+
+    def signals(self, market_data: Dict) -> List[TradeSignal]:
+        symbols = [symbol for symbol, data in market_data.items() if isinstance(data, dict)]
+        return [
+            TradeSignal(
+                symbol=signal['symbol'],
+                direction=signal['direction'],
+                confidence=signal['confidence'],
+                price=signal['current_price'],
+                target_price=signal['target_price'],
+                strategy=self.type,
+                timestamp=datetime.now(),
+                risk_level=RISK_LEVELS.get(signal['risk_level'], 'medium')
+            )
+            for signal in self.generator.generate_signals(market_data, symbols)
+            if signal['confidence'] >= self.min_confidence
+        ]
+
+    async def generate_signals(self, market_data: Dict) -> List[TradeSignal]:
+        return self.signals(market_data)
+
+    def evaluate(self, market_data: Dict) -> List[TradeSignal]:
+        return self.signals(market_data)
@@ -0,0 +1,64 @@
+"""
+Arbitrage Strategy - Cross-Exchange Spreads
+Author: Mattiaz
+Description: Finds cross-exchange spreads in the engine's market snapshot and trades both legs at once
+"""
+
+import logging
+from typing import Dict, List
+
+from config.settings import settings
+from core.engine import Strategy, StrategyType, TradeSignal
+
+logger = logging.getLogger(__name__)
+
+class ArbitrageStrategy(Strategy):
+    """
+    Legs are executed by the engine's arbitrage executor inside evaluate(), so a spread
+    is traded against the snapshot it was found on; no signals are returned.
+    """
+
+    type = StrategyType.ARBITRAGE
+
+    def __init__(self, min_profit: float = None, max_trades: int = 2):
+        self.min_profit = settings.ARBITRAGE_MIN_PROFIT if min_profit is None else min_profit
+        self.max_trades = max_trades
+
+    def opportunities(self, market_data: Dict) -> List[Dict]:
+        """Every buy-low/sell-high exchange pair above the minimum spread, best first"""
+        opportunities = []
+        position_size = settings.MIN_TRADE_AMOUNT
+        for symbol, data in market_data.items():
+            if not isinstance(data, dict):
+                continue
+            exchange_prices = data.get('exchanges', {})
+            for buy_exchange, buy_price in exchange_prices.items():
+                for sell_exchange, sell_price in exchange_prices.items():
+                    if buy_exchange == sell_exchange or not buy_price:
+                        continue
+                    profit_pct = (sell_price - buy_price) / buy_price * 100
+                    if profit_pct > self.min_profit:
+                        opportunities.append({
+                            'symbol': symbol,
+                            'buy_exchange': buy_exchange,
+                            'sell_exchange': sell_exchange,
+                            'buy_price': buy_price,
+                            'sell_price': sell_price,
+                            'profit_pct': round(profit_pct, 3),
+                            'profit_usd': round((sell_price - buy_price) * position_size / buy_price, 2),
+                            'position_size': position_size,
+                            'confidence': min(0.9, profit_pct / self.min_profit * 0.6)
+                        })
+        return sorted(opportunities, key=lambda opportunity: opportunity['profit_pct'], reverse=True)
+
+    async def find_opportunities(self, market_data: Dict) -> List[Dict]:
+        return self.opportunities(market_data)
+
+    def evaluate(self, market_data: Dict) -> List[TradeSignal]:
+        registry = self.engine.opportunity_registry
+        for opportunity in registry.observe(self.opportunities(market_data))[:self.max_trades]:
+            logger.info(f"🚀 Executing arbitrage: {opportunity['symbol']} - {opportunity['profit_pct']:.2f}% profit")
+            execution = self.engine.arbitrage_executor.execute(opportunity, market_data[opportunity['symbol']]['exchanges'])
+            registry.record_trade(opportunity, execution.state)
+            logger.info(execution.message)
+        return []
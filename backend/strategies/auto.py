@@ -6,44 +6,87 @@ Description: Analyzes market conditions and selects optimal trading strategy
 """
 
 import logging
-import numpy as np
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime
-import asyncio
+
+from config.settings import settings
+from core.clock import clock
+from core.engine import AUTO_SELECTIONS, Strategy, StrategyType, TradeSignal
+from core.regime import RegimeTracker, regime_tracker
 
 logger = logging.getLogger(__name__)
 
 class AutoModeEngine:
-    def __init__(self):
+    """
+    Runs as a background evaluator: the regime statistics are checked every
+    AUTO_EVAL_INTERVAL seconds, but a new strategy decision is only made when one of the
+    selection conditions flips. Each condition switches on above threshold * (1 + h)
+    and off below threshold * (1 - h), so a metric hovering at a threshold does not
+    make the strategy flap. Decisions go to the listeners; readers use the cached one.
+    """
+    
+    def __init__(self, regime: RegimeTracker = regime_tracker):
+        self.regime = regime
         self.current_strategy = "hybrid"
         self.confidence = 0.0
         self.last_analysis = {}
         self.strategy_history = []
-        
+        self.decision: Optional[Dict] = None
+        self.conditions: Dict[str, bool] = {}
+        self._listeners: List[Callable[[Dict], None]] = []
+    
+    def add_listener(self, callback: Callable[[Dict], None]):
+        """Called with every new decision"""
+        self._listeners.append(callback)
+    
+    def remove_listener(self, callback: Callable[[Dict], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def thresholds(self) -> Dict[str, Tuple[str, float, bool]]:
+        """Selection conditions: name -> (analysis key, threshold, true above threshold)"""
+        return {
+            'wide_spread': ('max_price_spread', settings.AUTO_SPREAD_THRESHOLD, True),
+            'some_spread': ('max_price_spread', 0.2, True),
+            'calm': ('volatility', settings.AUTO_VOLATILITY_THRESHOLD, False),
+            'volatile': ('volatility', 0.7, True),
+            'volume_spike': ('volume_spike', 2.0, True),
+            'technical': ('technical_signals', 0.5, True)
+        }
+    
+    def evaluate_conditions(self, analysis: Dict, previous: Optional[Dict[str, bool]] = None) -> Dict[str, bool]:
+        """Condition states for `analysis`; with `previous`, values inside a hysteresis band keep their state"""
+        values = {**analysis, 'technical_signals': analysis['rsi_oversold'] + analysis['rsi_overbought'] +
+                  analysis['macd_bullish'] + analysis['macd_bearish']}
+        band = settings.AUTO_HYSTERESIS
+        conditions = {}
+        for name, (key, threshold, above) in self.thresholds().items():
+            value = values[key]
+            state = value > threshold if above else value < threshold
+            if previous is not None and name in previous:
+                if threshold * (1 - band) <= value <= threshold * (1 + band):
+                    state = previous[name]
+            conditions[name] = state
+        return conditions
+    
     async def analyze_market_conditions(self, market_data: Dict) -> Dict:
         """Analyze current market conditions and return metrics"""
         try:
-            # Calculate market volatility from price data
-            volatility = await self._calculate_volatility(market_data)
-            
-            # Analyze volume spikes
-            volume_spike = await self._detect_volume_spikes(market_data)
-            
-            # Calculate price spreads across exchanges
-            price_spreads = await self._calculate_price_spreads(market_data)
-            
-            # Technical indicators
-            rsi_signals = await self._analyze_rsi_conditions(market_data)
-            macd_signals = await self._analyze_macd_conditions(market_data)
+            # Streaming per-symbol statistics kept current by the price monitors
+            symbols = [symbol for symbol, data in market_data.items() if isinstance(data, dict)]
+            regime = self.regime.analyze(symbols or None)
             
             analysis = {
-                'volatility': volatility,
-                'volume_spike': volume_spike,
-                'max_price_spread': max(price_spreads.values()) if price_spreads else 0,
-                'rsi_oversold': rsi_signals['oversold_count'],
-                'rsi_overbought': rsi_signals['overbought_count'],
-                'macd_bullish': macd_signals['bullish_count'],
-                'macd_bearish': macd_signals['bearish_count'],
+                'volatility': regime['volatility'],
+                'volume_spike': regime['volume_spike'],
+                'max_price_spread': regime['max_price_spread'],
+                'max_spread_p90': regime['max_spread_p90'],
+                'max_volume_z': regime['max_volume_z'],
+                'rsi_oversold': regime['rsi_oversold'],
+                'rsi_overbought': regime['rsi_overbought'],
+                'macd_bullish': regime['macd_bullish'],
+                'macd_bearish': regime['macd_bearish'],
+                'symbols': regime['symbols'],
                 'timestamp': datetime.now().isoformat()
             }
             
@@ -63,9 +106,12 @@ class AutoModeEngine:
                 'timestamp': datetime.now().isoformat()
             }
     
-    async def select_optimal_strategy(self, analysis: Dict) -> Tuple[str, float, str]:
-        """Select optimal strategy based on market analysis"""
+    async def select_optimal_strategy(self, analysis: Dict,
+                                      conditions: Optional[Dict[str, bool]] = None) -> Tuple[str, float, str]:
+        """Select optimal strategy based on market analysis; does not change the engine's state"""
         try:
+            if conditions is None:
+                conditions = self.evaluate_conditions(analysis)
             volatility = analysis['volatility']
             volume_spike = analysis['volume_spike']
             max_spread = analysis['max_price_spread']
@@ -73,19 +119,19 @@ class AutoModeEngine:
             macd_signals = analysis['macd_bullish'] + analysis['macd_bearish']
             
             # Strategy selection logic
-            if max_spread > 0.5 and volatility < 0.6:
+            if conditions['wide_spread'] and conditions['calm']:
                 # High price spreads + low volatility = perfect for arbitrage
                 strategy = "arbitrage"
                 confidence = min(95, 70 + (max_spread * 10))
                 reason = f"High price spreads ({max_spread:.2f}%) with low volatility - optimal for arbitrage"
                 
-            elif volume_spike > 2.0 and (rsi_signals > 0 or macd_signals > 0):
+            elif conditions['volume_spike'] and conditions['technical']:
                 # Volume spikes + technical signals = AI strategy
                 strategy = "ai_signal"
                 confidence = min(90, 60 + (volume_spike * 10) + (rsi_signals * 5) + (macd_signals * 5))
                 reason = f"Volume spike ({volume_spike:.1f}x) with {rsi_signals + macd_signals} technical signals"
                 
-            elif volatility > 0.7 and max_spread > 0.2:
+            elif conditions['volatile'] and conditions['some_spread']:
                 # High volatility + some spreads = hybrid approach
                 strategy = "hybrid"
                 confidence = min(85, 65 + (volatility * 15) + (max_spread * 5))
@@ -96,113 +142,63 @@ class AutoModeEngine:
                 strategy = "arbitrage"
                 confidence = 60
                 reason = "Stable market conditions - conservative arbitrage strategy"
-            
-            # Store decision in history
-            decision = {
-                'timestamp': datetime.now(),
-                'strategy': strategy,
-                'confidence': confidence,
-                'reason': reason,
-                'analysis': analysis
-            }
-            
-            self.strategy_history.append(decision)
-            if len(self.strategy_history) > 50:  # Keep last 50 decisions
-                self.strategy_history.pop(0)
-            
-            self.current_strategy = strategy
-            self.confidence = confidence
-            
+                
             return strategy, confidence, reason
             
         except Exception as e:
             logger.error(f"Strategy selection failed: {e}")
             return "arbitrage", 50, "Error in analysis - using conservative approach"
     
-    async def _calculate_volatility(self, market_data: Dict) -> float:
-        """Calculate market volatility from price data"""
-        try:
-            prices = []
-            for symbol_data in market_data.values():
-                if isinstance(symbol_data, dict) and 'price' in symbol_data:
-                    prices.append(symbol_data['price'])
-            
-            if len(prices) < 2:
-                return 0.5
-            
-            # Calculate coefficient of variation as volatility measure
-            volatility = np.std(prices) / np.mean(prices) if np.mean(prices) > 0 else 0.5
-            return min(1.0, volatility * 100)  # Scale to 0-1
-            
-        except Exception:
-            return 0.5
-    
-    async def _detect_volume_spikes(self, market_data: Dict) -> float:
-        """Detect volume spikes in market data"""
-        try:
-            # Simulate volume spike detection
-            # In production, this would analyze actual volume data
-            return np.random.uniform(0.8, 3.0)
-        except Exception:
-            return 1.0
-    
-    async def _calculate_price_spreads(self, market_data: Dict) -> Dict[str, float]:
-        """Calculate price spreads across different sources"""
-        try:
-            spreads = {}
-            for symbol, data in market_data.items():
-                if isinstance(data, dict) and 'exchanges' in data:
-                    exchange_prices = list(data['exchanges'].values())
-                    if len(exchange_prices) >= 2:
-                        max_price = max(exchange_prices)
-                        min_price = min(exchange_prices)
-                        spread = ((max_price - min_price) / min_price) * 100
-                        spreads[symbol] = spread
-            return spreads
-        except Exception:
-            return {}
-    
-    async def _analyze_rsi_conditions(self, market_data: Dict) -> Dict:
-        """Analyze RSI conditions across markets"""
-        try:
-            oversold_count = 0
-            overbought_count = 0
-            
-            # Simulate RSI analysis
-            for _ in range(3):  # Simulate 3 major markets
-                rsi = np.random.uniform(20, 80)
-                if rsi < 30:
-                    oversold_count += 1
-                elif rsi > 70:
-                    overbought_count += 1
-            
-            return {
-                'oversold_count': oversold_count,
-                'overbought_count': overbought_count
-            }
-        except Exception:
-            return {'oversold_count': 0, 'overbought_count': 0}
+    async def evaluate(self, market_data: Dict) -> Optional[Dict]:
+        """Re-decide if a selection condition flipped; returns the new decision, None if unchanged"""
+        analysis = await self.analyze_market_conditions(market_data)
+        conditions = self.evaluate_conditions(analysis, self.conditions if self.decision else None)
+        if self.decision is not None and conditions == self.conditions:
+            return None
+            
+        strategy, confidence, reason = await self.select_optimal_strategy(analysis, conditions)
+        changed = [name for name, state in conditions.items() if self.conditions.get(name) != state]
+        self.conditions = conditions
+        
+        decision = {
+            'timestamp': datetime.now().isoformat(),
+            'strategy': strategy,
+            'previous_strategy': self.decision['strategy'] if self.decision else None,
+            'confidence': confidence,
+            'reason': reason,
+            'conditions': conditions,
+            'changed': changed,
+            'analysis': analysis
+        }
+        
+        self.strategy_history.append(decision)
+        if len(self.strategy_history) > 50:  # Keep last 50 decisions
+            self.strategy_history.pop(0)
+            
+        self.decision = decision
+        self.current_strategy = strategy
+        self.confidence = confidence
+        logger.info(f"🤖 Auto mode: {strategy} ({confidence:.0f}%) - {reason}")
+        
+        for callback in self._listeners:
+            try:
+                callback(decision)
+            except Exception as e:
+                logger.error(f"Auto mode listener failed: {e}")
+        return decision
     
-    async def _analyze_macd_conditions(self, market_data: Dict) -> Dict:
-        """Analyze MACD conditions across markets"""
-        try:
-            bullish_count = 0
-            bearish_count = 0
-            
-            # Simulate MACD analysis
-            for _ in range(3):  # Simulate 3 major markets
-                macd = np.random.uniform(-1, 1)
-                if macd > 0.2:
-                    bullish_count += 1
-                elif macd < -0.2:
-                    bearish_count += 1
-            
-            return {
-                'bullish_count': bullish_count,
-                'bearish_count': bearish_count
-            }
-        except Exception:
-            return {'bullish_count': 0, 'bearish_count': 0}
+    async def run(self, market_data_source: Callable[[], Dict], interval: Optional[float] = None):
+        """Background evaluator; skips checks while the regime statistics have not moved"""
+        interval = settings.AUTO_EVAL_INTERVAL if interval is None else interval
+        seen = None
+        while True:
+            try:
+                if self.regime.version != seen:
+                    seen = self.regime.version
+                    await self.evaluate(market_data_source())
+            except Exception as e:
+                logger.error(f"Auto mode evaluation error: {e}")
+            await clock.asleep(interval)
     
     def get_status(self) -> Dict:
         """Get current auto mode status"""
@@ -210,10 +206,32 @@ class AutoModeEngine:
             'enabled': True,
             'current_strategy': self.current_strategy,
             'confidence': self.confidence,
+            'conditions': self.conditions,
             'last_analysis': self.last_analysis,
             'recent_decisions': self.strategy_history[-5:],
             'total_decisions': len(self.strategy_history)
         }
 
+class AutoStrategy(Strategy):
+    """Runs auto mode inside the trading engine: each decision swaps the engine's trading strategies"""
+    
+    type = StrategyType.AUTO
+    
+    def __init__(self, auto: Optional[AutoModeEngine] = None):
+        self.auto = auto or auto_engine
+        self.interval = settings.AUTO_EVAL_INTERVAL
+    
+    async def evaluate(self, market_data: Dict) -> List[TradeSignal]:
+        await self.auto.evaluate(market_data)
+        selection = AUTO_SELECTIONS.get(self.auto.current_strategy)
+        if selection:
+            # Auto mode only decides between arbitrage and AI signals; other strategies keep running
+            managed = set(AUTO_SELECTIONS['hybrid'])
+            wanted = selection + [s for s in self.engine.active_strategies if s not in managed]
+            if set(wanted) != set(self.engine.active_strategies):
+                logger.info(f"🤖 Auto mode switching to {self.auto.current_strategy}")
+                self.engine.set_strategies(wanted)
+        return []
+
 # Global instance
 auto_engine = AutoModeEngine()
@@ -6,12 +6,15 @@ Description: Fetches and analyzes trending meme coins from CoinGecko
 """
 
 import logging
-import aiohttp
 import asyncio
 from typing import List, Dict, Optional
 from datetime import datetime
 import time
 
+from config.settings import settings
+from core.engine import Strategy, StrategyType, TradeSignal
+from core.http import http_client
+
 logger = logging.getLogger(__name__)
 
 class MemeRadar:
@@ -28,9 +31,10 @@ class MemeRadar:
             if self._is_cached(cache_key):
                 return self.cache[cache_key]['data']
             
-            # Fetch trending coins and market data
-            trending_data = await self._fetch_trending_coins()
-            market_data = await self._fetch_market_data()
+            # Fetch trending coins and market data (both go over the same CoinGecko pool)
+            trending_data, market_data = await asyncio.gather(
+                self._fetch_trending_coins(), self._fetch_market_data()
+            )
             
             # Analyze and filter meme candidates
             meme_candidates = await self._analyze_meme_potential(trending_data, market_data)
@@ -50,15 +54,12 @@ class MemeRadar:
     async def _fetch_trending_coins(self) -> List[Dict]:
         """Fetch trending coins from CoinGecko"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.base_url}/search/trending"
-                async with session.get(url, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data.get('coins', [])
-                    else:
-                        logger.warning(f"CoinGecko trending API returned {response.status}")
-                        return []
+            response = await http_client.get(f"{self.base_url}/search/trending")
+            if response.status == 200:
+                return response.data.get('coins', [])
+            else:
+                logger.warning(f"CoinGecko trending API returned {response.status}")
+                return []
         except Exception as e:
             logger.error(f"Failed to fetch trending coins: {e}")
             return []
@@ -66,23 +67,21 @@ class MemeRadar:
     async def _fetch_market_data(self) -> List[Dict]:
         """Fetch market data for analysis"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.base_url}/coins/markets"
-                params = {
-                    'vs_currency': 'usd',
-                    'order': 'volume_desc',
-                    'per_page': 100,
-                    'page': 1,
-                    'sparkline': False,
-                    'price_change_percentage': '1h,24h'
-                }
-                
-                async with session.get(url, params=params, timeout=10) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        logger.warning(f"CoinGecko markets API returned {response.status}")
-                        return []
+            params = {
+                'vs_currency': 'usd',
+                'order': 'volume_desc',
+                'per_page': 100,
+                'page': 1,
+                'sparkline': 'false',
+                'price_change_percentage': '1h,24h'
+            }
+            
+            response = await http_client.get(f"{self.base_url}/coins/markets", params=params)
+            if response.status == 200:
+                return response.data
+            else:
+                logger.warning(f"CoinGecko markets API returned {response.status}")
+                return []
         except Exception as e:
             logger.error(f"Failed to fetch market data: {e}")
             return []
@@ -190,5 +189,36 @@ class MemeRadar:
             }
         ]
 
+class MemeStrategy(Strategy):
+    """Paper-buys trending memes with rising price and high pump potential; I/O-bound, so it runs on the loop"""
+    
+    type = StrategyType.MEME
+    interval = 120  # the radar caches CoinGecko for two minutes
+    
+    def __init__(self, radar: Optional[MemeRadar] = None, min_pump_potential: float = 70.0, target_pct: float = 10.0):
+        self.radar = radar or meme_radar
+        self.min_pump_potential = min_pump_potential
+        self.target_pct = target_pct
+    
+    async def evaluate(self, market_data: Dict) -> List[TradeSignal]:
+        memes = await self.radar.get_trending_memes()
+        return [
+            TradeSignal(
+                symbol=f"{meme['symbol']}/USDT",
+                direction='buy',
+                confidence=meme['pump_potential'],
+                price=meme['current_price'],
+                target_price=meme['current_price'] * (1 + self.target_pct / 100),
+                strategy=self.type,
+                timestamp=datetime.now(),
+                risk_level='high',
+                exchange='dex',
+                amount_usd=settings.MIN_TRADE_AMOUNT
+            )
+            # Fallback demo data has no CoinGecko id and is never traded
+            for meme in memes
+            if 'id' in meme and meme['pump_potential'] >= self.min_pump_potential and meme['price_change_1h'] > 0
+        ]
+
 # Global instance
 meme_radar = MemeRadar()
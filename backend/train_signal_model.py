@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Signal Model Trainer
+Fits the NumPy linear signal model on the OHLCV backfill cache and exports it for SIGNAL_MODEL_PATH
+
+Each cached series is replayed through a FeatureStore to get the exact features the live
+generator sees on the same timeframe's series (the model is tagged with it); the label is the forward return over --horizon candles (buy above
++threshold, sell below -threshold, hold in between).
+
+Usage:
+    python train_signal_model.py --output models/signal_linear.json
+    python train_signal_model.py --cache data/ohlcv --horizon 30 --threshold 0.5 --output model.json
+"""
+
+import argparse
+import glob
+import logging
+import os
+
+import numpy as np
+
+from bot.models import LinearModel
+from bot.signals import FEATURE_SCHEMA_VERSION, FEATURES, TREND_CODES
+from config.settings import settings
+from core.features import FeatureStore
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def build_dataset(paths, horizon: int, threshold: float):
+    rows, labels = [], []
+    for path in paths:
+        candles = np.load(path)
+        closes = candles[:, 4]
+        if len(closes) <= horizon:
+            continue
+
+        store = FeatureStore()
+        features = []
+        for close in closes:
+            f = store.update('series', close)
+            features.append([f.rsi, f.macd, f.bb_position, f.volume_spike, f.momentum, TREND_CODES[f.trend]]
+                            if f.ready else None)
+
+        forward = (closes[horizon:] / closes[:-horizon] - 1) * 100
+        for i, change in enumerate(forward):
+            if features[i] is not None:
+                rows.append(features[i])
+                labels.append(1 if change > threshold else -1 if change < -threshold else 0)
+
+    return np.array(rows), np.array(labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the linear signal model on cached OHLCV history')
+    parser.add_argument('--cache', default=settings.OHLCV_CACHE_DIR, help='OHLCV cache written by the backfill')
+    parser.add_argument('--timeframe', default=settings.BACKFILL_TIMEFRAME)
+    parser.add_argument('--horizon', type=int, default=60, help='Candles ahead the label looks')
+    parser.add_argument('--threshold', type=float, default=1.0, help='Forward return (%%) that makes a buy/sell label')
+    parser.add_argument('--epochs', type=int, default=500)
+    parser.add_argument('--version', default='1')
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.cache, f"*_{args.timeframe}.npy")))
+    if not paths:
+        parser.error(f"No {args.timeframe} OHLCV cache files in {args.cache} - start the bot once to backfill")
+
+    features, labels = build_dataset(paths, args.horizon, args.threshold)
+    if len(np.unique(labels)) < 2:
+        parser.error(f"Need at least two label classes, got {np.unique(labels).tolist()} - adjust --threshold")
+    logger.info(f"📊 {len(labels)} samples from {len(paths)} series "
+                f"({(labels == 1).sum()} buy, {(labels == 0).sum()} hold, {(labels == -1).sum()} sell)")
+
+    model = LinearModel.fit(features, labels, FEATURES, FEATURE_SCHEMA_VERSION, epochs=args.epochs, version=args.version,
+                            timeframe=args.timeframe)
+    model.save(args.output)
+    logger.info(f"✅ Model {model.name}@{model.version} written to {args.output} "
+                f"(train accuracy {model.metadata['train_accuracy']:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,8 @@ Description: MetaMask wallet connection and balance reading
 import logging
 from typing import Dict, Optional, Tuple
 import asyncio
-import aiohttp
+
+from core.http import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -76,22 +77,21 @@ class MetaMaskWallet:
                 'tag': 'latest'
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get('status') == '1':
-                            # Convert from Wei to ETH
-                            balance_wei = int(data.get('result', '0'))
-                            balance_eth = balance_wei / 10**18
-                            return balance_eth
-                        else:
-                            logger.warning(f"Etherscan API error: {data.get('message')}")
-                            return 0.0
-                    else:
-                        logger.warning(f"Etherscan API returned {response.status}")
-                        return 0.0
-                        
+            response = await http_client.get(url, params=params)
+            if response.status == 200:
+                data = response.data
+                if data.get('status') == '1':
+                    # Convert from Wei to ETH
+                    balance_wei = int(data.get('result', '0'))
+                    balance_eth = balance_wei / 10**18
+                    return balance_eth
+                else:
+                    logger.warning(f"Etherscan API error: {data.get('message')}")
+                    return 0.0
+            else:
+                logger.warning(f"Etherscan API returned {response.status}")
+                return 0.0
+                
         except Exception as e:
             logger.error(f"Etherscan balance fetch failed: {e}")
             # Fallback to simulated balance
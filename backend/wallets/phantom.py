@@ -8,9 +8,11 @@ Description: Phantom wallet connection and SOL balance reading
 import logging
 from typing import Dict, Optional, Tuple
 import asyncio
-import aiohttp
 import base58
 
+from config.settings import settings
+from core.http import http_client
+
 logger = logging.getLogger(__name__)
 
 class PhantomWallet:
@@ -84,27 +86,22 @@ class PhantomWallet:
                 "params": [self.connected_address]
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url, 
-                    json=payload, 
-                    headers={'Content-Type': 'application/json'},
-                    timeout=10
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if 'result' in data and 'value' in data['result']:
-                            # Convert from lamports to SOL
-                            balance_lamports = data['result']['value']
-                            balance_sol = balance_lamports / 10**9
-                            return balance_sol
-                        else:
-                            logger.warning(f"RPC error: {data.get('error', 'Unknown error')}")
-                            return 0.0
-                    else:
-                        logger.warning(f"Solana RPC returned {response.status}")
-                        return 0.0
-                        
+            # getBalance is a read, so it is safe to retry like a GET
+            response = await http_client.post(url, json=payload, retries=settings.HTTP_RETRIES)
+            if response.status == 200:
+                data = response.data
+                if 'result' in data and 'value' in data['result']:
+                    # Convert from lamports to SOL
+                    balance_lamports = data['result']['value']
+                    balance_sol = balance_lamports / 10**9
+                    return balance_sol
+                else:
+                    logger.warning(f"RPC error: {data.get('error', 'Unknown error')}")
+                    return 0.0
+            else:
+                logger.warning(f"Solana RPC returned {response.status}")
+                return 0.0
+                
         except Exception as e:
             logger.error(f"Solana RPC balance fetch failed: {e}")
             # Fallback to simulated balance
@@ -1,7 +1,6 @@
-from flask import Flask, jsonify, request, render_template_string
+from flask import Flask, Response, jsonify, request, render_template_string
 from flask_cors import CORS
 import ccxt
-import pandas as pd
 import numpy as np
 import time
 import threading
@@ -14,7 +13,27 @@ import os
 import asyncio
 import logging
 from concurrent.futures import ThreadPoolExecutor
-import ta  # Technical analysis library
+import sys
+
+# Shared engine components (clock, recording, ...) live in backend/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from bot.signal_ledger import signal_ledger
+from bot.signals import AISignalGenerator
+from config.settings import settings
+from core.arbitrage import ArbitrageExecutor
+from core.backfill import OHLCVBackfill
+from core.candles import candle_aggregator
+from core.clock import clock
+from core.features import feature_store
+from core.ledger import Ledger
+from core.opportunities import OpportunityRegistry
+from core.orders import OrderManager
+from core.paper import PaperBroker
+from core.recording import TickRecorder
+from core.regime import regime_tracker
+from core.risk import RiskEngine
+from core.status import StatusPublisher, etag_matches
+from core.tracing import tracer
 
 app = Flask(__name__)
 CORS(app)
@@ -25,21 +44,22 @@ logger = logging.getLogger(__name__)
 
 # Global variables
 exchanges = {}
-portfolio = {
-    'balance': 1000,  # Starting with $1000
-    'profit_live': 0,
-    'profit_24h': 0,
-    'profit_1_5h': 0,
-    'total_trades': 0,
-    'successful_trades': 0,
-    'win_rate': 0
-}
+# Portfolio state is owned by the ledger writer; read ledger.portfolio / ledger.snapshot
+ledger = Ledger(1000, fields={'profit_1_5h': 0})  # Starting with $1000
 trading_active = False
 ai_signals = []
 trade_log = []
 prices = {}
 market_data = {}
 
+# Replay hook: when set, prices come from this source instead of the exchanges
+price_source = None
+tick_recorder = TickRecorder(os.environ['RECORD_SESSION_PATH']) if os.getenv('RECORD_SESSION_PATH') else None
+
+# Dashboard status, rebuilt once per market-data version
+status_publisher = StatusPublisher(lambda: bot.build_status_document())
+ledger.add_listener(lambda snapshot: status_publisher.mark_dirty())
+
 # Pre-selected profitable markets for focused trading
 SELECTED_MARKETS = [
     {
@@ -71,8 +91,30 @@ SELECTED_MARKETS = [
 class EnhancedTradingBot:
     def __init__(self):
         self.executor = ThreadPoolExecutor(max_workers=10)
+        self.latest_opportunities = []
+        self.trade_lock = threading.Lock()  # guards trade_log - arbitrage legs execute concurrently
+        self.paper_broker = PaperBroker()
+        # Every order - engine, arbitrage legs, API - goes through the order manager and its risk checks
+        self.risk_engine = RiskEngine()
+        self.order_manager = OrderManager(
+            lambda order: self.execute_enhanced_trade(
+                order.exchange, order.symbol, order.side, order.amount_usd, order.strategy, order.confidence,
+                price=order.price, client_order_id=order.client_order_id
+            ),
+            risk=self.risk_engine
+        )
+        # Routes must persist across snapshots and cool down after a trade before they are traded
+        self.opportunity_registry = OpportunityRegistry()
+        # Signals are scored by the configured model (SIGNAL_MODEL_PATH) or the rules, from the feature store
+        self.signal_generator = AISignalGenerator()
+        self.arbitrage_executor = ArbitrageExecutor(
+            lambda exchange_name, symbol, side, amount_usd, price, strategy, confidence, trace:
+                self.order_manager.submit(exchange_name, symbol, side, amount_usd, strategy, confidence, price=price,
+                                          trace=trace).result()
+        )
         self.setup_database()
         self.setup_exchanges()
+        ledger.allocate(exchanges)
         self.initialize_markets()
         self.start_price_monitoring()
         self.start_trading_engine()
@@ -218,6 +260,9 @@ class EnhancedTradingBot:
     
     def get_prices_parallel(self, symbol):
         """Get prices from all exchanges in parallel"""
+        if price_source is not None:
+            return price_source.get_prices(symbol)
+        
         def fetch_price(exchange_name, exchange):
             try:
                 if exchange == 'demo':
@@ -258,23 +303,15 @@ class EnhancedTradingBot:
         
         return exchange_prices
     
-    def analyze_market_conditions(self, symbol, prices_history):
-        """Advanced market analysis using technical indicators"""
+    def analyze_market_conditions(self, symbol):
+        """Advanced market analysis using technical indicators from the feature store"""
         try:
-            if len(prices_history) < 20:
+            features = feature_store.latest(symbol)
+            if features is None or not features.ready:
                 return {'trend': 'neutral', 'strength': 0.5, 'confidence': 0.3}
             
-            df = pd.DataFrame(prices_history)
-            df['price'] = df['price'].astype(float)
-            
-            # Calculate technical indicators
-            rsi = ta.momentum.RSIIndicator(df['price'], window=14).rsi().iloc[-1]
-            macd = ta.trend.MACD(df['price']).macd().iloc[-1]
-            bb = ta.volatility.BollingerBands(df['price'], window=20)
-            bb_position = (df['price'].iloc[-1] - bb.bollinger_lband().iloc[-1]) / (bb.bollinger_uband().iloc[-1] - bb.bollinger_lband().iloc[-1])
-            
-            # Volume analysis (simulated for demo)
-            volume_spike = np.random.uniform(0.8, 1.5)
+            rsi, macd, bb_position = features.rsi, features.macd, features.bb_position
+            volume_spike = features.volume_spike
             
             # Determine trend and confidence
             if rsi < 30 and bb_position < 0.2:
@@ -299,15 +336,19 @@ class EnhancedTradingBot:
                 'macd': macd,
                 'bb_position': bb_position,
                 'volume_spike': volume_spike,
-                'confidence': confidence
+                'confidence': confidence,
+                'version': features.version
             }
             
         except Exception as e:
             logger.error(f"Market analysis failed for {symbol}: {e}")
             return {'trend': 'neutral', 'strength': 0.5, 'confidence': 0.3}
     
-    def find_enhanced_arbitrage_opportunities(self):
-        """Find arbitrage opportunities with enhanced filtering"""
+    def find_enhanced_arbitrage_opportunities(self, price_snapshot=None):
+        """Find arbitrage opportunities with enhanced filtering
+        
+        Uses `price_snapshot` ({symbol: {exchange: price}}) when given instead of fetching fresh prices.
+        """
         opportunities = []
         
         for market in SELECTED_MARKETS:
@@ -315,7 +356,10 @@ class EnhancedTradingBot:
             min_profit = market['min_profit_threshold']
             
             try:
-                exchange_prices = self.get_prices_parallel(symbol)
+                if price_snapshot is not None:
+                    exchange_prices = price_snapshot.get(symbol, {})
+                else:
+                    exchange_prices = self.get_prices_parallel(symbol)
                 
                 if len(exchange_prices) < 2:
                     continue
@@ -328,7 +372,7 @@ class EnhancedTradingBot:
                             
                             if profit_pct > min_profit:
                                 # Calculate position size based on market config
-                                position_size = (portfolio['balance'] * market['trade_amount_pct']) / 100
+                                position_size = (ledger.portfolio['balance'] * market['trade_amount_pct']) / 100
                                 position_size = max(100, min(position_size, 500))  # $100-$500 range
                                 
                                 profit_usd = (sell_price - buy_price) * (position_size / buy_price)
@@ -355,54 +399,49 @@ class EnhancedTradingBot:
         return sorted(opportunities, key=lambda x: (x['profit_pct'] * x['priority']), reverse=True)
     
     def generate_enhanced_ai_signals(self):
-        """Generate AI signals with market analysis"""
+        """Generate AI signals with market analysis - scored by the same model as the API's signal generator"""
         global ai_signals
         signals = []
         
-        for market in SELECTED_MARKETS:
+        symbols = [market['symbol'] for market in SELECTED_MARKETS]
+        try:
+            # Indicators the monitor computed for this tick, one batch through the signal model
+            matrix = self.signal_generator._feature_matrix(symbols)
+            prices = np.array([self.signal_generator._get_current_price(symbol) for symbol in symbols])
+            batch = self.signal_generator.score(matrix, prices)
+        except Exception as e:
+            logger.error(f"Error generating signals: {e}")
+            return ai_signals
+        
+        for i, market in enumerate(SELECTED_MARKETS):
             symbol = market['symbol']
             
             try:
-                # Get current prices
-                exchange_prices = self.get_prices_parallel(symbol)
-                avg_price = np.mean(list(exchange_prices.values()))
-                
-                # Simulate market analysis (in production, use real TA)
+                features = self.signal_generator._features(symbol)
+                if features is None or not features.ready:
+                    continue
                 analysis = {
-                    'rsi': np.random.uniform(25, 75),
-                    'trend': np.random.choice(['bullish', 'bearish', 'neutral'], p=[0.4, 0.3, 0.3]),
-                    'volume': np.random.uniform(0.8, 2.0),
-                    'momentum': np.random.uniform(-1, 1)
+                    'rsi': round(features.rsi, 2),
+                    'trend': features.trend,
+                    'volume': round(features.volume_spike, 2),
+                    'momentum': round(features.momentum, 3)
                 }
                 
-                # Generate signal based on analysis
-                confidence = 0
-                direction = 'hold'
-                
-                if analysis['rsi'] < 35 and analysis['trend'] == 'bullish':
-                    direction = 'buy'
-                    confidence = 85 + np.random.uniform(0, 10)
-                elif analysis['rsi'] > 65 and analysis['trend'] == 'bearish':
-                    direction = 'sell'
-                    confidence = 75 + np.random.uniform(0, 15)
-                elif analysis['momentum'] > 0.5 and analysis['volume'] > 1.3:
-                    direction = 'buy'
-                    confidence = 70 + np.random.uniform(0, 15)
+                direction = {1: 'buy', -1: 'sell'}.get(int(batch.direction[i]), 'hold')
+                confidence = float(batch.confidence[i])
                 
-                if confidence > 70:  # Only high-confidence signals
-                    target_pct = 3 if direction == 'buy' else -2
-                    target_price = avg_price * (1 + target_pct/100)
-                    
+                if direction != 'hold' and confidence > 70:  # Only high-confidence signals
                     signals.append({
                         'coin': market['name'],
                         'symbol': symbol,
                         'direction': direction,
                         'confidence': round(confidence, 1),
-                        'current_price': round(avg_price, 4),
-                        'target_price': round(target_price, 4),
+                        'current_price': round(float(prices[i]), 4),
+                        'target_price': round(float(batch.target[i]), 4),
                         'risk_level': f"{market['volatility'].title()} risk",
                         'timeframe': '1-3 hours',
                         'analysis': analysis,
+                        'model': f"{self.signal_generator.model.name}@{self.signal_generator.model.version}",
                         'priority': market['priority']
                     })
                     
@@ -410,87 +449,109 @@ class EnhancedTradingBot:
                 logger.error(f"Error generating signal for {symbol}: {e}")
         
         ai_signals = sorted(signals, key=lambda x: x['confidence'], reverse=True)[:3]
+        for signal in ai_signals:
+            signal_ledger.record(signal)
         return ai_signals
     
-    def execute_enhanced_trade(self, exchange_name, symbol, side, amount_usd, strategy='manual', confidence=0.5):
-        """Execute trade with enhanced tracking"""
-        global portfolio, trade_log
+    def execute_enhanced_trade(self, exchange_name, symbol, side, amount_usd, strategy='manual', confidence=0.5, price=None, client_order_id=None):
+        """Execute trade with enhanced tracking - called by the order manager workers
+        
+        `price` is a pre-fetched quote (arbitrage legs); without it the exchanges are queried.
+        Orders are filled by the paper broker against its book for the exchange.
+        """
+        global trade_log
         
-        start_time = time.time()
+        start_time = clock.monotonic()
         
         try:
             # Ensure minimum trade size
             amount_usd = max(amount_usd, 100)
             
             # Get current market prices
-            exchange_prices = self.get_prices_parallel(symbol)
-            price = exchange_prices.get(exchange_name, list(exchange_prices.values())[0])
-            
-            # Calculate crypto amount
-            crypto_amount = amount_usd / price
+            if price is None:
+                exchange_prices = self.get_prices_parallel(symbol)
+                self.paper_broker.on_quotes(symbol, exchange_prices)
+                price = exchange_prices.get(exchange_name, list(exchange_prices.values())[0])
             
-            # Enhanced profit calculation based on strategy and market conditions
-            if strategy == 'arbitrage':
-                profit_pct = np.random.uniform(0.3, 1.8)  # Realistic arbitrage profits
-                profit = amount_usd * (profit_pct / 100)
-            elif strategy == 'ai_signal':
-                # Profit based on signal confidence
-                profit_pct = np.random.uniform(-0.5, confidence/20)  # Higher confidence = better profit
-                profit = amount_usd * (profit_pct / 100)
-            else:
-                profit_pct = np.random.uniform(-1.5, 2.5)  # Manual trading variance
-                profit = amount_usd * (profit_pct / 100)
+            # Fill against the book: slippage, partial fills, fees and ack latency
+            fill = self.paper_broker.execute(exchange_name, symbol, side, amount_usd, price)
+            if not fill.quantity:
+                return False, f"❌ Trade failed: {fill.reason}"
             
-            # Update portfolio
-            if side == 'buy':
-                portfolio['balance'] -= amount_usd
-                trade_profit = 0  # Profit realized on sell
-            else:
-                portfolio['balance'] += amount_usd + profit
-                trade_profit = profit
-                portfolio['profit_live'] += profit
+            # PnL realized by closing part of a position at the actual fill prices
+            trade_profit = fill.realized_pnl
+            profit_pct = trade_profit / fill.notional * 100
             
-            # Update portfolio stats
-            portfolio['total_trades'] += 1
-            if profit > 0:
-                portfolio['successful_trades'] += 1
-            portfolio['win_rate'] = (portfolio['successful_trades'] / portfolio['total_trades']) * 100
+            # Update portfolio - applied in order by the ledger writer
+            ledger.record_fill(exchange_name, symbol, side, fill.notional, fill.avg_price, trade_profit, fee=fill.fee,
+                               closed=fill.closed_quantity > 0)
+            self.risk_engine.record_pnl(exchange_name, symbol, strategy, trade_profit)
             
-            execution_time = time.time() - start_time
+            execution_time = clock.monotonic() - start_time
             
             # Enhanced trade logging
             trade_entry = {
-                'timestamp': datetime.now().strftime('%H:%M:%S'),
+                'timestamp': clock.now().strftime('%H:%M:%S'),
                 'exchange': exchange_name,
                 'symbol': symbol,
                 'side': side.upper(),
-                'amount': round(crypto_amount, 6),
-                'price': round(price, 4),
-                'usd_amount': amount_usd,
+                'amount': round(fill.quantity, 6),
+                'price': round(fill.avg_price, 4),
+                'usd_amount': round(fill.notional, 2),
+                'fee': round(fill.fee, 4),
+                'fill': fill.status,
                 'profit': round(trade_profit, 2),
                 'profit_pct': round(profit_pct, 3),
                 'strategy': strategy,
                 'confidence': confidence,
-                'execution_time': round(execution_time, 3)
+                'execution_time': round(execution_time, 3),
+                'client_order_id': client_order_id
             }
             
-            trade_log.append(trade_entry)
-            
-            # Keep last 50 trades in memory
-            if len(trade_log) > 50:
-                trade_log.pop(0)
+            with self.trade_lock:
+                trade_log.append(trade_entry)
+                
+                # Keep last 50 trades in memory
+                if len(trade_log) > 50:
+                    trade_log.pop(0)
+            status_publisher.mark_dirty()
             
             # Save to database
             self.save_enhanced_trade_to_db(trade_entry)
             
-            logger.info(f"✅ Trade executed: {side} ${amount_usd} {symbol} at ${price:.4f} (profit: ${trade_profit:.2f})")
+            logger.info(f"✅ Trade executed: {side} ${fill.notional:.2f} {symbol} at ${fill.avg_price:.4f} "
+                        f"({fill.status}, profit: ${trade_profit:.2f})")
             
-            return True, f"✅ {side.upper()} ${amount_usd} {symbol} at ${price:.4f} | Profit: ${trade_profit:.2f} ({profit_pct:.2f}%)"
+            partial = f" | {fill.reason}" if fill.status == 'partial' else ''
+            return True, f"✅ {side.upper()} ${fill.notional:.2f} {symbol} at ${fill.avg_price:.4f} | " \
+                         f"Profit: ${trade_profit:.2f} ({profit_pct:.2f}%){partial}"
             
         except Exception as e:
             logger.error(f"Trade execution failed: {e}")
             return False, f"❌ Trade failed: {str(e)}"
     
+    def build_status_document(self):
+        """Dashboard status from current state - served by /api/enhanced_status"""
+        snapshot = ledger.snapshot
+        return {
+            'portfolio': snapshot.portfolio,
+            'balances': snapshot.balances,
+            'ai_signals': list(ai_signals),
+            'trade_log': trade_log[-20:],  # Last 20 trades
+            'arbitrage_opportunities': self.latest_opportunities[:5],  # Top 5 opportunities
+            'trading_active': trading_active,
+            'prices': {symbol: dict(exchange_prices) for symbol, exchange_prices in prices.items()},
+            'market_data': {k: self._market_data_snapshot(v) for k, v in market_data.items()
+                            if k in [m['symbol'] for m in SELECTED_MARKETS]}
+        }
+
+    @staticmethod
+    def _market_data_snapshot(data):
+        """Copy the price history: the monitor appends/pops it in place, which would hide the change from delta diffs"""
+        if 'price_history' not in data:
+            return dict(data)
+        return {**data, 'price_history': list(data['price_history'])}
+    
     def save_enhanced_trade_to_db(self, trade):
         """Save enhanced trade data to database"""
         try:
@@ -500,7 +561,7 @@ class EnhancedTradingBot:
                 INSERT INTO trades (timestamp, exchange, symbol, side, amount, price, profit, profit_pct, strategy, confidence, execution_time)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
-                datetime.now(),
+                clock.now(),
                 trade['exchange'],
                 trade['symbol'],
                 trade['side'],
@@ -520,6 +581,14 @@ class EnhancedTradingBot:
     def start_price_monitoring(self):
         """Enhanced price monitoring with market analysis"""
         def monitor_markets():
+            clock.attach('monitor_markets')
+            if settings.BACKFILL_ENABLED and price_source is None:
+                # Seed indicators and candles from exchange history so they are warm from the first tick
+                try:
+                    OHLCVBackfill().run(exchanges, [market['symbol'] for market in SELECTED_MARKETS])
+                except Exception as e:
+                    logger.error(f"OHLCV backfill failed: {e}")
+            
             while True:
                 try:
                     for market in SELECTED_MARKETS:
@@ -528,33 +597,47 @@ class EnhancedTradingBot:
                         # Update prices
                         exchange_prices = self.get_prices_parallel(symbol)
                         prices[symbol] = exchange_prices
+                        self.paper_broker.on_quotes(symbol, exchange_prices)
+                        candle_aggregator.on_quotes(symbol, exchange_prices)
+                        if tick_recorder:
+                            tick_recorder.record(symbol, exchange_prices)
                         
                         # Store price history for analysis
-                        if symbol not in market_data:
-                            market_data[symbol] = {'price_history': []}
+                        market_data.setdefault(symbol, {}).setdefault('price_history', [])
                         
                         market_data[symbol]['price_history'].append({
-                            'timestamp': datetime.now(),
+                            'timestamp': clock.now(),
                             'price': np.mean(list(exchange_prices.values()))
                         })
                         
                         # Keep only last 100 price points
                         if len(market_data[symbol]['price_history']) > 100:
                             market_data[symbol]['price_history'].pop(0)
+                        
+                        # Indicators once per tick, shared by signals and market analysis
+                        feature_store.update(symbol, market_data[symbol]['price_history'][-1]['price'])
+                        signal_ledger.on_price(symbol, market_data[symbol]['price_history'][-1]['price'])
+                        regime_tracker.on_prices(symbol, exchange_prices)
                     
                     # Update portfolio performance
-                    portfolio['profit_24h'] = portfolio['profit_live'] + np.random.uniform(-10, 25)
-                    portfolio['profit_1_5h'] = portfolio['profit_live'] + np.random.uniform(50, 200)
+                    profit_live = ledger.portfolio['profit_live']
+                    ledger.set_fields(profit_24h=profit_live + np.random.uniform(-10, 25),
+                                      profit_1_5h=profit_live + np.random.uniform(50, 200))
                     
                     # Generate fresh AI signals
                     if len(ai_signals) < 3 or np.random.random() < 0.2:
                         self.generate_enhanced_ai_signals()
                     
-                    time.sleep(15)  # Update every 15 seconds
+                    # Publish the status snapshot for this market-data version
+                    self.latest_opportunities = self.find_enhanced_arbitrage_opportunities(prices)
+                    status_publisher.mark_dirty()
+                    status_publisher.get()
+                    
+                    clock.sleep(15)  # Update every 15 seconds
                     
                 except Exception as e:
                     logger.error(f"Price monitoring error: {e}")
-                    time.sleep(30)
+                    clock.sleep(30)
         
         thread = threading.Thread(target=monitor_markets, daemon=True)
         thread.start()
@@ -563,45 +646,41 @@ class EnhancedTradingBot:
     def start_trading_engine(self):
         """Start automated trading engine"""
         def trading_engine():
+            clock.attach('trading_engine')
             while True:
                 try:
                     if trading_active:
-                        # Find and execute arbitrage opportunities
-                        opportunities = self.find_enhanced_arbitrage_opportunities()
+                        # Find arbitrage opportunities on one set of quotes and trade against those quotes
+                        snapshot, traces = {}, {}
+                        for market in SELECTED_MARKETS:
+                            symbol = market['symbol']
+                            traces[symbol] = tracer.start('arbitrage', symbol)
+                            snapshot[symbol] = self.get_prices_parallel(symbol)
+                            traces[symbol].mark('tick')
+                            self.paper_broker.on_quotes(symbol, snapshot[symbol])
+                        for trace in traces.values():
+                            trace.mark('snapshot')
+                        opportunities = self.opportunity_registry.observe(self.find_enhanced_arbitrage_opportunities(snapshot))
                         
                         for opp in opportunities[:2]:  # Execute top 2 opportunities
-                            if opp['profit_pct'] > opp['symbol'].split('/')[0] == 'BTC' and 0.3 or 0.4:
+                            min_profit = 0.3 if opp['symbol'].split('/')[0] == 'BTC' else 0.4
+                            if opp['profit_pct'] > min_profit:
                                 logger.info(f"🚀 Executing arbitrage: {opp['symbol']} - {opp['profit_pct']:.2f}% profit")
+                                trace = traces[opp['symbol']].fork()
+                                trace.mark('opportunity')
                                 
-                                # Execute buy order
-                                success, msg = self.execute_enhanced_trade(
-                                    opp['buy_exchange'],
-                                    opp['symbol'],
-                                    'buy',
-                                    opp['position_size'],
-                                    'arbitrage',
-                                    opp['confidence']
-                                )
+                                # Both legs at once against the snapshot quotes
+                                execution = self.arbitrage_executor.execute(opp, snapshot[opp['symbol']], trace)
+                                self.opportunity_registry.record_trade(opp, execution.state)
+                                logger.info(execution.message)
                                 
-                                if success:
-                                    time.sleep(1)  # Brief delay
-                                    # Execute sell order
-                                    self.execute_enhanced_trade(
-                                        opp['sell_exchange'],
-                                        opp['symbol'],
-                                        'sell',
-                                        opp['position_size'],
-                                        'arbitrage',
-                                        opp['confidence']
-                                    )
-                                
-                                time.sleep(5)  # Cooldown between trades
+                                clock.sleep(5)  # Cooldown between trades
                     
-                    time.sleep(20)  # Check every 20 seconds
+                    clock.sleep(20)  # Check every 20 seconds
                     
                 except Exception as e:
                     logger.error(f"Trading engine error: {e}")
-                    time.sleep(60)
+                    clock.sleep(60)
         
         thread = threading.Thread(target=trading_engine, daemon=True)
         thread.start()
@@ -1277,21 +1356,22 @@ def index():
 # Enhanced API Routes
 @app.route('/api/enhanced_status')
 def get_enhanced_status():
-    """Get enhanced bot status with detailed metrics"""
+    """Get enhanced bot status from the precomputed snapshot
+    
+    With ?since=<version> (the client's last seen version) only the changes are returned.
+    """
     try:
-        # Get fresh data
-        arbitrage_opportunities = bot.find_enhanced_arbitrage_opportunities()
-        ai_signals_fresh = bot.generate_enhanced_ai_signals()
+        snapshot = status_publisher.get()
+        headers = {'ETag': snapshot.etag, 'X-Status-Version': str(snapshot.version), 'Cache-Control': 'no-cache'}
         
-        return jsonify({
-            'portfolio': portfolio,
-            'ai_signals': ai_signals,
-            'trade_log': trade_log[-20:],  # Last 20 trades
-            'arbitrage_opportunities': arbitrage_opportunities[:5],  # Top 5 opportunities
-            'trading_active': trading_active,
-            'prices': prices,
-            'market_data': {k: v for k, v in market_data.items() if k in [m['symbol'] for m in SELECTED_MARKETS]}
-        })
+        since = request.args.get('since', type=int)
+        if since is not None:
+            return Response(status_publisher.delta(since, snapshot), mimetype='application/json', headers=headers)
+        
+        if etag_matches(request.headers.get('If-None-Match'), snapshot.etag):
+            return Response(status=304, headers=headers)
+        
+        return Response(snapshot.body, mimetype='application/json', headers=headers)
     except Exception as e:
         logger.error(f"Status endpoint error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -1323,10 +1403,11 @@ def start_enhanced_trading():
         if budget < 100:
             return jsonify({'success': False, 'message': 'Minimum budget is $100'})
         
-        if portfolio['balance'] < budget:
+        if ledger.portfolio['balance'] < budget:
             return jsonify({'success': False, 'message': 'Insufficient balance'})
         
         trading_active = True
+        status_publisher.mark_dirty()
         
         logger.info(f"🚀 Enhanced trading started - Budget: ${budget}, Strategy: {strategy}, Risk: {risk_level}")
         
@@ -1344,6 +1425,7 @@ def stop_enhanced_trading():
     """Stop enhanced trading"""
     global trading_active
     trading_active = False
+    status_publisher.mark_dirty()
     logger.info("⏹️ Enhanced trading stopped")
     return jsonify({'success': True, 'message': 'Enhanced trading stopped'})
 
@@ -1353,16 +1435,20 @@ def execute_enhanced_trade():
     try:
         data = request.json
         
-        success, message = bot.execute_enhanced_trade(
+        # Retrying with the same client_order_id returns the original order's result
+        order = bot.order_manager.submit(
             data.get('exchange', 'binance'),
             data['symbol'],
             data['side'],
             data['amount_usd'],
             data.get('strategy', 'manual'),
-            data.get('confidence', 0.5)
+            data.get('confidence', 0.5),
+            client_order_id=data.get('client_order_id'),
+            trace=tracer.start('manual', data['symbol'])
         )
+        success, message = order.result(timeout=30)
         
-        return jsonify({'success': success, 'message': message})
+        return jsonify({'success': success, 'message': message, 'client_order_id': order.client_order_id})
         
     except Exception as e:
         logger.error(f"Enhanced trade execution error: {e}")
@@ -1370,50 +1456,105 @@ def execute_enhanced_trade():
 
 @app.route('/api/execute_arbitrage', methods=['POST'])
 def execute_arbitrage():
-    """Execute arbitrage opportunity"""
+    """Execute arbitrage opportunity - both legs concurrently on one set of quotes"""
     try:
         data = request.json
         
-        # Execute buy order
-        success1, msg1 = bot.execute_enhanced_trade(
-            data['buy_exchange'],
-            data['symbol'],
-            'buy',
-            data['position_size'],
-            'arbitrage',
-            0.8
-        )
+        trace = tracer.start('manual_arbitrage', data['symbol'])
+        quotes = bot.get_prices_parallel(data['symbol'])
+        trace.mark('tick')
+        bot.paper_broker.on_quotes(data['symbol'], quotes)
+        for exchange_name in (data['buy_exchange'], data['sell_exchange']):
+            if exchange_name not in quotes:
+                return jsonify({'success': False, 'message': f'No quote for {data["symbol"]} on {exchange_name}'})
         
-        if success1:
-            time.sleep(0.5)  # Brief delay
-            # Execute sell order
-            success2, msg2 = bot.execute_enhanced_trade(
-                data['sell_exchange'],
-                data['symbol'],
-                'sell',
-                data['position_size'],
-                'arbitrage',
-                0.8
-            )
-            
-            if success2:
-                return jsonify({'success': True, 'message': '✅ Arbitrage executed successfully'})
-            else:
-                return jsonify({'success': False, 'message': f'Sell failed: {msg2}'})
-        else:
-            return jsonify({'success': False, 'message': f'Buy failed: {msg1}'})
+        opportunity = {
+            'symbol': data['symbol'],
+            'buy_exchange': data['buy_exchange'],
+            'sell_exchange': data['sell_exchange'],
+            'buy_price': quotes[data['buy_exchange']],
+            'sell_price': quotes[data['sell_exchange']],
+            'position_size': data['position_size'],
+            'confidence': 0.8
+        }
+        trace.mark('opportunity')
+        execution = bot.arbitrage_executor.execute(opportunity, quotes, trace)
+        
+        return jsonify({'success': execution.success, 'message': execution.message, 'execution': execution.to_dict()})
             
     except Exception as e:
         logger.error(f"Arbitrage execution error: {e}")
         return jsonify({'success': False, 'message': f'Arbitrage failed: {str(e)}'})
 
-@app.route('/api/market_analysis/<symbol>')
+@app.route('/api/orders')
+def get_orders():
+    """Order manager queues, submit-to-ack latency and recent orders"""
+    return jsonify(bot.order_manager.get_stats())
+
+@app.route('/api/risk')
+def get_risk():
+    """Exposure, open orders and daily P&L per symbol/exchange/strategy against the limits"""
+    return jsonify(bot.risk_engine.get_stats())
+
+@app.route('/api/paper')
+def get_paper():
+    """Paper broker fills, fees, realized PnL and open positions"""
+    return jsonify(bot.paper_broker.get_stats())
+
+@app.route('/api/opportunities')
+def get_opportunities():
+    """Arbitrage routes being tracked - streaks, cooldowns and how many opportunities were filtered"""
+    return jsonify(bot.opportunity_registry.get_stats())
+
+@app.route('/api/traces')
+def get_traces():
+    """Tick-to-trade latency per stage and the slowest traces"""
+    return jsonify(tracer.snapshot())
+
+@app.route('/api/arbitrage_executions')
+def get_arbitrage_executions():
+    """Arbitrage outcomes, per-leg latency and the most recent executions"""
+    return jsonify(bot.arbitrage_executor.get_stats())
+
+@app.route('/api/signal_performance')
+def get_signal_performance():
+    """Outcomes of every AI signal: hit rate, average return and calibration per confidence bucket"""
+    return jsonify(signal_ledger.get_stats())
+
+@app.route('/api/candles/<path:symbol>')
+def get_candles(symbol):
+    """OHLCV candles built from the monitored prices, downsampled for charts"""
+    try:
+        return jsonify(candle_aggregator.get_candles(
+            symbol,
+            request.args.get('timeframe', '1m'),
+            request.args.get('exchange'),
+            limit=request.args.get('limit', type=int),
+            max_points=request.args.get('max_points', 500, type=int)
+        ))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/market_analysis/<path:symbol>')
 def get_market_analysis(symbol):
     """Get detailed market analysis for a symbol"""
     try:
         if symbol not in market_data:
             return jsonify({'error': 'Symbol not found'}), 404
         
+        analysis = bot.analyze_market_conditions(symbol)
+        features = feature_store.latest(symbol)
         
-            
-            .
\ No newline at end of file
+        return jsonify({
+            'symbol': symbol,
+            'prices': prices.get(symbol, {}),
+            'analysis': analysis,
+            'features': features.to_dict() if features else None
+        })
+        
+    except Exception as e:
+        logger.error(f"Market analysis error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=5000, debug=False)
@@ -4,6 +4,7 @@ import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 import { Button } from '@/components/ui/button';
 import { ArrowRightLeft, TrendingUp, Clock, DollarSign } from 'lucide-react';
+import { statusSync } from '@/services/statusSync';
 
 interface ArbitrageOpportunity {
   symbol: string;
@@ -38,8 +39,7 @@ export const ArbitrageOpportunities: React.FC<ArbitrageOpportunitiesProps> = ({
   const fetchOpportunities = async () => {
     setLoading(true);
     try {
-      const response = await fetch('/api/enhanced_status');
-      const data = await response.json();
+      const data = await statusSync.fetchStatus();
       setOpportunities(data.arbitrage_opportunities || []);
     } catch (error) {
       console.error('Failed to fetch arbitrage opportunities:', error);
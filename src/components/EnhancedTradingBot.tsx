@@ -8,6 +8,7 @@ import { Bot, Play, Square, TrendingUp, DollarSign, Target, Zap } from 'lucide-r
 import { MarketAnalysisPanel } from './MarketAnalysisPanel';
 import { ArbitrageOpportunities } from './ArbitrageOpportunities';
 import { RealTimeTradeLog } from './RealTimeTradeLog';
+import { statusSync } from '@/services/statusSync';
 
 interface Portfolio {
   balance: number;
@@ -67,8 +68,7 @@ export const EnhancedTradingBot: React.FC<EnhancedTradingBotProps> = ({
 
   const updateData = async () => {
     try {
-      const response = await fetch('/api/enhanced_status');
-      const data = await response.json();
+      const data = await statusSync.fetchStatus();
       
       setPortfolio(data.portfolio);
       setAiSignals(data.ai_signals || []);
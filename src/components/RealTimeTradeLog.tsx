@@ -4,6 +4,7 @@ import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 import { ScrollArea } from '@/components/ui/scroll-area';
 import { Activity, Filter, TrendingUp, TrendingDown, Clock } from 'lucide-react';
+import { statusSync } from '@/services/statusSync';
 
 interface TradeEntry {
   timestamp: string;
@@ -38,8 +39,7 @@ export const RealTimeTradeLog: React.FC<RealTimeTradeLogProps> = ({ maxEntries =
   const fetchTrades = async () => {
     setLoading(true);
     try {
-      const response = await fetch('/api/enhanced_status');
-      const data = await response.json();
+      const data = await statusSync.fetchStatus();
       setTrades(data.trade_log || []);
     } catch (error) {
       console.error('Failed to fetch trades:', error);
@@ -0,0 +1,91 @@
+// Keeps a local copy of /api/enhanced_status in sync using the versioned delta protocol.
+// All components share one instance, so every poll only transfers what changed.
+
+type Patch = {
+  set?: Record<string, any>;
+  unset?: string[];
+  nested?: Record<string, Patch>;
+  append?: any[];
+  length?: number;
+  replace?: any;
+  key?: string[];
+  upsert?: Record<string, any>[];
+  remove?: any[][];
+  order?: any[][];
+};
+
+interface StatusEnvelope {
+  version: number;
+  full: boolean;
+  status?: Record<string, any>;
+  base?: number;
+  patch?: Patch;
+}
+
+const applyPatch = (current: any, patch: Patch): any => {
+  if ('replace' in patch) {
+    return patch.replace;
+  }
+
+  if (patch.append) {
+    const list = Array.isArray(current) ? current : [];
+    return [...list, ...patch.append].slice(-(patch.length ?? 0));
+  }
+
+  if (patch.key) {
+    const keyOf = (item: Record<string, any>) => JSON.stringify(patch.key!.map(field => item[field]));
+    const items = new Map<string, any>();
+    (Array.isArray(current) ? current : []).forEach(item => items.set(keyOf(item), item));
+    (patch.remove || []).forEach(key => items.delete(JSON.stringify(key)));
+    (patch.upsert || []).forEach(item => items.set(keyOf(item), item));
+    return (patch.order || []).map(key => items.get(JSON.stringify(key))).filter(Boolean);
+  }
+
+  const result = { ...(current || {}) };
+  (patch.unset || []).forEach(key => delete result[key]);
+  Object.assign(result, patch.set || {});
+  Object.entries(patch.nested || {}).forEach(([key, sub]) => {
+    result[key] = applyPatch(result[key], sub);
+  });
+  return result;
+};
+
+class StatusSyncService {
+  private version = 0;
+  private status: Record<string, any> | null = null;
+  private pending: Promise<Record<string, any>> | null = null;
+
+  async fetchStatus(): Promise<Record<string, any>> {
+    // Components polling at the same moment share one request
+    if (!this.pending) {
+      this.pending = this.sync().finally(() => {
+        this.pending = null;
+      });
+    }
+    return this.pending;
+  }
+
+  private async sync(): Promise<Record<string, any>> {
+    const response = await fetch(`/api/enhanced_status?since=${this.version}`);
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const envelope: StatusEnvelope = await response.json();
+    if (envelope.full) {
+      this.status = envelope.status!;
+    } else if (this.status && envelope.base === this.version) {
+      this.status = applyPatch(this.status, envelope.patch || {});
+    } else {
+      // Our base is gone - start over from a full snapshot
+      this.version = 0;
+      this.status = null;
+      return this.sync();
+    }
+
+    this.version = envelope.version;
+    return this.status!;
+  }
+}
+
+export const statusSync = new StatusSyncService();